@@ -0,0 +1 @@
+"""框架微基準測試（不屬於 pytest 測試集，以 python benchmarks/run_benchmarks.py 執行）"""
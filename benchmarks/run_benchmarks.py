@@ -0,0 +1,258 @@
+"""
+框架微基準測試
+
+在本機靜態替身網站（benchmarks/stub/）上量測 fixture 與頁面物件的固定成本：
+瀏覽器啟動、new_context、new_context(storage_state=...)、CartPage 建構、
+close_popup_if_exists 與 get_first_product_info。
+
+每項量測重複執行，輸出中位數與 p95，並寫出 JSON 結果；
+指定 --baseline 時與先前的結果比較，中位數退步超過門檻即以非零狀態結束
+
+使用方式：
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --repeat 30 --output test-results/benchmarks.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --max-regression 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib.metadata import version
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 添加父級目錄到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.stub_site import STUB_HOST, StubSite
+from pages.cart_page import CartPage
+from playwright.sync_api import Browser, Playwright, sync_playwright
+
+DEFAULT_OUTPUT = Path("./test-results/benchmarks.json")
+
+
+@contextlib.contextmanager
+def quiet():
+    """頁面物件的步驟日誌不輸出到終端（輸出速度會影響量測）"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def synthetic_storage_state() -> Dict:
+    """與實際登入狀態大小相近的驗證狀態（固定內容，量測結果可重現）"""
+    expires = time.time() + 86400
+    cookies = [
+        {"name": "wordpress_logged_in_0123456789abcdef", "value": "benchmark%7C" + "a" * 120,
+         "domain": STUB_HOST, "path": "/", "expires": expires, "httpOnly": True, "secure": True, "sameSite": "Lax"},
+        {"name": "woocommerce_items_in_cart", "value": "0",
+         "domain": STUB_HOST, "path": "/", "expires": expires, "httpOnly": False, "secure": True, "sameSite": "Lax"},
+    ]
+    cookies += [
+        {"name": f"_tracking_{index}", "value": "x" * 40, "domain": ".dogcatstar.com", "path": "/",
+         "expires": expires, "httpOnly": False, "secure": False, "sameSite": "Lax"}
+        for index in range(20)
+    ]
+    local_storage = [{"name": f"key_{index}", "value": "v" * 200} for index in range(30)]
+    return {"cookies": cookies, "origins": [{"origin": f"https://{STUB_HOST}", "localStorage": local_storage}]}
+
+
+class BenchmarkEnv:
+    """量測共用的瀏覽器與替身網站"""
+
+    def __init__(self, playwright: Playwright, browser: Browser, headless: bool, state_file: Path):
+        self.playwright = playwright
+        self.browser = browser
+        self.headless = headless
+        self.state_file = state_file
+        self.site = StubSite()
+
+    def new_stub_context(self):
+        context = self.browser.new_context()
+        self.site.install(context)
+        return context
+
+
+# ============ 量測項目（返回計時區段的秒數，準備與清理不計時） ============
+
+def bench_browser_launch(env: BenchmarkEnv) -> float:
+    started = time.perf_counter()
+    browser = env.playwright.chromium.launch(headless=env.headless)
+    elapsed = time.perf_counter() - started
+    browser.close()
+    return elapsed
+
+
+def bench_new_context(env: BenchmarkEnv) -> float:
+    started = time.perf_counter()
+    context = env.browser.new_context()
+    elapsed = time.perf_counter() - started
+    context.close()
+    return elapsed
+
+
+def bench_new_context_storage_state(env: BenchmarkEnv) -> float:
+    started = time.perf_counter()
+    context = env.browser.new_context(storage_state=str(env.state_file))
+    elapsed = time.perf_counter() - started
+    context.close()
+    return elapsed
+
+
+def bench_cart_page_init(env: BenchmarkEnv) -> float:
+    context = env.new_stub_context()
+    page = context.new_page()
+    try:
+        with quiet():
+            started = time.perf_counter()
+            CartPage(page)
+            return time.perf_counter() - started
+    finally:
+        context.close()
+
+
+def bench_close_popup_if_exists(env: BenchmarkEnv) -> float:
+    context = env.new_stub_context()
+    page = context.new_page()
+    try:
+        with quiet():
+            cart_page = CartPage(page)
+            page.wait_for_selector(".swal2-container", state="visible")
+            started = time.perf_counter()
+            closed = cart_page.close_popup_if_exists()
+            elapsed = time.perf_counter() - started
+        assert closed, "替身網站的彈出窗口未關閉"
+        return elapsed
+    finally:
+        context.close()
+
+
+def bench_get_first_product_info(env: BenchmarkEnv) -> float:
+    context = env.new_stub_context()
+    page = context.new_page()
+    try:
+        with quiet():
+            cart_page = CartPage(page)
+            started = time.perf_counter()
+            product = cart_page.get_first_product_info()
+            elapsed = time.perf_counter() - started
+        assert product["name"] == "貓咪凍乾 雞肉 40g", f"替身網站的商品信息不符: {product}"
+        return elapsed
+    finally:
+        context.close()
+
+
+BENCHMARKS: Dict[str, Callable[[BenchmarkEnv], float]] = {
+    "browser_launch": bench_browser_launch,
+    "new_context": bench_new_context,
+    "new_context_storage_state": bench_new_context_storage_state,
+    "cart_page_init": bench_cart_page_init,
+    "close_popup_if_exists": bench_close_popup_if_exists,
+    "get_first_product_info": bench_get_first_product_info,
+}
+
+
+# ============ 統計與比較 ============
+
+def summarize(samples_ms: List[float]) -> Dict:
+    """中位數、p95（nearest-rank）與範圍"""
+    ordered = sorted(samples_ms)
+    p95_index = max(0, math.ceil(0.95 * len(ordered)) - 1)
+    return {
+        "n": len(ordered),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[p95_index], 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "min_ms": round(ordered[0], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """中位數比基準慢超過 max_regression（比例）的項目"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous["median_ms"]:
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1
+        if change > max_regression:
+            regressions.append(
+                f"{name}: 中位數 {previous['median_ms']:.1f}ms → {result['median_ms']:.1f}ms（+{change:.0%}）"
+            )
+    return regressions
+
+
+def run(names: List[str], repeat: int, warmup: int, headless: bool) -> Dict[str, Dict]:
+    """執行量測，返回 {名稱: 統計}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, sync_playwright() as p:
+        state_file = Path(tmp) / "storage_state.json"
+        state_file.write_text(json.dumps(synthetic_storage_state()), encoding="utf-8")
+        browser = p.chromium.launch(headless=headless)
+        env = BenchmarkEnv(p, browser, headless, state_file)
+        try:
+            for name in names:
+                bench = BENCHMARKS[name]
+                for _ in range(warmup):
+                    bench(env)
+                samples_ms = [bench(env) * 1000 for _ in range(repeat)]
+                results[name] = dict(summarize(samples_ms), samples_ms=[round(s, 2) for s in samples_ms])
+                print(f"  {name:<28} 中位數 {results[name]['median_ms']:8.1f}ms   p95 {results[name]['p95_ms']:8.1f}ms")
+        finally:
+            browser.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="框架微基準測試（本機替身網站）")
+    parser.add_argument("--repeat", type=int, default=20, help="每項量測的重複次數")
+    parser.add_argument("--warmup", type=int, default=2, help="不計入結果的暖身次數")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只執行指定的量測項目")
+    parser.add_argument("--headed", action="store_true", help="顯示瀏覽器視窗（預設 headless）")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON 結果檔案路徑")
+    parser.add_argument("--baseline", type=Path, help="比較用的先前結果（同格式的 JSON）")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="中位數允許的退步比例")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    print(f"⏱️ 執行 {len(names)} 項量測（每項 {args.repeat} 次，暖身 {args.warmup} 次）")
+    results = run(names, args.repeat, args.warmup, headless=not args.headed)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "playwright": version("playwright"),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "headless": not args.headed,
+            },
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"✅ 結果已保存至：{args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} 項量測退步超過 {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"✅ 與基準 {args.baseline} 相比沒有退步")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""靜態替身網站 - 以 context.route 從 benchmarks/stub/ 回應 www.dogcatstar.com 的請求"""
+
+import base64
+import mimetypes
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Route
+
+STUB_DIR = Path(__file__).parent / "stub"
+STUB_HOST = "www.dogcatstar.com"
+
+# 1x1 透明 PNG（替身頁面的商品圖片）
+_PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+class StubSite:
+    """
+    替身網站路由
+
+    - https://www.dogcatstar.com/<path>/ → stub/<path>/index.html，其餘路徑對應到同名檔案
+    - 找不到的檔案回應 404，其他網域的請求一律中止（基準測試不連網）
+    """
+
+    def __init__(self, root: Path = STUB_DIR):
+        self.root = Path(root)
+        self.requests = 0
+
+    def install(self, context: BrowserContext):
+        """註冊到上下文的所有請求"""
+        context.route("**/*", self.handle)
+
+    def resolve(self, url: str) -> Optional[Path]:
+        """URL 對應的替身檔案，不屬於替身網站或檔案不存在時為 None"""
+        parts = urlsplit(url)
+        if parts.hostname != STUB_HOST:
+            return None
+        relative = parts.path.lstrip("/")
+        if not relative or relative.endswith("/"):
+            relative += "index.html"
+        path = (self.root / relative).resolve()
+        if self.root.resolve() not in path.parents or not path.is_file():
+            return None
+        return path
+
+    def handle(self, route: Route):
+        self.requests += 1
+        url = route.request.url
+        if urlsplit(url).hostname != STUB_HOST:
+            route.abort("blockedbyclient")
+            return
+        if url.endswith(".png"):
+            route.fulfill(status=200, content_type="image/png", body=_PLACEHOLDER_PNG)
+            return
+        path = self.resolve(url)
+        if path is None:
+            route.fulfill(status=404, content_type="text/html; charset=utf-8", body="<h1>404</h1>")
+            return
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        route.fulfill(status=200, content_type=content_type, body=path.read_bytes())
@@ -1,63 +1,656 @@
+import asyncio
+import logging
 import pytest
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright, Page, Browser
 import os
+from functools import partial
 from pathlib import Path
+from fixtures.test_data import TEST_USERS
+from helpers.asset_cache import AssetCache
+from helpers.browser_daemon import BrowserDaemon
+from helpers.cart_service import CartService
+from helpers.context_pool import ContextPool
+from helpers.duration_store import DurationStore
+from helpers.flight_recorder import FlightRecorder
+from helpers.locator_resolver import LocatorResolver
+from helpers.log_sink import LogSink
+from helpers.har_mirror import NETWORK_MODES, HarMirror
+from helpers.popup_handler import AsyncPopupAutoDismisser, PopupAutoDismisser
+from helpers.network_monitor import AsyncNetworkMonitor, NetworkMonitor
+from helpers.rate_governor import RateGovernor
+from helpers.retry_engine import RetryEngine
+from helpers.network_profiles import DEFAULT_PROFILE, ROUTING_PROFILES, NetworkProfile
+from helpers.storage_state import AUTH_FILE, StorageStateManager, login
+from helpers.tracing import StepTracer
+from helpers.wait_accounting import WaitAccounting
+from helpers.parallel import (
+    ParallelRunner, get_results_dir, get_worker_id, merge_counters, parse_worker_count, write_worker_stats,
+)
 
-# 測試結果目錄
-TEST_RESULTS_DIR = Path("./test-results")
-TEST_RESULTS_DIR.mkdir(exist_ok=True)
+# 測試結果目錄（平行模式下為 test-results/<worker_id>/）
+TEST_RESULTS_DIR = get_results_dir()
 
-# Auth 檔案路徑（用於已登入狀態）
-AUTH_FILE = "./fixtures/user.json"  # 使用真實的用戶登入狀態
+# 平行執行結果在 config.stash 中的鍵
+PARALLEL_SUMMARY_KEY = pytest.StashKey[dict]()
+
+# session 瀏覽器的 CDP 連接埠（async_browser 以此連線到同一個瀏覽器）
+BROWSER_CDP_PORT_KEY = pytest.StashKey[int]()
+
+# session 結束時要輸出的效能統計（各 session fixture 在 teardown 時加入）
+SESSION_REPORT_KEY = pytest.StashKey[list]()
+
+# 本程序的資源快取統計（asset_cache 結束時累加；平行模式下由主程序合併各 worker 的統計）
+ASSET_CACHE_STATS: dict = {}
+
+# 測試耗時紀錄（session 結束時寫入 .pw_cache/durations.json，平行執行時用來分配測試）
+DURATIONS = DurationStore()
+
+
+def pytest_addoption(parser):
+    """自定義命令列參數"""
+    group = parser.getgroup("parallel", "平行執行")
+    group.addoption(
+        "--workers",
+        action="store",
+        default="1",
+        help="平行執行的 worker 程序數量（整數或 auto），每個 worker 使用自己的瀏覽器",
+    )
+
+    group = parser.getgroup("browser_daemon", "常駐瀏覽器")
+    group.addoption(
+        "--no-browser-daemon",
+        action="store_true",
+        default=False,
+        help="不連線到常駐瀏覽器（scripts/browser_daemon.py），一律自行啟動瀏覽器",
+    )
+
+    group = parser.getgroup("context_pool", "BrowserContext 池")
+    group.addoption(
+        "--context-pool-size",
+        action="store",
+        type=int,
+        default=1,
+        help="每個上下文池預先建立的 BrowserContext 數量",
+    )
+    group.addoption(
+        "--context-max-uses",
+        action="store",
+        type=int,
+        default=20,
+        help="BrowserContext 被租借幾次後關閉重建（1 表示每個測試都使用全新上下文）",
+    )
+
+    group = parser.getgroup("auth_state", "驗證狀態")
+    group.addoption(
+        "--auth-refresh-margin",
+        action="store",
+        type=float,
+        default=600,
+        help="登入 cookie 到期前多少秒自動更新驗證狀態",
+    )
+    group.addoption(
+        "--auth-ui-fallback",
+        action="store_true",
+        default=False,
+        help="HTTP 登入失敗時改用 UI 登入流程更新驗證狀態（預設直接回報 HTTP 登入的錯誤）",
+    )
+
+    group = parser.getgroup("network", "網路")
+    group.addoption(
+        "--network-profile",
+        action="store",
+        default=DEFAULT_PROFILE,
+        choices=sorted(ROUTING_PROFILES),
+        help="預設的網路路由設定檔（可用 @pytest.mark.network_profile(...) 針對單一測試覆寫）",
+    )
+    group.addoption(
+        "--network-mode",
+        action="store",
+        default="live",
+        choices=NETWORK_MODES,
+        help="live: 連線真實網站；record: 錄製 HAR 至 fixtures/har/；replay: 只使用錄製檔離線執行",
+    )
+    group.addoption(
+        "--no-asset-cache",
+        action="store_true",
+        default=False,
+        help="停用跨上下文與 session 共享的磁碟資源快取",
+    )
+    group.addoption(
+        "--asset-cache-size",
+        action="store",
+        type=int,
+        default=200,
+        help="磁碟資源快取的大小上限（MB），超過時依 LRU 淘汰",
+    )
+
+    group = parser.getgroup("retry", "重試")
+    group.addoption(
+        "--retry-test-budget",
+        action="store",
+        type=int,
+        default=5,
+        help="每個測試最多的動作重試次數（RetryEngine）",
+    )
+    group.addoption(
+        "--retry-session-budget",
+        action="store",
+        type=int,
+        default=30,
+        help="整個 session 最多的動作重試次數（平行模式下為每個 worker）",
+    )
+
+    group = parser.getgroup("step_log", "步驟日誌")
+    group.addoption(
+        "--step-log-level",
+        action="store",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="LogHelpers 記錄的最低等級（DEBUG 包含彈出視窗與商品選項處理的細節）",
+    )
+    group.addoption(
+        "--step-log-console",
+        action="store_true",
+        default=False,
+        help="即時輸出步驟日誌到 stdout（預設只在測試失敗時附加到報告）",
+    )
+    group.addoption(
+        "--step-log-file",
+        action="store",
+        default="steps.log",
+        help="步驟日誌檔名（寫入測試結果目錄，由背景執行緒寫入；空字串表示不寫檔）",
+    )
+
+    group = parser.getgroup("tracing", "追蹤")
+    group.addoption(
+        "--trace-steps",
+        action="store_true",
+        default=False,
+        help="記錄 測試 → 頁面物件方法 → Playwright 動作 的計時區段，"
+             "session 結束時寫出 trace.json（Chrome trace）與 trace.csv",
+    )
+    group.addoption(
+        "--flight-recorder",
+        action="store",
+        type=int,
+        default=10,
+        help="每個頁面在記憶體中保留最近幾個步驟的快照（URL、DOM 摘要，依間隔附截圖），"
+             "測試失敗時寫入 test-results/<測試名稱>_flight/；0 表示停用",
+    )
+    group.addoption(
+        "--flight-recorder-interval",
+        action="store",
+        type=float,
+        default=5.0,
+        help="失敗記錄器兩次步驟截圖的最短間隔秒數（只截目前的頁面）；0 表示只在測試失敗時截圖",
+    )
+    group.addoption(
+        "--no-wait-report",
+        action="store_true",
+        default=False,
+        help="不統計固定等待與條件等待（預設會在 session 結束時輸出等待排行並寫出 waits.json）",
+    )
+
+
+def pytest_configure(config):
+    """設定步驟日誌；包裝等待方法以統計等待時間；啟用步驟追蹤時包裝頁面物件與 Playwright 動作"""
+    log_file = config.getoption("step_log_file")
+    LogSink.configure(
+        level=getattr(logging, config.getoption("step_log_level")),
+        console=config.getoption("step_log_console"),
+        log_file=TEST_RESULTS_DIR / log_file if log_file else None,
+    )
+    if config.getoption("network_mode") == "replay":
+        # 重播不連網，不需要節流，也不受其他執行留下的共享退避影響
+        RateGovernor.shared().enabled = False
+    retry = RetryEngine.shared()
+    retry.test_budget = config.getoption("retry_test_budget")
+    retry.session_budget = config.getoption("retry_session_budget")
+    if not config.getoption("no_wait_report"):
+        WaitAccounting.install()
+    FlightRecorder.capacity = config.getoption("flight_recorder")
+    FlightRecorder.screenshot_interval = config.getoption("flight_recorder_interval")
+
+    if config.getoption("trace_steps"):
+        from pages.cart_page import CartPage
+        from pages.login_page import LoginPage
+        from pages.myaccount_page import MyAccountPage
+
+        StepTracer.enabled = True
+        StepTracer.instrument_playwright()
+        StepTracer.instrument_page_objects([CartPage, LoginPage, MyAccountPage])
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """每個測試（含 fixture 設定與清理）為一個最外層區段，並使用各自的步驟日誌緩衝區"""
+    LogSink.start_test(item.nodeid)
+    RetryEngine.shared().start_test()
+    with StepTracer.span(item.nodeid, "test"):
+        yield
+    LogSink.finish_test()
+
+
+def pytest_unconfigure(config):
+    """寫完背景佇列中剩餘的步驟日誌；worker 寫出統計供主程序合併（此時 session fixture 都已結束）"""
+    LogSink.shutdown()
+    if get_worker_id():
+        write_worker_stats(session_stats())
+
+
+def pytest_runtest_logreport(report):
+    """累計測試各階段的執行時間（等待佔比的分母與耗時紀錄）"""
+    DURATIONS.record(report.nodeid, report.duration, skipped=report.skipped)
+    if WaitAccounting.enabled:
+        WaitAccounting.add_active_time(report.duration)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """平行模式：主程序不執行測試，而是將收集到的測試分配給 worker 程序"""
+    config = session.config
+    workers = parse_worker_count(config.getoption("workers"))
+    if workers <= 1 or get_worker_id() or config.option.collectonly or not session.items:
+        return None
+
+    runner = ParallelRunner(config, workers)
+    summary = runner.run([item.nodeid for item in session.items])
+    config.stash[PARALLEL_SUMMARY_KEY] = summary
+    session.testsfailed = summary["failed"] + len(summary["crashed"])
+    merge_worker_reports(config, summary)
+    return True
+
+
+def session_stats():
+    """各輔助類別的統計計數器（worker 寫出、主程序累加）"""
+    return {
+        "locator_resolver": LocatorResolver.stats,
+        "popups": PopupAutoDismisser.stats,
+        "governor": RateGovernor.shared().stats,
+        "retry": RetryEngine.shared().stats,
+        "asset_cache": ASSET_CACHE_STATS,
+    }
+
+
+def merge_worker_reports(config, summary):
+    """
+    合併各 worker 寫出的等待統計、步驟追蹤與各輔助類別的統計
+
+    等待統計與計數器累加到主程序，由 pytest_sessionfinish 照常輸出並寫出合併後的 waits.json；
+    步驟追蹤直接合併為 test-results/trace.json
+    """
+    for path in ParallelRunner.worker_files(summary, "waits.json"):
+        WaitAccounting.load(path)
+    ParallelRunner.merge_worker_stats(summary, session_stats())
+    if ASSET_CACHE_STATS:
+        add_session_report(config, AssetCache.format_summary(ASSET_CACHE_STATS))
+    trace_paths = ParallelRunner.worker_files(summary, "trace.json")
+    merged_trace = StepTracer.merge_exports(trace_paths, TEST_RESULTS_DIR)
+    if merged_trace is not None:
+        add_session_report(config, f"步驟追蹤: 合併 {len(trace_paths)} 個 worker → {merged_trace}")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """輸出平行執行的合併結果和效能統計"""
+    summary = config.stash.get(PARALLEL_SUMMARY_KEY, None)
+    if summary is not None:
+        terminalreporter.section("平行執行結果")
+        for line in ParallelRunner.format_summary(summary):
+            terminalreporter.write_line(line)
+
+    report_lines = config.stash.get(SESSION_REPORT_KEY, [])
+    if report_lines:
+        terminalreporter.section("效能統計")
+        for line in report_lines:
+            terminalreporter.write_line(line)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """保存跨執行共用的學習結果"""
+    LocatorResolver.save()
+    recorded = DURATIONS.flush()
+    if recorded:
+        add_session_report(session.config, f"測試耗時紀錄: 更新 {recorded} 個測試 → {DURATIONS.path}")
+    if LocatorResolver.stats["lookups"]:
+        add_session_report(session.config, LocatorResolver.summary())
+    if PopupAutoDismisser.stats:
+        add_session_report(session.config, PopupAutoDismisser.summary())
+    governor = RateGovernor.shared()
+    if governor.stats["acquired"] or governor.stats["throttled"]:
+        add_session_report(session.config, governor.summary())
+    retry = RetryEngine.shared()
+    if retry.stats["retries"] or retry.stats["fail_fast"]:
+        add_session_report(session.config, retry.summary())
+
+    trace_path = StepTracer.export(TEST_RESULTS_DIR, process_name=get_worker_id() or "pytest")
+    if trace_path is not None:
+        add_session_report(session.config, f"步驟追蹤: {len(StepTracer.spans)} 個區段 → {trace_path}")
+        for span in StepTracer.slowest("step"):
+            add_session_report(session.config, f"  {span['dur'] / 1_000_000:.2f}s  {span['name']}  ({span['test']})")
+
+    waits_path = WaitAccounting.export(TEST_RESULTS_DIR)
+    if waits_path is not None:
+        for line in WaitAccounting.report():
+            add_session_report(session.config, line)
+        add_session_report(session.config, f"  等待明細 → {waits_path}")
+
+
+def add_session_report(config, line: str):
+    """加入一行 session 結束時輸出的效能統計"""
+    config.stash.setdefault(SESSION_REPORT_KEY, []).append(line)
+
+
+def needs_async_browser(session) -> bool:
+    """本次收集的測試中是否有使用 async_browser（直接或經由 async_pages 等 fixture）"""
+    return any("async_browser" in getattr(item, "fixturenames", ()) for item in session.items)
 
 
 @pytest.fixture(scope="session")
-def browser() -> Browser:
-    """Session 層級的瀏覽器實例 - 在整個測試會話中共享"""
+def browser(request, pytestconfig) -> Browser:
+    """
+    Session 層級的瀏覽器實例 - 在整個測試會話中共享
+
+    有執行中的常駐瀏覽器（python scripts/browser_daemon.py start）時直接連線，省去啟動時間；
+    否則自行啟動，只有需要 async_browser 時才開放僅限本機的 CDP 連接埠。
+    結束時 close() 對常駐瀏覽器只會中斷連線並關閉本次建立的上下文
+    """
+    daemon = BrowserDaemon()
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
+        browser = None
+        if not pytestconfig.getoption("no_browser_daemon"):
+            browser = daemon.connect(p)
+        if browser is not None:
+            add_session_report(pytestconfig, f"瀏覽器: 連線到常駐瀏覽器 {browser.version}")
+            pytestconfig.stash[BROWSER_CDP_PORT_KEY] = daemon.read_endpoint()["port"]
+        elif needs_async_browser(request.session):
+            # 開放僅限本機的 CDP 連接埠，async_browser 連線到同一個瀏覽器
+            port = BrowserDaemon.free_port()
+            browser = p.chromium.launch(headless=False, args=[
+                f"--remote-debugging-port={port}",
+                "--remote-debugging-address=127.0.0.1",
+            ])
+            pytestconfig.stash[BROWSER_CDP_PORT_KEY] = port
+        else:
+            browser = p.chromium.launch(headless=False)
         yield browser
         browser.close()
+        daemon.touch()
+
+
+@pytest.fixture(scope="session")
+def context_pool(browser, pytestconfig):
+    """匿名上下文池 - 預先建立的上下文在測試之間重置後重複使用"""
+    pool = ContextPool(
+        browser,
+        size=pytestconfig.getoption("context_pool_size"),
+        max_uses=pytestconfig.getoption("context_max_uses"),
+        name="anonymous",
+    )
+    pool.warm_up()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def storage_state_manager(pytestconfig, har_mirror):
+    """
+    驗證狀態管理器 - 整個 session 只讀取一次 user.json
+
+    開始前先檢查登入 cookie 的有效期限，已過期且無法更新時立即失敗，
+    避免每個需要登入的測試都各自慢慢失敗；之後在背景於過期前自動更新
+
+    如果驗證狀態檔案不存在則為 None
+    """
+    if not Path(AUTH_FILE).exists():
+        yield None
+        return
+
+    user = TEST_USERS["valid_user"]
+    manager = StorageStateManager(
+        AUTH_FILE,
+        refresher=partial(login, user["email"], user["password"],
+                          ui_fallback=pytestconfig.getoption("auth_ui_fallback")),
+        refresh_margin=pytestconfig.getoption("auth_refresh_margin"),
+    )
+    manager.load()
+    if har_mirror.is_replaying:
+        # 重播時回應來自錄製檔，登入狀態是否過期不影響結果，也不以 HTTP 登入更新
+        yield manager
+        return
+    if not manager.ensure_fresh():
+        pytest.fail(f"驗證狀態已過期且無法自動更新（{manager.last_error}），請重新產生 {AUTH_FILE}")
+
+    manager.start_background_refresh()
+    yield manager
+    manager.stop()
+
+
+@pytest.fixture(scope="session")
+def auth_context_pool(browser, storage_state_manager, pytestconfig):
+    """
+    已登入上下文池 - 使用記憶體中的認證狀態建立上下文
+
+    如果驗證狀態檔案不存在則為 None
+    """
+    if storage_state_manager is None:
+        yield None
+        return
+
+    pool = ContextPool(
+        browser,
+        size=pytestconfig.getoption("context_pool_size"),
+        max_uses=pytestconfig.getoption("context_max_uses"),
+        storage_state=storage_state_manager.state,
+        name="authenticated",
+    )
+    # 驗證狀態在背景更新後，池中的上下文改用新狀態重建
+    storage_state_manager.add_listener(pool.update_storage_state)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def har_mirror(pytestconfig):
+    """HAR 錄製 / 重播設定"""
+    return HarMirror(pytestconfig.getoption("network_mode"))
+
+
+@pytest.fixture(scope="session")
+def asset_cache(pytestconfig, har_mirror):
+    """
+    共享的磁碟資源快取
+
+    HAR 錄製 / 重播模式下停用（資源必須經過 HAR 路由），停用時為 None
+    """
+    if pytestconfig.getoption("no_asset_cache") or har_mirror.mode != "live":
+        yield None
+        return
+
+    cache = AssetCache(max_bytes=pytestconfig.getoption("asset_cache_size") * 1024 * 1024)
+    yield cache
+    cache.close()
+    merge_counters(ASSET_CACHE_STATS, cache.stats)
+    add_session_report(pytestconfig, cache.summary())
+
+
+@pytest.fixture
+def network_profile(request, pytestconfig):
+    """目前測試使用的網路路由設定檔，測試結束後報告節省的請求數與位元組"""
+    marker = request.node.get_closest_marker("network_profile")
+    name = marker.args[0] if marker else pytestconfig.getoption("network_profile")
+    profile = NetworkProfile(name)
+    yield profile
+    if not profile.is_passthrough:
+        print(f"\n{profile.summary()}")
+        request.node.user_properties.append(("network_profile", profile.name))
+        request.node.user_properties.append(
+            ("network_requests_saved", profile.stats["blocked"] + profile.stats["stubbed"])
+        )
+        request.node.user_properties.append(
+            ("network_bytes_saved_estimate", profile.stats["estimated_bytes_saved"])
+        )
+
+
+def _apply_network(request, context, har_mirror, asset_cache, network_profile):
+    """
+    在租借的上下文上套用 HAR 錄製 / 重播、資源快取與網路設定檔
+
+    較晚註冊的路由優先處理：設定檔先封鎖不需要的資源，其餘交給資源快取，再交給 HAR 路由
+    """
+    if har_mirror.is_replaying and not har_mirror.has_recording(request.node.nodeid):
+        pytest.skip(f"找不到 HAR 錄製檔，請先以 --network-mode record 執行：{har_mirror.har_path(request.node.nodeid)}")
+    har_mirror.apply(context, request.node.nodeid)
+    if asset_cache is not None:
+        asset_cache.apply(context)
+    network_profile.apply(context)
 
 
 @pytest.fixture
-def context(browser):
-    """為每個測試建立新的瀏覽器上下文"""
-    context = browser.new_context()
+def context(request, context_pool, har_mirror, asset_cache, network_profile):
+    """從上下文池租借瀏覽器上下文，測試結束後重置並歸還"""
+    context = context_pool.acquire()
+    try:
+        _apply_network(request, context, har_mirror, asset_cache, network_profile)
+    except BaseException:
+        context_pool.release(context)
+        raise
     yield context
-    context.close()
+    # 錄製模式下關閉上下文才會寫入 HAR 檔
+    context_pool.release(context, discard=har_mirror.is_recording)
 
 
 @pytest.fixture
 def page(context) -> Page:
     """為每個測試建立新的頁面"""
     page = context.new_page()
+    PopupAutoDismisser.install(page)
+    NetworkMonitor.install(page)
+    FlightRecorder.install(page)
     yield page
     page.close()
 
 
 @pytest.fixture
-def authenticated_page(browser):
+def authenticated_page(request, auth_context_pool, har_mirror, asset_cache, network_profile):
     """
     返回已登入的頁面（使用保存的認證狀態）
     
     如果驗證狀態檔案不存在，將跳過使用此 fixture 的測試
     """
-    auth_path = Path(AUTH_FILE)
-    
     # 如果驗證狀態不存在，則跳過測試
-    if not auth_path.exists():
+    if auth_context_pool is None:
         pytest.skip(f"驗證狀態檔案不存在，無法進行需要認證的測試：{AUTH_FILE}")
     
     try:
-        # 使用保存的驗證狀態建立新上下文
-        context = browser.new_context(storage_state=str(auth_path))
-        page = context.new_page()
-        yield page
-        page.close()
-        context.close()
+        # 從已登入上下文池租借上下文
+        context = auth_context_pool.acquire()
     except Exception as e:
         pytest.skip(f"無法載入驗證狀態：{str(e)}")
+    
+    try:
+        _apply_network(request, context, har_mirror, asset_cache, network_profile)
+        page = context.new_page()
+        PopupAutoDismisser.install(page)
+        NetworkMonitor.install(page)
+        FlightRecorder.install(page)
+    except BaseException:
+        auth_context_pool.release(context)
+        raise
+    
+    yield page
+    page.close()
+    # 錄製模式下關閉上下文才會寫入 HAR 檔
+    auth_context_pool.release(context, discard=har_mirror.is_recording)
+
+
+@pytest.fixture
+def cart_service(request, authenticated_page, har_mirror) -> CartService:
+    """
+    已登入使用者的購物車 API（與 authenticated_page 共用 cookie）
+
+    context.request 不經過 HAR 路由：錄製模式下另外錄製 API 回應，重播模式下只使用錄製的回應
+    """
+    recording = har_mirror.api_recording(request.node.nodeid)
+    yield CartService(authenticated_page.context, recording=recording)
+    if recording is not None:
+        recording.save()
+
+
+@pytest.fixture
+def empty_cart(cart_service) -> CartService:
+    """測試開始前以 API 清空購物車，不經過 UI"""
+    cart_service.clear()
+    return cart_service
+
+
+@pytest.fixture
+def filled_cart(empty_cart) -> CartService:
+    """測試開始前以 API 清空購物車並加入一個可直接購買的商品，不經過 UI"""
+    product_id = empty_cart.first_addable_product_id()
+    if product_id is None:
+        pytest.skip("Store API 沒有可直接加入購物車的商品")
+    empty_cart.add_product(product_id)
+    return empty_cart
+
+
+@pytest.fixture(scope="session")
+def run_async():
+    """
+    Session 層級的事件迴圈 - 所有 async 流程在同一個迴圈上執行（不需要 pytest-asyncio）
+
+    用法: run_async(asyncio.gather(flow_a(), flow_b()))
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def async_browser(browser, pytestconfig, run_async):
+    """
+    Session 層級的 async 瀏覽器實例（playwright.async_api）
+
+    以 CDP 連線到 browser fixture 的同一個瀏覽器，不另外啟動第二個 Chromium；
+    結束時只中斷連線並關閉此連線建立的上下文
+    """
+    port = pytestconfig.stash.get(BROWSER_CDP_PORT_KEY, None)
+    if port is None:
+        pytest.fail("browser fixture 未開放 CDP 連接埠：async_browser 需在收集階段即被測試使用")
+    playwright = run_async(async_playwright().start())
+    connection = run_async(playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{port}", timeout=5000))
+    yield connection
+    run_async(connection.close())
+    run_async(playwright.stop())
+
+
+@pytest.fixture
+def async_pages(request, async_browser, run_async):
+    """
+    async 頁面工廠 - 每次呼叫建立獨立上下文中的新頁面，測試結束時全部關閉
+
+    用法: page = await async_pages(authenticated=True)
+    """
+    contexts = []
+
+    async def new_page(authenticated: bool = False):
+        storage_state = None
+        if authenticated:
+            manager = request.getfixturevalue("storage_state_manager")
+            if manager is None:
+                pytest.skip(f"驗證狀態檔案不存在，無法進行需要認證的測試：{AUTH_FILE}")
+            storage_state = manager.state
+        context = await async_browser.new_context(storage_state=storage_state)
+        contexts.append(context)
+        page = await context.new_page()
+        await AsyncPopupAutoDismisser.install(page)
+        AsyncNetworkMonitor.install(page)
+        return page
+
+    yield new_page
+    for context in contexts:
+        run_async(context.close())
 
 
 @pytest.fixture(autouse=True)
@@ -70,15 +663,28 @@ def test_setup_teardown():
     print("=== Test Completed ===\n")
 
 
-# 鈎子：測試失敗時自動截圖
+# 鈎子：測試失敗時自動截圖，並寫出失敗記錄器的快照（page 與 authenticated_page）
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     outcome = yield
     rep = outcome.get_result()
     
-    if rep.failed and "page" in item.fixturenames:
-        page = item.funcargs.get("page")
-        if page:
-            screenshot_path = f"./test-results/{item.name}_failure.png"
-            page.screenshot(path=screenshot_path)
-            print(f"\nScreenshot saved: {screenshot_path}")
\ No newline at end of file
+    if not rep.failed:
+        return
+    steps = LogSink.buffered_text()
+    if steps:
+        rep.sections.append((f"步驟日誌 ({rep.when})", steps))
+    for fixture_name in ("page", "authenticated_page"):
+        page = item.funcargs.get(fixture_name) if fixture_name in item.fixturenames else None
+        if not page or page.is_closed():
+            continue
+        screenshot_path = str(TEST_RESULTS_DIR / f"{item.name}_failure.png")
+        page.screenshot(path=screenshot_path)
+        print(f"\nScreenshot saved: {screenshot_path}")
+
+        # 失敗記錄器：最近幾個步驟的快照只在失敗時寫入磁碟
+        recorder = FlightRecorder.for_page(page)
+        if recorder is not None:
+            recorder.snapshot(f"測試失敗（{rep.when}）")
+            flight_path = recorder.dump(TEST_RESULTS_DIR / f"{item.name}_flight")
+            print(f"Flight recorder saved: {flight_path}")
\ No newline at end of file
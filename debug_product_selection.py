@@ -6,6 +6,7 @@ import sys
 from playwright.sync_api import sync_playwright
 from pages.cart_page import CartPage
 from helpers.base_helpers import LogHelpers
+from helpers.product_extractor import ProductExtractor
 
 def debug_product_selection():
     """調試商品選擇流程"""
@@ -66,17 +67,21 @@ def debug_product_selection():
             page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
             page.wait_for_timeout(1000)
             
-            # 查找商品卡片而不是按鈕
-            product_cards = page.locator('[class*="product"], [class*="item"], article').all()
-            LogHelpers.log_step(f"找到 {len(product_cards)} 個潛在商品卡片")
+            cart_page = CartPage(page)
             
-            # 滾動到第一個商品
-            if len(product_cards) > 0:
-                product_cards[0].scroll_into_view_if_needed()
-                page.wait_for_timeout(1000)
+            # 一次讀取所有商品卡片（名稱、價格、是否可加入購物車、是否有規格）
+            products = ProductExtractor.extract(page)
+            LogHelpers.log_step(f"找到 {len(products)} 個商品卡片")
+            for product in products[:5]:
+                LogHelpers.log_step(
+                    f"  #{product['index']} {product['name']} | {product['price']} | "
+                    f"可加入={product['can_add_to_cart']} 有規格={product['has_variants']} 有庫存={product['in_stock']}"
+                )
             
-            cart_page = CartPage(page)
-            product_info = cart_page.get_first_product_info()
+            product = ProductExtractor.first_addable(products)
+            product_info = cart_page.get_first_product_info() if product is None else {
+                'name': product['name'], 'price': product['price']
+            }
             LogHelpers.log_step(f"商品名稱: {product_info['name']}")
             LogHelpers.log_step(f"商品價格: {product_info['price']}")
             page.wait_for_timeout(2000)
@@ -84,10 +89,13 @@ def debug_product_selection():
             # 第四步：點擊添加購物車按鈕
             LogHelpers.log_step("\n[步驟 4] 點擊 '加入購物車' 按鈕...")
             
-            # 滾動到按鈕確保在視口內
-            add_to_cart_button = page.locator('button:has-text("加入購物車")').first
+            # 使用所選商品卡片內的按鈕
+            if product is not None:
+                add_to_cart_button = ProductExtractor.add_to_cart_button(page, product)
+            else:
+                add_to_cart_button = page.locator('button:has-text("加入購物車")').first
             
-            if add_to_cart_button.count() > 0:
+            if product is not None or add_to_cart_button.count() > 0:
                 LogHelpers.log_step("✓ 找到 '加入購物車' 按鈕")
                 LogHelpers.log_step("滾動到按鈕位置...")
                 add_to_cart_button.scroll_into_view_if_needed()
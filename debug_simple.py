@@ -6,6 +6,7 @@
 from playwright.sync_api import sync_playwright
 from pages.cart_page import CartPage
 from helpers.base_helpers import LogHelpers
+from helpers.product_extractor import ProductExtractor
 
 def debug_product_selection():
     """調試商品選擇流程"""
@@ -54,32 +55,31 @@ def debug_product_selection():
             LogHelpers.log_step("\n[STEP 3] Getting product info...")
             cart_page = CartPage(page)
             
-            # Get all products
-            products = page.locator('[class*="product-item"], [class*="woocommerce-loop-product"], li.product').all()
+            # Get all products in one in-page evaluation
+            products = ProductExtractor.extract(page)
             LogHelpers.log_step(f"Found {len(products)} products on page")
+            for product in products[:5]:
+                LogHelpers.log_step(
+                    f"  #{product['index']} {product['name']} | {product['price']} | "
+                    f"addable={product['can_add_to_cart']} variants={product['has_variants']} in_stock={product['in_stock']}"
+                )
             
-            if len(products) > 0:
-                # Scroll to first product
-                products[0].scroll_into_view_if_needed()
-                page.wait_for_timeout(1000)
-                
-                product_info = cart_page.get_first_product_info()
+            product = ProductExtractor.first_addable(products)
+            if product is not None:
+                product_info = {'name': product['name'], 'price': product['price']}
                 LogHelpers.log_step(f"Product name: {product_info['name']}")
                 LogHelpers.log_step(f"Product price: {product_info['price']}")
             
             # Step 4: Find and click add to cart
             LogHelpers.log_step("\n[STEP 4] Looking for add to cart button...")
-            add_buttons = page.locator('button:has-text("加入購物車")').all()
-            LogHelpers.log_step(f"Found {len(add_buttons)} add to cart buttons")
             
-            if len(add_buttons) > 0:
-                # Click the first button
-                LogHelpers.log_step("Scrolling to first button...")
-                add_buttons[0].scroll_into_view_if_needed()
-                page.wait_for_timeout(1000)
+            if product is not None:
+                add_button = ProductExtractor.add_to_cart_button(page, product)
+                LogHelpers.log_step("Scrolling to product button...")
+                add_button.scroll_into_view_if_needed()
                 
                 LogHelpers.log_step("Clicking add to cart button...")
-                add_buttons[0].click(force=True)
+                add_button.click(force=True)
                 LogHelpers.log_step("OK: Button clicked")
                 
                 page.wait_for_timeout(3000)
@@ -5,6 +5,7 @@
 """
 from playwright.sync_api import sync_playwright
 from helpers.base_helpers import LogHelpers
+from helpers.product_extractor import ProductExtractor
 import json
 
 def diagnose_page_structure():
@@ -55,17 +56,16 @@ def diagnose_page_structure():
             all_links = page.locator('a').all()
             LogHelpers.log_step(f"Total links: {len(all_links)}")
             
-            # 查找 href 包含 product 的鏈接
-            product_links = page.locator('a[href*="product"]').all()
-            LogHelpers.log_step(f"Product links (with /product/): {len(product_links)}")
+            # 一次讀取所有商品記錄
+            products = ProductExtractor.extract(page)
+            LogHelpers.log_step(f"Products (a.woocommerce-loop-product__link): {len(products)}")
             
-            if len(product_links) > 0:
-                for i, link in enumerate(product_links[:5]):  # 只看前 5 個
-                    href = link.get_attribute('href')
-                    text = link.text_content().strip()[:50]
-                    if text:
-                        LogHelpers.log_step(f"  {i+1}. {text}")
-                        LogHelpers.log_step(f"     URL: {href}")
+            for product in products[:5]:  # 只看前 5 個
+                LogHelpers.log_step(f"  {product['index'] + 1}. {product['name'][:50]} | {product['price']}")
+                LogHelpers.log_step(f"     URL: {product['url']}")
+                LogHelpers.log_step(
+                    f"     addable={product['can_add_to_cart']} variants={product['has_variants']} in_stock={product['in_stock']}"
+                )
             
             # 查看頁面的 H2/H3 元素
             LogHelpers.log_step("\n[4] Product titles (H2/H3)...")
@@ -0,0 +1,269 @@
+"""共享的磁碟資源快取 - 跨上下文與 pytest session 重複使用可快取的靜態資源"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from playwright.sync_api import APIResponse, BrowserContext, Route
+
+from helpers.file_lock import FileLock
+
+# 快取目錄（blobs/ 以內容 SHA-256 命名，index.json 記錄 URL 與 blob 的對應）
+CACHE_DIR = Path("./.pw_cache/assets")
+
+# 只快取靜態資源
+CACHEABLE_RESOURCE_TYPES = frozenset({"script", "stylesheet", "font", "image"})
+
+# 回應內容已被解碼，這些標頭不能原樣回傳
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+# 不儲存的標頭：快取的回應會在其他上下文與 session 重播，不能帶著原本取得時的 cookie
+_UNCACHED_HEADERS = frozenset({"set-cookie", "set-cookie2"})
+
+# 只有 Last-Modified 時的啟發式有效期：距上次修改時間的 10%（RFC 9111 4.2.2），最多一天
+_HEURISTIC_FRACTION = 0.1
+_HEURISTIC_MAX = 86400
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float) -> Optional[float]:
+    """
+    依快取標頭計算回應的有效秒數
+
+    返回: None 表示不可快取，0 表示可儲存但每次使用前都需重新驗證
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "private" in cache_control:
+        return None
+
+    vary = headers.get("vary", "").lower().replace(" ", "")
+    if vary and vary not in ("accept-encoding", "origin", "origin,accept-encoding", "accept-encoding,origin"):
+        return None
+
+    if "no-cache" in cache_control:
+        return 0.0
+
+    match = re.search(r"(?:s-maxage|max-age)=(\d+)", cache_control)
+    if match:
+        return float(match.group(1))
+
+    expires = _parse_http_date(headers.get("expires"))
+    if expires is not None:
+        date = _parse_http_date(headers.get("date")) or now
+        return max(0.0, expires - date)
+
+    last_modified = _parse_http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        return min(_HEURISTIC_MAX, max(0.0, (now - last_modified) * _HEURISTIC_FRACTION))
+
+    # 沒有有效期但有 ETag，仍可儲存並以條件請求重新驗證
+    return 0.0 if headers.get("etag") else None
+
+
+class AssetCache:
+    """
+    內容定址的磁碟快取，作為 context.route 的路由處理器
+
+    - 新鮮的項目直接由本機回應；過期但有 ETag / Last-Modified 的項目發送條件請求重新驗證
+    - 總大小超過 max_bytes 時依最近使用時間（LRU）淘汰（儲存時與 close() 時）
+    - close() 時在檔案鎖內將索引與其他 worker 的索引合併後寫回
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index: Dict[str, Dict] = self._load_index()
+        self.total_bytes = self._total_bytes()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0, "bytes_served": 0}
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _total_bytes(self) -> int:
+        """索引引用的 blob 總大小（共用的 blob 只計算一次）"""
+        return sum({entry["blob"]: entry["size"] for entry in self.index.values()}.values())
+
+    @staticmethod
+    def _key(method: str, url: str) -> str:
+        return f"{method} {url}"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest
+
+    def apply(self, context: BrowserContext):
+        """在上下文上註冊快取路由"""
+        context.route("**/*", self.handle)
+
+    def handle(self, route: Route):
+        """路由處理器：命中則由磁碟回應，否則取得真實回應並視快取標頭儲存"""
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            route.fallback()
+            return
+
+        key = self._key(request.method, request.url)
+        entry = self.index.get(key)
+        now = time.time()
+
+        if entry is not None and not self._blob_path(entry["blob"]).exists():
+            self.index.pop(key, None)
+            entry = None
+
+        if entry is not None and entry["expires_at"] > now:
+            self.stats["hits"] += 1
+            self._fulfill_from_cache(route, entry, now)
+            return
+
+        headers = dict(request.headers)
+        if entry is not None:
+            # 過期項目：帶上驗證器發送條件請求
+            if entry["headers"].get("etag"):
+                headers["if-none-match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                headers["if-modified-since"] = entry["headers"]["last-modified"]
+
+        try:
+            response = route.fetch(headers=headers)
+        except Exception:
+            # 取得失敗時交給其他路由或瀏覽器自行處理
+            route.fallback()
+            return
+
+        if entry is not None and response.status == 304:
+            self.stats["revalidated"] += 1
+            merged = dict(entry["headers"], **self._stored_headers(response.headers))
+            lifetime = freshness_lifetime(merged, now)
+            entry["expires_at"] = now + (lifetime or 0.0)
+            self._fulfill_from_cache(route, entry, now)
+            return
+
+        self.stats["misses"] += 1
+        body = response.body()
+        self._store(key, response, body, now)
+        route.fulfill(status=response.status, headers=self._response_headers(response.headers), body=body)
+
+    def _fulfill_from_cache(self, route: Route, entry: Dict, now: float):
+        body = self._blob_path(entry["blob"]).read_bytes()
+        entry["last_access"] = now
+        self.stats["bytes_served"] += len(body)
+        headers = self._stored_headers(self._response_headers(entry["headers"]))
+        route.fulfill(status=entry["status"], headers=headers, body=body)
+
+    @staticmethod
+    def _response_headers(headers: Dict[str, str]) -> Dict[str, str]:
+        return {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+
+    @staticmethod
+    def _stored_headers(headers: Dict[str, str]) -> Dict[str, str]:
+        """儲存與重播的標頭（小寫，不含 Set-Cookie）"""
+        return {k.lower(): v for k, v in headers.items() if k.lower() not in _UNCACHED_HEADERS}
+
+    def _store(self, key: str, response: APIResponse, body: bytes, now: float):
+        """可快取的回應寫入磁碟（內容相同的資源共用同一個 blob）"""
+        if response.status != 200:
+            return
+        headers = self._stored_headers(response.headers)
+        lifetime = freshness_lifetime(headers, now)
+        if lifetime is None or len(body) > self.max_bytes:
+            return
+
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        new_blob = not any(entry["blob"] == digest for entry in self.index.values())
+        if not blob_path.exists():
+            # 暫存檔名包含程序 ID，多個 worker 同時寫入同一個 blob 時不會互相覆蓋
+            tmp_path = blob_path.with_name(f"{digest}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, blob_path)
+
+        self.index[key] = {
+            "blob": digest,
+            "status": response.status,
+            "headers": headers,
+            "size": len(body),
+            "stored_at": now,
+            "expires_at": now + lifetime,
+            "last_access": now,
+        }
+        self.stats["stored"] += 1
+        if new_blob:
+            self.total_bytes += len(body)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """依 LRU 淘汰項目直到總大小不超過上限，並刪除不再被引用的 blob"""
+        sizes = {}
+        for entry in self.index.values():
+            sizes[entry["blob"]] = entry["size"]
+        total = sum(sizes.values())
+
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            del self.index[key]
+            self.stats["evicted"] += 1
+            if not any(e["blob"] == entry["blob"] for e in self.index.values()):
+                total -= sizes.pop(entry["blob"], 0)
+                self._blob_path(entry["blob"]).unlink(missing_ok=True)
+        self.total_bytes = total
+
+    def close(self):
+        """在檔案鎖內合併磁碟上（其他 worker 寫入）的索引、淘汰後寫回"""
+        with FileLock(self.index_path.with_suffix(".lock")):
+            on_disk = self._load_index()
+            for key, entry in on_disk.items():
+                mine = self.index.get(key)
+                if mine is None or entry["last_access"] > mine["last_access"]:
+                    if self._blob_path(entry["blob"]).exists():
+                        self.index[key] = entry
+            self.evict()
+
+            tmp_path = self.index_path.with_name(f"index.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._hit_ratio(self.stats)
+
+    @staticmethod
+    def _hit_ratio(stats: Dict) -> float:
+        served = stats["hits"] + stats["revalidated"]
+        total = served + stats["misses"]
+        return served / total if total else 0.0
+
+    def summary(self) -> str:
+        """快取統計摘要"""
+        return self.format_summary(self.stats)
+
+    @staticmethod
+    def format_summary(stats: Dict) -> str:
+        """由統計計數器產生摘要（平行模式的主程序以合併後的統計呼叫）"""
+        return (
+            f"資源快取: 命中 {stats['hits']}、重新驗證 {stats['revalidated']}、"
+            f"未命中 {stats['misses']}（命中率 {AssetCache._hit_ratio(stats):.1%}），"
+            f"本機提供 {stats['bytes_served'] / 1024 / 1024:.1f} MB，"
+            f"新增 {stats['stored']}、淘汰 {stats['evicted']}"
+        )
@@ -0,0 +1,121 @@
+"""公共輔助函數的 async 版本 - 供 playwright.async_api 的頁面物件使用"""
+
+from typing import Awaitable, Callable, Optional, Union
+
+from playwright.async_api import Locator, Page, Response, expect
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from helpers.base_helpers import _DOM_STABLE_SCRIPT, LogHelpers
+
+
+class AsyncWaitHelpers:
+    """
+    WaitHelpers 的 async 版本（方法名稱與參數相同）
+
+    等待期間會讓出事件迴圈，同一程序中的其他流程可以同時進行
+    """
+
+    @staticmethod
+    async def wait_for_element(page: Page, locator, timeout: int = 5000):
+        """等待元素出現"""
+        try:
+            await page.wait_for_selector(locator, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    async def wait_and_click(page: Page, selector: str, timeout: int = 5000):
+        """等待元素出現後點擊"""
+        await page.wait_for_selector(selector, timeout=timeout)
+        await page.click(selector)
+
+    @staticmethod
+    async def wait_for_navigation(page: Page, callback: Callable[[], Awaitable], timeout: int = 5000):
+        """等待頁面導航"""
+        async with page.expect_navigation(timeout=timeout):
+            await callback()
+
+    @staticmethod
+    async def wait_for_dom_stable(page: Page, quiet_ms: int = 300, timeout: int = 5000) -> bool:
+        """
+        等待 DOM 停止變動（以 MutationObserver 偵測，單次往返）
+
+        返回: 在 timeout 內達到穩定為 True，否則為 False
+        """
+        try:
+            return bool(await page.evaluate(_DOM_STABLE_SCRIPT, [quiet_ms, timeout]))
+        except Exception:
+            return False
+
+    @staticmethod
+    async def wait_for_visible(locator: Locator, timeout: int = 5000) -> bool:
+        """等待元素可見"""
+        try:
+            await locator.wait_for(state="visible", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    async def wait_for_hidden(locator: Locator, timeout: int = 5000) -> bool:
+        """等待元素隱藏或從 DOM 移除"""
+        try:
+            await locator.wait_for(state="hidden", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    async def wait_for_enabled(locator: Locator, timeout: int = 5000) -> bool:
+        """等待元素可見且可操作（未被 disabled）"""
+        try:
+            await expect(locator).to_be_visible(timeout=timeout)
+            await expect(locator).to_be_enabled(timeout=timeout)
+            return True
+        except AssertionError:
+            return False
+
+    @staticmethod
+    async def wait_for_any_visible(page: Page, selector: str, timeout: int = 5000) -> bool:
+        """等待符合選擇器（可用逗號組合多個）的任一元素可見"""
+        return await AsyncWaitHelpers.wait_for_visible(page.locator(selector).first, timeout=timeout)
+
+    @staticmethod
+    async def wait_for_count_change(locator: Locator, previous_count: int, timeout: int = 5000) -> bool:
+        """等待元素數量與 previous_count 不同（例如刪除商品後列表更新）"""
+        try:
+            await expect(locator).not_to_have_count(previous_count, timeout=timeout)
+            return True
+        except AssertionError:
+            return False
+
+    @staticmethod
+    async def wait_for_response(page: Page, url_or_predicate: Union[str, Callable[[Response], bool]],
+                                action: Callable[[], Awaitable], timeout: int = 5000) -> Optional[Response]:
+        """
+        執行 action 並等待符合條件的網路回應
+
+        返回: 符合的 Response，逾時則為 None（action 仍會執行）
+        """
+        action_done = False
+        try:
+            async with page.expect_response(url_or_predicate, timeout=timeout) as response_info:
+                await action()
+                action_done = True
+            return await response_info.value
+        except PlaywrightTimeoutError:
+            # action 本身逾時要往外拋，只有等待回應逾時才回傳 None
+            if not action_done:
+                raise
+            return None
+
+    @staticmethod
+    async def pause(page: Page, milliseconds: int, reason: str):
+        """
+        刻意的固定等待（例如速率限制冷卻、非 headless 模式下的觀察時間）
+
+        只用於沒有可等待條件的情況，必須註明原因（記錄在 DEBUG 日誌中）
+        """
+        LogHelpers.debug("固定等待 %dms：%s", milliseconds, reason)
+        await page.wait_for_timeout(milliseconds)
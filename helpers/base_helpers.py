@@ -1,12 +1,42 @@
 """公共輔助函數 - 等待、日誌、重試等"""
 
+import logging
 import time
-from playwright.sync_api import Page
-from typing import Callable
+from playwright.sync_api import Page, Locator, Response, expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from typing import Callable, Optional, Union
+from helpers.log_sink import LogSink
+from helpers.parallel import get_results_dir
+from helpers.tracing import StepTracer
+
+# 在頁面內等待 DOM 停止變動：quietMs 內沒有任何 mutation 即視為穩定
+_DOM_STABLE_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    const finish = (stable) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadline);
+        resolve(stable);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    const deadline = setTimeout(() => finish(false), timeoutMs);
+})
+"""
 
 
 class WaitHelpers:
-    """等待相關的輔助函數"""
+    """
+    等待相關的輔助函數
+
+    條件式等待引擎：等待 DOM 穩定、特定網路回應、元素可見或可用，
+    條件一旦滿足立即返回，取代固定秒數的 wait_for_timeout
+    """
     
     @staticmethod
     def wait_for_element(page: Page, locator, timeout: int = 5000):
@@ -28,6 +58,91 @@ class WaitHelpers:
         """等待頁面導航"""
         with page.expect_navigation(timeout=timeout):
             callback()
+    
+    @staticmethod
+    def wait_for_dom_stable(page: Page, quiet_ms: int = 300, timeout: int = 5000) -> bool:
+        """
+        等待 DOM 停止變動（以 MutationObserver 偵測，單次往返）
+        
+        返回: 在 timeout 內達到穩定為 True，否則為 False
+        """
+        try:
+            return bool(page.evaluate(_DOM_STABLE_SCRIPT, [quiet_ms, timeout]))
+        except Exception:
+            # 導航中執行環境被銷毀等情況，視為未穩定
+            return False
+    
+    @staticmethod
+    def wait_for_visible(locator: Locator, timeout: int = 5000) -> bool:
+        """等待元素可見"""
+        try:
+            locator.wait_for(state="visible", timeout=timeout)
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def wait_for_hidden(locator: Locator, timeout: int = 5000) -> bool:
+        """等待元素隱藏或從 DOM 移除"""
+        try:
+            locator.wait_for(state="hidden", timeout=timeout)
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def wait_for_enabled(locator: Locator, timeout: int = 5000) -> bool:
+        """等待元素可見且可操作（未被 disabled）"""
+        try:
+            expect(locator).to_be_visible(timeout=timeout)
+            expect(locator).to_be_enabled(timeout=timeout)
+            return True
+        except AssertionError:
+            return False
+    
+    @staticmethod
+    def wait_for_any_visible(page: Page, selector: str, timeout: int = 5000) -> bool:
+        """等待符合選擇器（可用逗號組合多個）的任一元素可見"""
+        return WaitHelpers.wait_for_visible(page.locator(selector).first, timeout=timeout)
+    
+    @staticmethod
+    def wait_for_count_change(locator: Locator, previous_count: int, timeout: int = 5000) -> bool:
+        """等待元素數量與 previous_count 不同（例如刪除商品後列表更新）"""
+        try:
+            expect(locator).not_to_have_count(previous_count, timeout=timeout)
+            return True
+        except AssertionError:
+            return False
+    
+    @staticmethod
+    def wait_for_response(page: Page, url_or_predicate: Union[str, Callable[[Response], bool]],
+                          action: Callable, timeout: int = 5000) -> Optional[Response]:
+        """
+        執行 action 並等待符合條件的網路回應
+        
+        返回: 符合的 Response，逾時則為 None（action 仍會執行）
+        """
+        action_done = False
+        try:
+            with page.expect_response(url_or_predicate, timeout=timeout) as response_info:
+                action()
+                action_done = True
+            return response_info.value
+        except PlaywrightTimeoutError:
+            # action 本身逾時要往外拋，只有等待回應逾時才回傳 None
+            if not action_done:
+                raise
+            return None
+    
+    @staticmethod
+    def pause(page: Page, milliseconds: int, reason: str):
+        """
+        刻意的固定等待（例如速率限制冷卻、非 headless 模式下的觀察時間）
+        
+        只用於沒有可等待條件的情況，必須註明原因（記錄在 DEBUG 日誌中）
+        """
+        LogHelpers.debug("固定等待 %dms：%s", milliseconds, reason)
+        page.wait_for_timeout(milliseconds)
 
 
 class ScreenshotHelpers:
@@ -36,17 +151,74 @@ class ScreenshotHelpers:
     @staticmethod
     def take_screenshot(page: Page, filename: str):
         """截圖"""
-        page.screenshot(path=f"./test-results/{filename}.png")
+        page.screenshot(path=str(get_results_dir() / f"{filename}.png"))
 
 
 class LogHelpers:
-    """日誌相關的輔助函數"""
+    """
+    日誌相關的輔助函數
+
+    - log_step / log_action: 測試步驟（INFO），同時通知步驟追蹤與步驟監聽器
+    - debug / info / warning / error: 分級訊息，參數延遲格式化（log.debug("找到 %d 個按鈕", count)），
+      低於設定等級時在格式化前就返回
+    輸出目標由 LogSink 決定（pytest 下預設寫入每個測試的緩衝區，失敗時才附加到報告）
+
+    其他模組可以用 add_listener 註冊步驟監聽器（例如 FlightRecorder），每次記錄步驟時以步驟文字呼叫；
+    監聽器的例外不影響測試
+    """
+
+    _listeners = []
+    
+    @staticmethod
+    def add_listener(listener: Callable[[str], None]):
+        """註冊步驟監聽器（重複註冊只保留一個）"""
+        if listener not in LogHelpers._listeners:
+            LogHelpers._listeners.append(listener)
+    
+    @staticmethod
+    def remove_listener(listener: Callable[[str], None]):
+        """移除步驟監聽器"""
+        if listener in LogHelpers._listeners:
+            LogHelpers._listeners.remove(listener)
+    
+    @staticmethod
+    def _notify(step: str):
+        for listener in list(LogHelpers._listeners):
+            try:
+                listener(step)
+            except Exception:
+                pass
+    
+    @staticmethod
+    def log(level: int, message: str, *args):
+        """記錄分級訊息（未啟用的等級不格式化、不輸出）"""
+        logger = LogSink.logger
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(level, message, *args)
+    
+    @staticmethod
+    def debug(message: str, *args):
+        LogHelpers.log(logging.DEBUG, message, *args)
+    
+    @staticmethod
+    def info(message: str, *args):
+        LogHelpers.log(logging.INFO, message, *args)
+    
+    @staticmethod
+    def warning(message: str, *args):
+        LogHelpers.log(logging.WARNING, message, *args)
+    
+    @staticmethod
+    def error(message: str, *args):
+        LogHelpers.log(logging.ERROR, message, *args)
     
     @staticmethod
     def log_action(action: str):
         """記錄操作"""
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] {action}")
+        LogHelpers.log(logging.INFO, "[%s] %s", time.strftime("%Y-%m-%d %H:%M:%S"), action)
+        StepTracer.step(action)
+        LogHelpers._notify(action)
     
     @staticmethod
     def log_step(step_info, description: str = None):
@@ -56,13 +228,19 @@ class LogHelpers:
         支援兩種用法：
         1. log_step("描述文字") - 簡單描述
         2. log_step(1, "描述文字") - 包含步驟號
+        
+        啟用 --trace-steps 時，每次呼叫結束同一層的上一個步驟區段並開始新的區段
         """
         if isinstance(step_info, int):
             # 格式：log_step(1, "描述")
-            print(f"\n--- Step {step_info}: {description} ---")
+            step = f"Step {step_info}: {description}"
+            LogHelpers.log(logging.INFO, "--- %s ---", step)
         else:
             # 格式：log_step("描述")
-            print(f"\n>> {step_info}")
+            step = str(step_info).strip()
+            LogHelpers.log(logging.INFO, ">> %s", step_info)
+        StepTracer.step(step)
+        LogHelpers._notify(step)
 
 
 class RetryHelpers:
@@ -70,7 +248,11 @@ class RetryHelpers:
     
     @staticmethod
     def retry_action(func: Callable, retries: int = 3, delay: float = 0.5):
-        """重試執行函數"""
+        """
+        重試執行函數（最多執行 retries 次，每次間隔 delay 秒，任何例外都重試）
+
+        不經過 RetryEngine，不計入重試預算與斷路器；需要依錯誤類型的策略時使用 RetryEngine.shared().run()
+        """
         for attempt in range(retries):
             try:
                 return func()
@@ -0,0 +1,207 @@
+"""常駐瀏覽器 - 跨 pytest 執行共用同一個 Chromium，省去每次執行的瀏覽器啟動時間"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional
+
+DAEMON_DIR = Path("./.pw_cache")
+ENDPOINT_FILE = DAEMON_DIR / "browser_daemon.json"
+PROFILE_DIR = DAEMON_DIR / "browser_daemon_profile"
+DEFAULT_PORT = 9333
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# 常駐程序檢查閒置狀態的間隔（秒）
+POLL_INTERVAL = 15
+
+
+class BrowserDaemon:
+    """
+    常駐瀏覽器的啟動、尋找與健康檢查
+
+    Python 版 Playwright 沒有 launch_server，因此直接以 Playwright 安裝的 Chromium 執行檔
+    加上 --remote-debugging-port 啟動，並將端點寫入 .pw_cache/browser_daemon.json；
+    browser fixture 讀取端點、以 /json/version 檢查健康狀態後用 connect_over_cdp 連線
+
+    閒置判斷：連線端在連線與中斷時更新端點檔案的修改時間；
+    超過 idle_timeout 沒有連線活動，且瀏覽器中沒有開啟中的網頁時自動關閉
+    """
+
+    def __init__(self, endpoint_file: Path = ENDPOINT_FILE):
+        self.endpoint_file = Path(endpoint_file)
+
+    # ============ 連線端 ============
+
+    def read_endpoint(self) -> Optional[Dict]:
+        """讀取端點檔案，不存在或損壞時為 None"""
+        try:
+            with open(self.endpoint_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def health_check(port: int, timeout: float = 1.0) -> Optional[Dict]:
+        """GET /json/version，瀏覽器回應時返回版本資訊，否則為 None"""
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def available(self) -> Optional[Dict]:
+        """
+        常駐瀏覽器可用時返回端點資訊
+
+        健康檢查失敗（程序已結束或無回應）時刪除過時的端點檔案
+        """
+        endpoint = self.read_endpoint()
+        if endpoint is None:
+            return None
+        if self.health_check(endpoint["port"]) is None:
+            self._remove_endpoint()
+            return None
+        return endpoint
+
+    def touch(self):
+        """記錄連線活動（延後閒置關閉）"""
+        try:
+            os.utime(self.endpoint_file)
+        except OSError:
+            pass
+
+    def connect(self, playwright):
+        """
+        連線到常駐瀏覽器
+
+        返回: Browser，沒有可用的常駐瀏覽器或連線失敗時為 None
+        （Browser.close() 只中斷連線並關閉此連線建立的上下文，不會關閉常駐瀏覽器）
+        """
+        endpoint = self.available()
+        if endpoint is None:
+            return None
+        try:
+            browser = playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{endpoint['port']}", timeout=5000)
+        except Exception:
+            return None
+        self.touch()
+        return browser
+
+    @staticmethod
+    def free_port() -> int:
+        """取得目前未使用的本機連接埠（自行啟動的瀏覽器開放 CDP 連線用）"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    # ============ 常駐程序端 ============
+
+    def start(self, executable: str, port: int = DEFAULT_PORT, headless: bool = False,
+              timeout: float = 15.0) -> Dict:
+        """
+        啟動瀏覽器並寫入端點檔案
+
+        已有可用的常駐瀏覽器時直接返回其端點
+        """
+        endpoint = self.available()
+        if endpoint is not None:
+            return endpoint
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        args = [
+            executable,
+            f"--remote-debugging-port={port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={PROFILE_DIR.resolve()}",
+            "--no-first-run",
+            "--no-default-browser-check",
+        ]
+        if headless:
+            args.append("--headless=new")
+        args.append("about:blank")
+        process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + timeout
+        version = None
+        while version is None:
+            if process.poll() is not None:
+                raise RuntimeError(f"瀏覽器啟動失敗（結束代碼 {process.returncode}）")
+            if time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"瀏覽器在 {timeout:.0f} 秒內未回應 /json/version（port {port}）")
+            time.sleep(0.2)
+            version = self.health_check(port)
+
+        endpoint = {
+            "pid": process.pid,
+            "port": port,
+            "ws_endpoint": version.get("webSocketDebuggerUrl"),
+            "browser": version.get("Browser"),
+            "headless": headless,
+            "started_at": time.time(),
+        }
+        self.endpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.endpoint_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(endpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.endpoint_file)
+        return endpoint
+
+    def _open_pages(self, port: int) -> int:
+        """瀏覽器中開啟中的網頁數（不含空白頁）"""
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=1.0) as response:
+                targets = json.loads(response.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return 0
+        return sum(1 for target in targets if target.get("type") == "page" and target.get("url") != "about:blank")
+
+    def idle_seconds(self, endpoint: Dict) -> float:
+        """距離最後一次連線活動的秒數（有開啟中的網頁時視為使用中）"""
+        if self._open_pages(endpoint["port"]):
+            self.touch()
+            return 0.0
+        try:
+            return time.time() - self.endpoint_file.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def serve(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, poll_interval: float = POLL_INTERVAL):
+        """在前景等待，直到瀏覽器結束、健康檢查失敗或閒置超過 idle_timeout"""
+        endpoint = self.read_endpoint()
+        if endpoint is None:
+            raise RuntimeError("常駐瀏覽器尚未啟動")
+        try:
+            while True:
+                time.sleep(poll_interval)
+                if self.health_check(endpoint["port"]) is None:
+                    print("⚠️ 常駐瀏覽器已結束或無回應")
+                    break
+                if self.idle_seconds(endpoint) > idle_timeout:
+                    print(f"💤 閒置超過 {idle_timeout:.0f} 秒，關閉常駐瀏覽器")
+                    break
+        finally:
+            self.stop()
+
+    def stop(self) -> bool:
+        """關閉常駐瀏覽器並刪除端點檔案，返回是否有瀏覽器被關閉"""
+        endpoint = self.read_endpoint()
+        self._remove_endpoint()
+        if endpoint is None:
+            return False
+        try:
+            os.kill(endpoint["pid"], signal.SIGTERM)
+        except OSError:
+            return False
+        return True
+
+    def _remove_endpoint(self):
+        try:
+            self.endpoint_file.unlink()
+        except FileNotFoundError:
+            pass
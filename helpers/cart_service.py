@@ -0,0 +1,139 @@
+"""購物車 API - 透過 WooCommerce Store API 直接準備購物車狀態，不經過 UI"""
+
+from typing import Dict, List, Optional
+
+from playwright.sync_api import APIResponse, BrowserContext
+
+from helpers.rate_governor import RateGovernor
+
+BASE_URL = "https://www.dogcatstar.com"
+# Store API 路由（batch 請求內的 path 使用不含 /wp-json 的路由）
+STORE_ROUTE = "/wc/store/v1"
+STORE_API = "/wp-json" + STORE_ROUTE
+
+# nonce 失效時 Store API 回傳的錯誤代碼
+_NONCE_ERRORS = ("woocommerce_rest_missing_nonce", "woocommerce_rest_invalid_nonce")
+
+
+def _retry_after(response: APIResponse) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+class CartService:
+    """
+    以 BrowserContext 的 request 物件呼叫 Store API
+
+    與瀏覽器上下文共用 cookie，因此操作的是同一個（已登入使用者的）購物車。
+    每個操作一次 HTTP 請求；寫入操作需要 Store API 的 Nonce，第一次需要時由 GET /cart 取得
+    """
+
+    def __init__(self, context: BrowserContext, base_url: str = BASE_URL, recording=None):
+        self.request = context.request
+        self.base_url = base_url.rstrip("/")
+        # HAR 錄製 / 重播模式下的 ApiRecording（重播時不送出任何請求）
+        self.recording = recording
+        self._nonce: Optional[str] = None
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{STORE_API}{path}"
+
+    def _fetch(self, url: str, method: str = "GET", data: Optional[Dict] = None,
+               headers: Optional[Dict[str, str]] = None) -> APIResponse:
+        if self.recording is not None and self.recording.replaying:
+            return self.recording.replay(method, url)
+        response = self.request.fetch(url, method=method, data=data, headers=headers)
+        if self.recording is not None:
+            self.recording.record(method, url, response)
+        return response
+
+    def _remember_nonce(self, response: APIResponse):
+        nonce = response.headers.get("nonce") or response.headers.get("x-wc-store-api-nonce")
+        if nonce:
+            self._nonce = nonce
+
+    def _check(self, response: APIResponse, action: str):
+        if response.status == 429:
+            RateGovernor.shared().report_rate_limit(_retry_after(response))
+        if not response.ok:
+            raise RuntimeError(f"購物車 API {action} 失敗: HTTP {response.status} {response.text()[:200]}")
+
+    def _write(self, method: str, path: str, data: Optional[Dict] = None) -> APIResponse:
+        """帶 Nonce 的寫入請求；nonce 失效時重新取得並重試一次"""
+        for attempt in range(2):
+            if self._nonce is None:
+                self.get_cart()
+            response = self._fetch(self._url(path), method=method, data=data, headers={"Nonce": self._nonce})
+            self._remember_nonce(response)
+            if response.status in (401, 403) and attempt == 0 and any(
+                    code in response.text() for code in _NONCE_ERRORS):
+                self._nonce = None
+                continue
+            self._check(response, f"{method} {path}")
+            return response
+
+    def get_cart(self) -> Dict:
+        """讀取完整購物車內容"""
+        response = self._fetch(self._url("/cart"))
+        self._remember_nonce(response)
+        self._check(response, "GET /cart")
+        return response.json()
+
+    def items(self) -> List[Dict]:
+        """購物車商品 [{'key', 'id', 'name', 'quantity'}, ...]"""
+        return [
+            {"key": item["key"], "id": item["id"], "name": item.get("name", ""), "quantity": item["quantity"]}
+            for item in self.get_cart().get("items", [])
+        ]
+
+    def items_count(self) -> int:
+        """購物車商品總數量"""
+        return self.get_cart().get("items_count", 0)
+
+    def first_addable_product_id(self) -> Optional[int]:
+        """
+        第一個可直接加入購物車的商品 ID（簡單商品、可購買、有庫存），沒有時為 None
+
+        可變商品需要先選擇規格，不適合直接以 add-item 加入
+        """
+        response = self._fetch(self._url("/products?type=simple&stock_status=instock&per_page=20"))
+        self._check(response, "GET /products")
+        for product in response.json():
+            if product.get("is_purchasable") and product.get("is_in_stock") and not product.get("has_options"):
+                return product["id"]
+        return None
+
+    def clear(self):
+        """一次清空購物車"""
+        self._write("DELETE", "/cart/items")
+
+    def add_product(self, product_id: int, quantity: int = 1, variation: Optional[List[Dict]] = None) -> Dict:
+        """加入單一商品（variation 例如 [{'attribute': '款式', 'value': '標準款'}]）"""
+        return self.add_products([{"id": product_id, "quantity": quantity, "variation": variation}])
+
+    def add_products(self, products: List[Dict]) -> Dict:
+        """
+        加入多個商品（多個商品時以 batch 端點一次送出）
+
+        參數:
+            products: [{'id': 商品 ID, 'quantity': 數量, 'variation': [...]}, ...]
+        返回: 更新後的購物車（batch 時為 batch 回應）
+        """
+        bodies = []
+        for product in products:
+            body = {"id": product["id"], "quantity": product.get("quantity", 1)}
+            if product.get("variation"):
+                body["variation"] = product["variation"]
+            bodies.append(body)
+
+        RateGovernor.shared().acquire("add_to_cart")
+        if len(bodies) == 1:
+            return self._write("POST", "/cart/add-item", bodies[0]).json()
+
+        requests = [
+            {"method": "POST", "path": f"{STORE_ROUTE}/cart/add-item", "body": body}
+            for body in bodies
+        ]
+        return self._write("POST", "/batch", {"requests": requests}).json()
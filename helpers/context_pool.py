@@ -0,0 +1,210 @@
+"""BrowserContext 池 - 預先建立上下文並在租借之間重置狀態，取代每個測試都 new_context()"""
+
+import json
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Set, Union
+from urllib.parse import urlparse
+
+from playwright.sync_api import Browser, BrowserContext
+
+# 重置 storage 時用來載入各來源的空白頁面（經由路由攔截，不會發出真實請求）
+_BLANK_PATH = "/__context_pool_reset__"
+
+# 清除目前頁面來源的 localStorage / sessionStorage，並還原 storage state 中屬於該來源的項目
+_RESET_STORAGE_SCRIPT = """
+(origins) => {
+    try {
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+        const saved = origins.find(o => o.origin === window.location.origin);
+        if (saved) {
+            for (const item of saved.localStorage || []) {
+                window.localStorage.setItem(item.name, item.value);
+            }
+        }
+    } catch (e) {
+        // about:blank 等頁面沒有可用的 storage
+    }
+}
+"""
+
+
+class ContextPool:
+    """
+    有上限的 BrowserContext 池
+
+    - 預先建立上下文（warm_up），測試透過 acquire/release 或 lease() 租借
+    - 歸還時清除 cookies、storage 與權限；帶有 storage state 的池會還原登入 cookies
+    - 每個上下文使用 max_uses 次後關閉並重新建立，避免記憶體持續增長
+    """
+
+    def __init__(self, browser: Browser, size: int = 1, max_uses: int = 20,
+                 storage_state: Optional[Union[str, Dict]] = None, name: str = "anonymous"):
+        self.browser = browser
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.name = name
+        self.storage_state = storage_state
+        self._idle = deque()
+        self._leased = set()
+        self._uses = {}
+        self._origins = {}
+        self._pending_state = None
+        self.stats = {"created": 0, "leases": 0, "recycled": 0, "reset_failures": 0}
+
+    @property
+    def _state(self) -> Dict:
+        """取得已解析的 storage state（用於歸還時還原 cookies 與 localStorage）"""
+        if self.storage_state is None:
+            return {"cookies": [], "origins": []}
+        if isinstance(self.storage_state, dict):
+            return self.storage_state
+        with open(self.storage_state, "r", encoding="utf-8") as f:
+            self.storage_state = json.load(f)
+        return self.storage_state
+
+    def _create(self) -> BrowserContext:
+        """建立新的上下文"""
+        if self.storage_state is not None:
+            context = self.browser.new_context(storage_state=self._state)
+        else:
+            context = self.browser.new_context()
+        self._uses[context] = 0
+        self._origins[context] = set()
+        context.on("page", lambda page: self._track_origins(context, page))
+        self.stats["created"] += 1
+        return context
+
+    def _track_origins(self, context: BrowserContext, page):
+        """記錄頁面主框架造訪過的來源，歸還時只需清除這些來源的 storage"""
+        def on_navigated(frame):
+            if frame == page.main_frame:
+                parsed = urlparse(frame.url)
+                if parsed.scheme in ("http", "https"):
+                    self._origins.setdefault(context, set()).add(f"{parsed.scheme}://{parsed.netloc}")
+
+        page.on("framenavigated", on_navigated)
+
+    def _discard(self, context: BrowserContext):
+        """關閉並移除上下文"""
+        self._uses.pop(context, None)
+        self._origins.pop(context, None)
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    def warm_up(self):
+        """預先建立上下文直到池滿"""
+        while len(self._idle) + len(self._leased) < self.size:
+            self._idle.append(self._create())
+
+    def update_storage_state(self, storage_state: Dict):
+        """
+        更換池使用的 storage state（例如登入狀態已更新）
+
+        可從背景執行緒呼叫：實際套用延後到下一次 acquire()，在原執行緒上進行
+        """
+        self._pending_state = storage_state
+
+    def _apply_pending_state(self):
+        """套用新的 storage state：關閉閒置上下文，租借中的上下文歸還時回收"""
+        state, self._pending_state = self._pending_state, None
+        self.storage_state = state
+        while self._idle:
+            self._discard(self._idle.popleft())
+        for context in self._leased:
+            self._uses[context] = self.max_uses
+
+    def acquire(self) -> BrowserContext:
+        """租借一個上下文"""
+        if self._pending_state is not None:
+            self._apply_pending_state()
+
+        if self._idle:
+            context = self._idle.popleft()
+        elif len(self._leased) < self.size:
+            context = self._create()
+        else:
+            raise RuntimeError(f"上下文池 '{self.name}' 已耗盡（上限 {self.size}），請先歸還再租借")
+
+        self._leased.add(context)
+        self._uses[context] += 1
+        self.stats["leases"] += 1
+        return context
+
+    def release(self, context: BrowserContext, discard: bool = False):
+        """
+        歸還上下文：達到使用上限則回收，否則重置狀態後放回池中
+
+        discard=True 時一律關閉（例如 HAR 錄製需要在上下文關閉時寫檔）
+        """
+        self._leased.discard(context)
+
+        if discard or self._uses.get(context, self.max_uses) >= self.max_uses:
+            self._discard(context)
+            self.stats["recycled"] += 1
+            self.warm_up()
+            return
+
+        try:
+            self.reset(context)
+        except Exception:
+            # 重置失敗的上下文不可再用，直接換新
+            self.stats["reset_failures"] += 1
+            self._discard(context)
+            self.warm_up()
+            return
+
+        self._idle.append(context)
+
+    def reset(self, context: BrowserContext):
+        """清除上下文的 cookies、storage、權限和路由，並關閉所有頁面"""
+        state = self._state
+        for page in list(context.pages):
+            page.close()
+
+        # 造訪過的來源 + storage state 中的來源都需要清除 / 還原
+        origins: Set[str] = set(self._origins.get(context, set()))
+        origins.update(o["origin"] for o in state.get("origins", []))
+        if origins:
+            self._reset_storage(context, origins, state.get("origins", []))
+        self._origins[context] = set()
+
+        # 移除租借期間註冊的路由（網路設定檔等），下次租借時重新套用
+        context.unroute_all(behavior="ignoreErrors")
+        context.clear_cookies()
+        context.clear_permissions()
+        if state.get("cookies"):
+            context.add_cookies(state["cookies"])
+
+    @staticmethod
+    def _reset_storage(context: BrowserContext, origins: Set[str], saved_origins):
+        """在每個來源的空白頁面上清除並還原 localStorage / sessionStorage"""
+        page = context.new_page()
+        try:
+            page.route("**/*", lambda route: route.fulfill(
+                status=200, content_type="text/html", body="<html></html>"
+            ))
+            for origin in sorted(origins):
+                page.goto(origin + _BLANK_PATH, wait_until="commit")
+                page.evaluate(_RESET_STORAGE_SCRIPT, saved_origins)
+        finally:
+            page.close()
+
+    @contextmanager
+    def lease(self):
+        """以 with 語法租借上下文，離開時自動歸還"""
+        context = self.acquire()
+        try:
+            yield context
+        finally:
+            self.release(context)
+
+    def close(self):
+        """關閉池中所有上下文"""
+        for context in list(self._idle) + list(self._leased):
+            self._discard(context)
+        self._idle.clear()
+        self._leased.clear()
@@ -0,0 +1,101 @@
+"""測試耗時紀錄 - 保存每個測試的歷史耗時（EWMA），供平行執行時以最長處理時間優先分配"""
+
+import heapq
+import json
+import os
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+from helpers.file_lock import FileLock
+
+DURATIONS_PATH = Path("./.pw_cache/durations.json")
+
+# 新紀錄的權重（越大越快反映最近的耗時）
+EWMA_ALPHA = 0.5
+
+# 沒有任何歷史紀錄時的預估耗時（秒）
+DEFAULT_ESTIMATE = 30.0
+
+
+class DurationStore:
+    """
+    跨執行共用的測試耗時紀錄
+
+    本次執行的耗時先累計在記憶體中（setup + call + teardown），session 結束時 flush() 一次，
+    在檔案鎖內讀取、合併後以 tmp + os.replace 原子寫入，平行 worker 同時寫入也不會互相覆蓋
+    """
+
+    def __init__(self, path: Path = DURATIONS_PATH, alpha: float = EWMA_ALPHA):
+        self.path = Path(path)
+        self.alpha = alpha
+        self.pending: Dict[str, float] = {}
+        self._skipped = set()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, nodeid: str, seconds: float, skipped: bool = False):
+        """累計測試某個階段的耗時（被跳過的測試不寫入紀錄）"""
+        self.pending[nodeid] = self.pending.get(nodeid, 0.0) + seconds
+        if skipped:
+            self._skipped.add(nodeid)
+
+    def flush(self) -> int:
+        """將本次的耗時合併進紀錄檔，返回寫入的測試數"""
+        measured = {nodeid: seconds for nodeid, seconds in self.pending.items() if nodeid not in self._skipped}
+        self.pending.clear()
+        self._skipped.clear()
+        if not measured:
+            return 0
+
+        with FileLock(self.path.with_suffix(".lock")):
+            data = self._read()
+            for nodeid, seconds in measured.items():
+                entry = data.get(nodeid)
+                if entry is None:
+                    data[nodeid] = {"ewma": round(seconds, 3), "last": round(seconds, 3), "runs": 1}
+                else:
+                    entry["ewma"] = round(self.alpha * seconds + (1 - self.alpha) * entry["ewma"], 3)
+                    entry["last"] = round(seconds, 3)
+                    entry["runs"] += 1
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        return len(measured)
+
+    def estimates(self, nodeids: List[str]) -> Dict[str, float]:
+        """
+        各測試的預估耗時
+
+        沒有紀錄的測試使用已知耗時的中位數（完全沒有紀錄時為 DEFAULT_ESTIMATE）
+        """
+        data = self._read()
+        known = [entry["ewma"] for entry in data.values()]
+        default = statistics.median(known) if known else DEFAULT_ESTIMATE
+        return {nodeid: data[nodeid]["ewma"] if nodeid in data else default for nodeid in nodeids}
+
+
+def lpt_schedule(nodeids: List[str], workers: int, estimates: Dict[str, float]) -> List[List[str]]:
+    """
+    最長處理時間優先（LPT）分配
+
+    依預估耗時由長到短，每個測試分配給目前總耗時最少的 worker；
+    各分片內也是由長到短執行（不產生空的分片）
+    """
+    count = min(workers, len(nodeids))
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [(0.0, index) for index in range(count)]
+    ordered = sorted(nodeids, key=lambda nodeid: estimates.get(nodeid, DEFAULT_ESTIMATE), reverse=True)
+    for nodeid in ordered:
+        load, index = heapq.heappop(loads)
+        shards[index].append(nodeid)
+        heapq.heappush(loads, (load + estimates.get(nodeid, DEFAULT_ESTIMATE), index))
+    return shards
@@ -0,0 +1,58 @@
+"""跨程序檔案鎖 - 以 O_EXCL 建立鎖檔，Windows 與 Linux 皆可使用"""
+
+import os
+import time
+from pathlib import Path
+
+
+class FileLock:
+    """
+    簡單的跨程序互斥鎖（with 區塊內持有）
+
+    程序異常結束留下的鎖檔超過 stale_after 秒後視為失效並移除
+    """
+
+    def __init__(self, path, timeout: float = 10.0, stale_after: float = 30.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._fd = None
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return
+            except (FileExistsError, PermissionError):
+                # Windows 上鎖檔正在刪除時會是 PermissionError
+                self._remove_if_stale()
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"無法取得檔案鎖: {self.path}")
+                time.sleep(0.01)
+
+    def _remove_if_stale(self):
+        try:
+            if time.time() - self.path.stat().st_mtime > self.stale_after:
+                self.path.unlink()
+        except OSError:
+            pass
+
+    def release(self):
+        if self._fd is None:
+            return
+        os.close(self._fd)
+        self._fd = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,153 @@
+"""失敗記錄器 - 在記憶體環狀緩衝區保留最近幾個步驟的快照，只在測試失敗時寫入磁碟"""
+
+import json
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Callable, Optional
+from weakref import WeakKeyDictionary
+
+from playwright.sync_api import Page
+
+from helpers.base_helpers import LogHelpers
+
+DEFAULT_CAPACITY = 10
+# 步驟截圖的最短間隔（秒）：間隔內的步驟只記錄 URL 與 DOM 摘要；0 表示步驟不截圖（只在失敗時截圖）
+DEFAULT_SCREENSHOT_INTERVAL = 5.0
+# 單張快照的大小上限（bytes），超過時以較低品質重拍一次，仍超過則只保留 URL 與 DOM 摘要
+DEFAULT_MAX_BYTES = 150 * 1024
+JPEG_QUALITY = 50
+FALLBACK_QUALITY = 20
+DOM_EXCERPT_CHARS = 1500
+
+# 頁面標題、可見的對話框與內文開頭（足以判斷當時畫面，不保存完整 DOM）
+_DOM_EXCERPT_SCRIPT = """
+(limit) => {
+    const text = (el) => (el && el.innerText || '').replace(/\\s+/g, ' ').trim();
+    const dialog = Array.from(document.querySelectorAll('[role="dialog"], .swal2-container, [class*="modal"]'))
+        .find(el => el.getBoundingClientRect().width > 0 && getComputedStyle(el).visibility !== 'hidden');
+    return {
+        title: document.title,
+        dialog: dialog ? text(dialog).slice(0, 300) : null,
+        text: text(document.body).slice(0, limit),
+    };
+}
+"""
+
+
+class FlightRecorder:
+    """
+    單一頁面的快照環狀緩衝區
+
+    每次 LogHelpers 記錄步驟時把 URL 與 DOM 摘要放入 deque(maxlen=capacity)；
+    只有目前的頁面（最後安裝的頁面）會截圖，且兩次截圖至少間隔 screenshot_interval 秒，
+    測試失敗時再拍一張。通過的測試只有記憶體中的快照，失敗時 dump() 才寫檔
+    """
+
+    # 快照數量上限，0 表示停用（由 conftest 依 --flight-recorder 設定）
+    capacity = DEFAULT_CAPACITY
+    screenshot_interval = DEFAULT_SCREENSHOT_INTERVAL
+    _recorders = WeakKeyDictionary()
+    _current: Optional[weakref.ref] = None
+    _listening = False
+
+    def __init__(self, page: Page, capacity: int = DEFAULT_CAPACITY, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.page = page
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.snapshots = deque(maxlen=capacity)
+        self._busy = False
+        self._last_screenshot: Optional[float] = None
+
+    @classmethod
+    def install(cls, page: Page) -> Optional["FlightRecorder"]:
+        """為頁面建立記錄器（每個頁面只建立一次），停用時返回 None"""
+        if cls.capacity <= 0:
+            return None
+        recorder = cls._recorders.get(page)
+        if recorder is None:
+            recorder = cls._recorders[page] = cls(page, capacity=cls.capacity)
+            page.on("close", lambda closed_page: cls._recorders.pop(closed_page, None))
+        cls._current = weakref.ref(page)
+        if not cls._listening:
+            LogHelpers.add_listener(cls.on_step)
+            cls._listening = True
+        return recorder
+
+    @classmethod
+    def for_page(cls, page: Page) -> Optional["FlightRecorder"]:
+        return cls._recorders.get(page)
+
+    @classmethod
+    def on_step(cls, step: str):
+        """步驟監聽器：記錄所有開啟中頁面的 URL 與 DOM 摘要，只有目前的頁面依間隔截圖"""
+        current = cls._current() if cls._current is not None else None
+        for page, recorder in list(cls._recorders.items()):
+            recorder.snapshot(step, screenshot=page is current and recorder._screenshot_due())
+
+    def _screenshot_due(self) -> bool:
+        interval = FlightRecorder.screenshot_interval
+        if interval <= 0:
+            return False
+        return self._last_screenshot is None or self.clock() - self._last_screenshot >= interval
+
+    def _screenshot(self) -> Optional[bytes]:
+        # animations="allow"：不快轉受測頁面的 CSS 動畫（disabled 會觸發 transitionend）
+        image = self.page.screenshot(type="jpeg", quality=JPEG_QUALITY, scale="css", animations="allow",
+                                     caret="initial", timeout=2000)
+        if len(image) > self.max_bytes:
+            image = self.page.screenshot(type="jpeg", quality=FALLBACK_QUALITY, scale="css", animations="allow",
+                                         caret="initial", timeout=2000)
+        self._last_screenshot = self.clock()
+        return image if len(image) <= self.max_bytes else None
+
+    def snapshot(self, step: str, screenshot: bool = True):
+        """記錄快照放入環狀緩衝區（快照過程中觸發的步驟不再遞迴記錄）"""
+        if self._busy or self.page.is_closed():
+            return
+        self._busy = True
+        entry = {"step": step, "time": time.time(), "url": self.page.url, "image": None, "dom": None, "error": None}
+        try:
+            if screenshot:
+                entry["image"] = self._screenshot()
+            entry["dom"] = self.page.evaluate(_DOM_EXCERPT_SCRIPT, DOM_EXCERPT_CHARS)
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            self._busy = False
+        self.snapshots.append(entry)
+
+    def size_bytes(self) -> int:
+        """緩衝區中快照圖片的總大小"""
+        return sum(len(entry["image"]) for entry in self.snapshots if entry["image"])
+
+    def dump(self, directory: Path) -> Optional[Path]:
+        """
+        將緩衝區寫入目錄：<序號>.jpg 與 flight.json（步驟、時間、URL、DOM 摘要）
+
+        返回: flight.json 路徑，沒有快照時為 None
+        """
+        if not self.snapshots:
+            return None
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        index = []
+        for number, entry in enumerate(self.snapshots):
+            image_name = None
+            if entry["image"]:
+                image_name = f"{number:02d}.jpg"
+                (directory / image_name).write_bytes(entry["image"])
+            index.append({
+                "step": entry["step"],
+                "time": time.strftime("%H:%M:%S", time.localtime(entry["time"])),
+                "url": entry["url"],
+                "image": image_name,
+                "dom": entry["dom"],
+                "error": entry["error"],
+            })
+        index_path = directory / "flight.json"
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        return index_path
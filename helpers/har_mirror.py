@@ -0,0 +1,134 @@
+"""HAR 錄製 / 重播 - 錄製真實網站的流量，之後離線且可重現地重播"""
+
+import json
+import re
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import BrowserContext
+
+# HAR 錄製檔的存放目錄（每個測試一個 zip 檔，回應內容以附件形式存放）
+HAR_DIR = Path("./fixtures/har")
+
+# live: 直接連線真實網站；record: 連線並錄製；replay: 只使用錄製檔，不連網
+NETWORK_MODES = ("live", "record", "replay")
+
+
+class RecordedResponse:
+    """重播的 API 回應（提供 CartService 使用到的 APIResponse 介面）"""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.url = entry["url"]
+        self.status = entry["status"]
+        self.headers = entry["headers"]
+        self._body = entry["body"]
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status <= 299
+
+    def text(self) -> str:
+        return self._body
+
+    def json(self):
+        return json.loads(self._body)
+
+
+class ApiRecording:
+    """
+    context.request 的錄製 / 重播
+
+    APIRequestContext 的請求不經過 route_from_har，因此另外存放在 HAR 錄製檔旁的 .api.json；
+    重播時同一個 (method, URL) 的請求依錄製順序取得回應，完全不連網
+    """
+
+    def __init__(self, path: Path, replaying: bool):
+        self.path = Path(path)
+        self.replaying = replaying
+        self.entries: List[Dict[str, Any]] = []
+        self._queues: Dict[tuple, deque] = defaultdict(deque)
+        if replaying and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for entry in json.load(f):
+                    self._queues[(entry["method"], entry["url"])].append(entry)
+
+    def record(self, method: str, url: str, response) -> None:
+        self.entries.append({
+            "method": method,
+            "url": url,
+            "status": response.status,
+            "headers": dict(response.headers),
+            "body": response.text(),
+        })
+
+    def replay(self, method: str, url: str) -> RecordedResponse:
+        queue = self._queues.get((method, url))
+        if not queue:
+            raise RuntimeError(f"API 錄製檔中沒有此請求: {method} {url}（{self.path}）")
+        return RecordedResponse(queue.popleft())
+
+    def save(self):
+        """錄製模式下寫入錄製檔"""
+        if self.replaying:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+
+
+class HarMirror:
+    """依網路模式在 BrowserContext 上套用 HAR 錄製或重播"""
+
+    def __init__(self, mode: str = "live", har_dir: Path = HAR_DIR):
+        if mode not in NETWORK_MODES:
+            raise ValueError(f"未知的網路模式: {mode}（可用: {', '.join(NETWORK_MODES)}）")
+        self.mode = mode
+        self.har_dir = Path(har_dir)
+
+    @property
+    def is_recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def is_replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def har_path(self, nodeid: str) -> Path:
+        """
+        由測試 nodeid 產生錄製檔路徑
+
+        例如 tests/test_cart.py::TestCart::test_x → fixtures/har/test_cart__TestCart__test_x.zip
+        """
+        parts = nodeid.split("::")
+        parts[0] = Path(parts[0]).stem
+        name = "__".join(parts)
+        return self.har_dir / (re.sub(r"[^\w.-]", "_", name) + ".zip")
+
+    def has_recording(self, nodeid: str) -> bool:
+        return self.har_path(nodeid).exists()
+
+    def api_recording(self, nodeid: str) -> Optional[ApiRecording]:
+        """context.request 呼叫的錄製 / 重播（live 模式為 None）"""
+        if self.mode == "live":
+            return None
+        return ApiRecording(self.har_path(nodeid).with_suffix(".api.json"), replaying=self.is_replaying)
+
+    def apply(self, context: BrowserContext, nodeid: str) -> Optional[Path]:
+        """
+        在上下文上套用錄製或重播
+
+        錄製檔在上下文關閉時才會寫入，錄製模式下上下文必須在測試結束時關閉
+        返回: 使用的錄製檔路徑（live 模式為 None）
+        """
+        if self.mode == "live":
+            return None
+
+        har_path = self.har_path(nodeid)
+        if self.is_recording:
+            har_path.parent.mkdir(parents=True, exist_ok=True)
+            context.route_from_har(har_path, update=True, update_content="attach", update_mode="minimal")
+        else:
+            # 錄製檔中沒有的請求一律中止，確保重播時完全不連網
+            context.route_from_har(har_path, not_found="abort")
+        return har_path
@@ -0,0 +1,122 @@
+"""定位器鏈 - 依序的候選選擇器在一次頁面內執行中找出第一個有符合元素的候選"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from playwright.sync_api import Locator, Page
+
+_HAS_TEXT_PATTERN = re.compile(r""":has-text\((?:"([^"]*)"|'([^']*)')\)""")
+# text=、xpath=、internal:role= 等選擇器引擎前綴
+_ENGINE_PREFIX_PATTERN = re.compile(r"^[\w:-]+=")
+_UNSUPPORTED_PSEUDO_PATTERN = re.compile(r":(?:text|text-is|text-matches|visible|nth-match|has|left-of|right-of|above|below|near)\(|:visible\b")
+
+_RESOLVE_SCRIPT = """
+([candidates, visibleOnly]) => {
+    const normalize = (s) => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    for (let index = 0; index < candidates.length; index++) {
+        const matched = new Set();
+        for (const [css, texts] of candidates[index]) {
+            let elements;
+            try {
+                elements = document.querySelectorAll(css);
+            } catch (e) {
+                continue;
+            }
+            for (const el of elements) {
+                if (visibleOnly && !visible(el)) continue;
+                const content = texts.length ? normalize(el.textContent) : '';
+                if (texts.every(text => content.includes(text))) matched.add(el);
+            }
+        }
+        if (matched.size) return [index, matched.size];
+    }
+    return null;
+}
+"""
+
+
+class ChainMatch(NamedTuple):
+    """解析結果：符合的候選序號、候選選擇器、該候選的定位器與解析當下的元素數量"""
+
+    index: int
+    candidate: str
+    locator: Locator
+    count: int
+
+
+def _split_union(selector: str) -> List[str]:
+    """以最外層的逗號切開選擇器（忽略括號與引號內的逗號）"""
+    parts, depth, quote, current = [], 0, None, []
+    for char in selector:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def compile_candidate(candidate: str) -> List[Tuple[str, List[str]]]:
+    """
+    將候選選擇器轉為頁面內可執行的 [(CSS, [必須包含的文字])]
+
+    支援 CSS 與 Playwright 的 :has-text("...")（不分大小寫、包含即符合）；
+    其他 Playwright 專用語法（>>、text=、:text() 等）無法在頁面內執行，拋出 ValueError
+    """
+    compiled = []
+    for part in _split_union(candidate):
+        if ">>" in part or _ENGINE_PREFIX_PATTERN.match(part) or _UNSUPPORTED_PSEUDO_PATTERN.search(part):
+            raise ValueError(f"定位器鏈不支援 Playwright 專用選擇器: {candidate}")
+        texts = [" ".join((a or b).split()).lower() for a, b in _HAS_TEXT_PATTERN.findall(part)]
+        # 單獨的 :has-text（開頭或組合符之後）代表任意元素
+        css = _HAS_TEXT_PATTERN.sub("", re.sub(r"(^|[\s>+~])(?=:has-text\()", r"\1*", part)).strip()
+        compiled.append((css, texts))
+    return compiled
+
+
+class LocatorChain:
+    """
+    依序的候選選擇器
+
+    resolve() 在一次 page.evaluate 中依序檢查各候選，第一個有符合元素的候選獲選（不需逐一 count()）；
+    返回的定位器是該候選本身的選擇器，元素重新渲染後動作時仍會重新解析
+    """
+
+    def __init__(self, name: str, candidates: List[str], visible_only: bool = False):
+        self.name = name
+        self.candidates = list(candidates)
+        self.visible_only = visible_only
+        self._compiled = [compile_candidate(candidate) for candidate in self.candidates]
+
+    def locator(self, page, index: int):
+        """第 index 個候選的定位器（visible_only 時只包含可見的元素）"""
+        candidate = self.candidates[index]
+        return page.locator(f"{candidate} >> visible=true" if self.visible_only else candidate)
+
+    def _match(self, page, result) -> Optional[ChainMatch]:
+        if result is None:
+            return None
+        index, count = result
+        return ChainMatch(index, self.candidates[index], self.locator(page, index), count)
+
+    def resolve(self, page: Page) -> Optional[ChainMatch]:
+        """找出第一個有符合元素的候選，都沒有時為 None"""
+        return self._match(page, page.evaluate(_RESOLVE_SCRIPT, [self._compiled, self.visible_only]))
+
+    async def resolve_async(self, page) -> Optional[ChainMatch]:
+        """resolve() 的 async 版本（playwright.async_api 的 Page）"""
+        return self._match(page, await page.evaluate(_RESOLVE_SCRIPT, [self._compiled, self.visible_only]))
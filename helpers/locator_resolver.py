@@ -0,0 +1,147 @@
+"""多策略定位器解析 - 記住每個頁面 URL 模式下成功的策略，下次優先嘗試"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from playwright.sync_api import Locator, Page
+
+from helpers.file_lock import FileLock
+
+# 成功策略的持久化檔案（跨測試執行保留）
+CACHE_PATH = Path("./.pw_cache/locators.json")
+
+# 策略：(名稱, 建立定位器的函數)
+Strategy = Tuple[str, Callable[[], Locator]]
+
+# 記錄的策略不是第一個策略時，每隔幾次解析依原本的優先順序重新探測（第一次解析直接使用記錄的策略）
+REPROBE_EVERY = 10
+
+
+def url_pattern(url: str) -> str:
+    """
+    將頁面 URL 正規化為模式，同類頁面共用同一組策略紀錄
+
+    例如 https://www.dogcatstar.com/product/123-abc/?x=1 → www.dogcatstar.com/product/*/
+    """
+    parsed = urlparse(url)
+    segments = [re.sub(r".*\d.*", "*", segment) for segment in parsed.path.split("/")]
+    return parsed.netloc + "/".join(segments)
+
+
+class LocatorResolver:
+    """
+    記憶化的多策略定位器解析
+
+    依序以 count() 探測各策略；若已記錄此 URL 模式下的成功策略則優先嘗試，
+    大多數情況只需一次往返。成功策略落空時才依序嘗試其他策略並重新記錄
+
+    兜底定位器（例如任何可見的輸入框）以 fallback 參數傳入，不探測也不記錄，
+    只在所有策略都找不到元素時回傳；記錄的策略不是第一個策略時會定期重新探測
+    """
+
+    _winners: Optional[Dict[str, str]] = None
+    _lookup_counts: Dict[str, int] = {}
+    _dirty = False
+    stats = {"lookups": 0, "memo_hits": 0, "relearned": 0, "reprobes": 0, "probes": 0}
+
+    @classmethod
+    def _load(cls) -> Dict[str, str]:
+        if cls._winners is None:
+            try:
+                with open(CACHE_PATH, "r", encoding="utf-8") as f:
+                    cls._winners = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                cls._winners = {}
+        return cls._winners
+
+    @classmethod
+    def resolve(cls, page: Page, name: str, strategies: List[Strategy],
+                fallback: Optional[Callable[[], Locator]] = None) -> Locator:
+        """
+        解析定位器
+
+        參數:
+            name: 定位器名稱（例如 "CartPage.cat_section_button"）
+            strategies: 依優先順序排列的策略
+            fallback: 所有策略都找不到元素時回傳的兜底定位器，不探測（預設為最後一個策略）
+        """
+        key, known, ordered = cls._ordered(page, name, strategies)
+        for label, factory in ordered:
+            locator = factory()
+            cls.stats["probes"] += 1
+            if locator.count() > 0:
+                cls._record(key, known, label)
+                return locator
+
+        return fallback() if fallback is not None else strategies[-1][1]()
+
+    @classmethod
+    async def resolve_async(cls, page, name: str, strategies: List[Strategy],
+                            fallback: Optional[Callable] = None):
+        """resolve() 的 async 版本（策略建立 playwright.async_api 的定位器），共用同一份紀錄"""
+        key, known, ordered = cls._ordered(page, name, strategies)
+        for label, factory in ordered:
+            locator = factory()
+            cls.stats["probes"] += 1
+            if await locator.count() > 0:
+                cls._record(key, known, label)
+                return locator
+
+        return fallback() if fallback is not None else strategies[-1][1]()
+
+    @classmethod
+    def _ordered(cls, page, name: str, strategies: List[Strategy]):
+        """已記錄的成功策略排在最前面（需要重新探測時維持原本的優先順序）"""
+        winners = cls._load()
+        key = f"{name}@{url_pattern(page.url)}"
+        known = winners.get(key)
+        cls.stats["lookups"] += 1
+        lookups = cls._lookup_counts.get(key, 0)
+        cls._lookup_counts[key] = lookups + 1
+        if known is not None and known != strategies[0][0] and lookups % REPROBE_EVERY == REPROBE_EVERY - 1:
+            cls.stats["reprobes"] += 1
+            return key, known, list(strategies)
+        return key, known, sorted(strategies, key=lambda strategy: strategy[0] != known)
+
+    @classmethod
+    def _record(cls, key: str, known: Optional[str], label: str):
+        if label == known:
+            cls.stats["memo_hits"] += 1
+            return
+        if known is not None:
+            cls.stats["relearned"] += 1
+        cls._winners[key] = label
+        cls._dirty = True
+
+    @classmethod
+    def save(cls):
+        """在檔案鎖內將成功策略寫回磁碟（與其他 worker 寫入的紀錄合併）"""
+        if not cls._dirty or cls._winners is None:
+            return
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(CACHE_PATH.with_suffix(".lock")):
+            try:
+                with open(CACHE_PATH, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                merged = {}
+            merged.update(cls._winners)
+
+            tmp_path = CACHE_PATH.with_name(f"locators.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, CACHE_PATH)
+        cls._dirty = False
+
+    @classmethod
+    def summary(cls) -> str:
+        """解析統計摘要"""
+        return (
+            f"定位器解析: {cls.stats['lookups']} 次，記憶命中 {cls.stats['memo_hits']}、"
+            f"重新學習 {cls.stats['relearned']}、重新探測 {cls.stats['reprobes']}，"
+            f"共探測 {cls.stats['probes']} 次"
+        )
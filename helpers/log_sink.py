@@ -0,0 +1,155 @@
+"""步驟日誌後端 - LogHelpers 的分級日誌：每個測試的緩衝區、背景執行緒寫檔、可選的即時輸出"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+LOGGER_NAME = "playwright_project.steps"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s [%(test)s] %(message)s"
+BUFFER_FORMAT = "%(asctime)s %(levelname)-7s %(message)s"
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """每次寫入時取用目前的 sys.stdout（pytest 的輸出擷取與 redirect_stdout 會替換它）"""
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """INFO 只輸出訊息（與原本的 print 相同），其他等級加上等級名稱"""
+
+    def format(self, record):
+        message = super().format(record)
+        return message if record.levelno == logging.INFO else f"{record.levelname}: {message}"
+
+
+class _TestContextFilter(logging.Filter):
+    """在紀錄上加入目前測試的 nodeid"""
+
+    def filter(self, record):
+        record.test = LogSink.current_test or "-"
+        return True
+
+
+class _BufferHandler(logging.Handler):
+    """目前測試的日誌緩衝區（測試失敗時附加到報告）"""
+
+    def __init__(self):
+        super().__init__()
+        self.lines: List[str] = []
+        self.setFormatter(logging.Formatter(BUFFER_FORMAT, "%H:%M:%S"))
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class LogSink:
+    """
+    LogHelpers 使用的 logger 與處理器
+
+    - 未設定時（腳本、基準測試）以 INFO 等級即時輸出到 stdout，與原本的 print 相同
+    - pytest 下由 conftest 呼叫 configure()：預設不即時輸出，只寫入每個測試的緩衝區與背景寫檔的日誌檔，
+      測試失敗時才把緩衝區附加到報告
+    低於設定等級的訊息在 LogHelpers 中以 isEnabledFor 提前返回，不做任何格式化
+    """
+
+    logger = logging.getLogger(LOGGER_NAME)
+    current_test: Optional[str] = None
+    _buffer: Optional[_BufferHandler] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _console_handler(cls) -> logging.Handler:
+        handler = _StdoutHandler()
+        handler.setFormatter(_ConsoleFormatter("%(message)s"))
+        return handler
+
+    @classmethod
+    def _reset(cls):
+        for handler in list(cls.logger.handlers):
+            cls.logger.removeHandler(handler)
+        cls.logger.filters.clear()
+        cls.logger.propagate = False
+
+    @classmethod
+    def default(cls):
+        """未設定時的行為：INFO 等級輸出到 stdout"""
+        cls._reset()
+        cls.logger.setLevel(logging.INFO)
+        cls.logger.addHandler(cls._console_handler())
+
+    @classmethod
+    def configure(cls, level: int = logging.INFO, console: bool = False, log_file: Optional[Path] = None):
+        """
+        設定日誌等級與輸出目標
+
+        參數:
+            level: 記錄的最低等級（緩衝區、日誌檔與即時輸出共用）
+            console: 是否同時即時輸出到 stdout
+            log_file: 日誌檔路徑（由背景執行緒寫入），None 表示不寫檔
+        """
+        cls.shutdown()
+        cls._reset()
+        cls.logger.setLevel(level)
+        cls.logger.addFilter(_TestContextFilter())
+
+        cls._buffer = _BufferHandler()
+        cls.logger.addHandler(cls._buffer)
+        if console:
+            cls.logger.addHandler(cls._console_handler())
+        if log_file is not None:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8", delay=True)
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            records = queue.SimpleQueue()
+            cls.logger.addHandler(logging.handlers.QueueHandler(records))
+            cls._listener = logging.handlers.QueueListener(records, file_handler)
+            cls._listener.start()
+
+    @classmethod
+    def start_test(cls, nodeid: str):
+        """開始新的測試：清空緩衝區"""
+        cls.current_test = nodeid
+        if cls._buffer is not None:
+            cls._buffer.lines = []
+
+    @classmethod
+    def finish_test(cls):
+        cls.current_test = None
+
+    @classmethod
+    def buffered_text(cls) -> str:
+        """目前測試緩衝區的內容"""
+        if cls._buffer is None:
+            return ""
+        return "\n".join(cls._buffer.lines)
+
+    @classmethod
+    def shutdown(cls):
+        """停止背景寫檔執行緒（寫完佇列中剩餘的紀錄）"""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                for handler in cls._listener.handlers:
+                    handler.close()
+                cls._listener = None
+
+
+LogSink.default()
@@ -0,0 +1,153 @@
+"""頁面網路監控 - 從回應串流判斷速率限制、伺服器錯誤與登入重新導向，取代掃描整頁 HTML"""
+
+import json
+from collections import deque
+from typing import Deque, Dict, Optional
+from weakref import WeakKeyDictionary
+
+from playwright.sync_api import Page, Response
+
+from helpers.rate_governor import RateGovernor
+
+# 會讀取回應內容的請求（購物車 / WooCommerce AJAX，內容小且與速率限制相關）
+_INSPECTED_URL_PARTS = ("wc-ajax=", "/wc/store/", "add-to-cart", "add_to_cart")
+_INSPECTED_RESOURCE_TYPES = frozenset({"xhr", "fetch"})
+_MAX_INSPECTED_BYTES = 256 * 1024
+
+# 回應內容中的速率限制訊息
+_RATE_LIMIT_MARKERS = ("too many requests", "rate limit")
+
+# 登入頁路徑
+LOGIN_PATH = "/my-account/"
+
+
+def _retry_after(response: Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class NetworkMonitor:
+    """
+    每個頁面一個的回應監控器
+
+    在 page.on("response") 中分類回應，只記錄事件，查詢 page_health() 不需要和瀏覽器往返。
+    遇到 429 或速率限制訊息時通知 RateGovernor，讓所有 worker 一起退避
+    """
+
+    _installed: "WeakKeyDictionary[Page, NetworkMonitor]" = WeakKeyDictionary()
+
+    def __init__(self, page: Page, max_events: int = 200):
+        self.page = page
+        # (序號, 類型, 狀態碼, URL)
+        self.events: Deque = deque(maxlen=max_events)
+        self.total_events = 0
+        self.last_document_status: Optional[int] = None
+        self.cart_empty: Optional[bool] = None
+        page.on("response", self._on_response)
+
+    @classmethod
+    def install(cls, page: Page) -> "NetworkMonitor":
+        """在頁面上註冊監控器（重複呼叫會回傳同一個實例）"""
+        monitor = cls._installed.get(page)
+        if monitor is None:
+            monitor = cls(page)
+            cls._installed[page] = monitor
+        return monitor
+
+    def checkpoint(self) -> int:
+        """目前的事件序號，傳給 page_health(since=...) 只查詢之後發生的事件"""
+        return self.total_events
+
+    def _record(self, kind: str, response: Response):
+        self.total_events += 1
+        self.events.append((self.total_events, kind, response.status, response.url))
+
+    def _on_response(self, response: Response):
+        if self._classify(response):
+            self._inspect_body(response)
+
+    def _classify(self, response: Response) -> bool:
+        """依狀態碼分類回應，返回是否需要再讀取回應內容"""
+        request = response.request
+        status = response.status
+
+        if request.resource_type == "document" and request.is_navigation_request() \
+                and request.frame == self.page.main_frame:
+            self.last_document_status = status
+            redirected = request.redirected_from
+            if (redirected is not None and LOGIN_PATH in response.url
+                    and LOGIN_PATH not in redirected.url):
+                self._record("login_redirect", response)
+
+        if status == 429:
+            self._record("rate_limited", response)
+            RateGovernor.shared().report_rate_limit(_retry_after(response))
+            return False
+        if status >= 500:
+            self._record("server_error", response)
+            return False
+
+        return (request.resource_type in _INSPECTED_RESOURCE_TYPES
+                and any(part in response.url for part in _INSPECTED_URL_PARTS)
+                and int(response.headers.get("content-length", "0")) <= _MAX_INSPECTED_BYTES)
+
+    def _inspect_body(self, response: Response):
+        """讀取購物車相關的小型回應內容"""
+        try:
+            body = response.text()
+        except Exception:
+            # 重新導向或已釋放的回應沒有內容
+            return
+        self._inspect_text(response, body)
+
+    def _inspect_text(self, response, body: str):
+        lowered = body[:_MAX_INSPECTED_BYTES].lower()
+        if any(marker in lowered for marker in _RATE_LIMIT_MARKERS):
+            self._record("rate_limited", response)
+            RateGovernor.shared().report_rate_limit(_retry_after(response))
+            return
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return
+        if isinstance(data, dict):
+            # WooCommerce 片段更新：購物車為空時 cart_hash 為空字串；Store API 直接提供 items_count
+            if "items_count" in data:
+                self.cart_empty = data["items_count"] == 0
+            elif "cart_hash" in data:
+                self.cart_empty = not data["cart_hash"]
+
+    def page_health(self, since: int = 0) -> Dict:
+        """
+        頁面網路狀態（只讀取已記錄的事件）
+
+        返回: {'ok', 'rate_limited', 'server_errors', 'login_redirect', 'document_status', 'cart_empty'}
+        """
+        kinds = [kind for seq, kind, _, _ in self.events if seq > since]
+        health = {
+            "rate_limited": "rate_limited" in kinds,
+            "server_errors": kinds.count("server_error"),
+            "login_redirect": "login_redirect" in kinds,
+            "document_status": self.last_document_status,
+            "cart_empty": self.cart_empty,
+        }
+        health["ok"] = not (health["rate_limited"] or health["server_errors"] or health["login_redirect"])
+        return health
+
+
+class AsyncNetworkMonitor(NetworkMonitor):
+    """NetworkMonitor 的 playwright.async_api 版本（回應內容以 await 讀取）"""
+
+    _installed = WeakKeyDictionary()
+
+    async def _on_response(self, response):
+        if self._classify(response):
+            try:
+                body = await response.text()
+            except Exception:
+                return
+            self._inspect_text(response, body)
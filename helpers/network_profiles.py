@@ -0,0 +1,121 @@
+"""網路路由設定檔 - 以 context.route 封鎖或替換不影響功能測試的資源"""
+
+from typing import Dict
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext, Route
+
+# 第三方分析、廣告、客服聊天等主機（測試功能時不需要）
+THIRD_PARTY_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "clarity.ms",
+    "bing.com",
+    "easychat.co",
+    "cherrix.co",
+    "hotjar.com",
+    "tiktok.com",
+    "line-scdn.net",
+)
+
+# 被封鎖資源的估計大小（bytes），被封鎖的請求不會下載，因此只能以典型大小估算節省量
+ESTIMATED_SIZES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 50_000,
+    "stylesheet": 20_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "ping": 500,
+}
+DEFAULT_ESTIMATED_SIZE = 5_000
+
+# 路由設定檔
+# - block_resource_types: 直接中止的資源類型
+# - block_hosts: 中止這些主機的請求（腳本除外）
+# - stub_scripts: 第三方主機的腳本以空白內容回應，避免頁面因載入失敗而報錯
+ROUTING_PROFILES: Dict[str, Dict] = {
+    "full-fidelity": {
+        "block_resource_types": frozenset(),
+        "block_hosts": (),
+        "stub_scripts": False,
+    },
+    "functional-minimal": {
+        "block_resource_types": frozenset({"image", "media", "font"}),
+        "block_hosts": THIRD_PARTY_HOSTS,
+        "stub_scripts": True,
+    },
+    "no-media": {
+        "block_resource_types": frozenset({"image", "media"}),
+        "block_hosts": (),
+        "stub_scripts": False,
+    },
+}
+
+DEFAULT_PROFILE = "full-fidelity"
+
+
+class NetworkProfile:
+    """將路由設定檔套用到 BrowserContext，並統計節省的請求數與估計位元組"""
+
+    def __init__(self, name: str = DEFAULT_PROFILE):
+        if name not in ROUTING_PROFILES:
+            raise ValueError(f"未知的網路設定檔: {name}（可用: {', '.join(ROUTING_PROFILES)}）")
+        self.name = name
+        self.profile = ROUTING_PROFILES[name]
+        self.stats = {"requests": 0, "blocked": 0, "stubbed": 0, "estimated_bytes_saved": 0}
+
+    @property
+    def is_passthrough(self) -> bool:
+        """設定檔是否完全不攔截任何請求"""
+        return not self.profile["block_resource_types"] and not self.profile["block_hosts"]
+
+    def apply(self, context: BrowserContext):
+        """在上下文上註冊路由（full-fidelity 不註冊，避免額外的路由開銷）"""
+        if self.is_passthrough:
+            return
+        context.route("**/*", self._handle)
+
+    def _is_blocked_host(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == h or host.endswith("." + h) for h in self.profile["block_hosts"])
+
+    def _handle(self, route: Route):
+        request = route.request
+        resource_type = request.resource_type
+        self.stats["requests"] += 1
+
+        if self._is_blocked_host(request.url):
+            if resource_type == "script" and self.profile["stub_scripts"]:
+                self._record_saved("stubbed", resource_type)
+                route.fulfill(status=200, content_type="application/javascript", body="")
+                return
+            self._record_saved("blocked", resource_type)
+            route.abort("blockedbyclient")
+            return
+
+        if resource_type in self.profile["block_resource_types"]:
+            self._record_saved("blocked", resource_type)
+            route.abort("blockedbyclient")
+            return
+
+        # 交給其他路由（HAR、快取等）或直接送出
+        route.fallback()
+
+    def _record_saved(self, kind: str, resource_type: str):
+        self.stats[kind] += 1
+        self.stats["estimated_bytes_saved"] += ESTIMATED_SIZES.get(resource_type, DEFAULT_ESTIMATED_SIZE)
+
+    def summary(self) -> str:
+        """單一測試的節省摘要"""
+        saved = self.stats["blocked"] + self.stats["stubbed"]
+        return (
+            f"網路設定檔 {self.name}: 攔截 {self.stats['requests']} 個請求，"
+            f"封鎖 {self.stats['blocked']}、替換 {self.stats['stubbed']}（共節省 {saved} 個），"
+            f"估計節省 {self.stats['estimated_bytes_saved'] / 1024:.0f} KB"
+        )
@@ -0,0 +1,252 @@
+"""平行執行 - 將收集到的測試分配給多個 worker 程序，每個 worker 擁有自己的瀏覽器"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from helpers.duration_store import DurationStore, lpt_schedule
+
+# worker 程序透過此環境變數得知自己的 ID（例如 gw0、gw1）
+WORKER_ENV = "PW_WORKER_ID"
+
+# 所有測試結果的根目錄
+RESULTS_ROOT = Path("./test-results")
+
+# worker 在 session 結束時寫出的統計（各輔助類別的計數器），由主程序累加
+WORKER_STATS_FILE = "stats.json"
+
+# 不轉交給 worker 的選項（worker 有自己的 --junitxml，--workers 只在主程序有效），含 "--opt value" 與 "--opt=value" 兩種形式
+_MAIN_ONLY_OPTIONS = ("--workers", "--junitxml", "--junit-xml")
+
+
+def get_worker_id() -> str:
+    """取得目前程序的 worker ID，主程序（非平行模式）回傳空字串"""
+    return os.environ.get(WORKER_ENV, "")
+
+
+def get_results_dir() -> Path:
+    """
+    取得目前程序的測試結果目錄
+
+    平行模式下每個 worker 寫入 test-results/<worker_id>/，避免截圖等檔案互相覆蓋
+    """
+    worker_id = get_worker_id()
+    results_dir = RESULTS_ROOT / worker_id if worker_id else RESULTS_ROOT
+    results_dir.mkdir(parents=True, exist_ok=True)
+    return results_dir
+
+
+def merge_counters(target: Dict, source: Dict) -> Dict:
+    """將 source 的計數器累加到 target（巢狀 dict 逐層累加，其他值直接相加）"""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            merge_counters(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+    return target
+
+
+def write_worker_stats(stats: Dict[str, Dict]) -> Path:
+    """寫出目前 worker 的統計（{名稱: 計數器}）到結果目錄"""
+    path = get_results_dir() / WORKER_STATS_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False)
+    return path
+
+
+def parse_worker_count(value: str) -> int:
+    """解析 --workers 參數，支援整數或 "auto"（使用 CPU 核心數）"""
+    if str(value).lower() == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+class ParallelRunner:
+    """將測試分片到多個 pytest 子程序執行，並合併各 worker 的報告"""
+
+    def __init__(self, config, workers: int):
+        self.config = config
+        self.workers = workers
+
+    @staticmethod
+    def shard(nodeids: List[str], workers: int, estimates: Optional[Dict[str, float]] = None) -> List[List[str]]:
+        """
+        以最長處理時間優先將測試分配給各 worker（不產生空的分片）
+
+        estimates 為各測試的歷史耗時（DurationStore），未提供時每個測試視為相同耗時，等同平均分配
+        """
+        return lpt_schedule(nodeids, workers, estimates or {})
+
+    def _forwarded_args(self) -> List[str]:
+        """
+        取得要轉交給 worker 的命令列參數
+
+        移除測試路徑（改由分片後的 nodeid 取代）、--workers 本身以及 worker 自行指定的 --junitxml（連同其值）
+        """
+        args = list(self.config.invocation_params.args)
+        invocation_dir = Path(self.config.invocation_params.dir)
+        forwarded = []
+        skip_next = False
+        for arg in args:
+            if skip_next:
+                skip_next = False
+                continue
+            if arg in _MAIN_ONLY_OPTIONS:
+                skip_next = True
+                continue
+            if arg.startswith(tuple(f"{option}=" for option in _MAIN_ONLY_OPTIONS)):
+                continue
+            path_part = arg.split("::")[0]
+            if not arg.startswith("-") and (invocation_dir / path_part).exists():
+                continue
+            forwarded.append(arg)
+        return forwarded
+
+    def _worker_command(self, worker_id: str, nodeids: List[str]) -> List[str]:
+        """組合 worker 子程序的 pytest 命令"""
+        junit_path = (RESULTS_ROOT / worker_id / "junit.xml").resolve()
+        return [
+            sys.executable, "-m", "pytest",
+            "-p", "no:cacheprovider",
+            f"--junitxml={junit_path}",
+            *self._forwarded_args(),
+            *nodeids,
+        ]
+
+    def run(self, nodeids: List[str]) -> Dict:
+        """
+        啟動所有 worker 並等待完成
+
+        返回: 合併後的結果摘要
+        """
+        estimates = DurationStore().estimates(nodeids)
+        shards = self.shard(nodeids, self.workers, estimates)
+        processes = []
+        started = time.time()
+
+        for index, shard in enumerate(shards):
+            worker_id = f"gw{index}"
+            worker_dir = RESULTS_ROOT / worker_id
+            # 清除上次執行留下的報告與統計，worker 異常結束時不會讀到舊的檔案
+            shutil.rmtree(worker_dir, ignore_errors=True)
+            worker_dir.mkdir(parents=True, exist_ok=True)
+            env = dict(os.environ, **{WORKER_ENV: worker_id})
+            log_file = open(worker_dir / "output.log", "w", encoding="utf-8")
+            process = subprocess.Popen(
+                self._worker_command(worker_id, shard),
+                cwd=str(self.config.rootpath),
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+            processes.append((worker_id, shard, process, log_file))
+
+        workers = []
+        for worker_id, shard, process, log_file in processes:
+            returncode = process.wait()
+            log_file.close()
+            result = self._read_junit(RESULTS_ROOT / worker_id / "junit.xml")
+            result.update({
+                "worker_id": worker_id,
+                "assigned": len(shard),
+                "estimated": sum(estimates[nodeid] for nodeid in shard),
+                "returncode": returncode,
+            })
+            workers.append(result)
+
+        summary = self.merge_reports(workers)
+        summary["wall_time"] = time.time() - started
+        return summary
+
+    @staticmethod
+    def worker_files(summary: Dict, name: str) -> List[Path]:
+        """各 worker 結果目錄中存在的指定檔案（例如 waits.json、trace.json），供主程序合併"""
+        paths = [RESULTS_ROOT / worker["worker_id"] / name for worker in summary["workers"]]
+        return [path for path in paths if path.exists()]
+
+    @staticmethod
+    def merge_worker_stats(summary: Dict, targets: Dict[str, Dict]) -> int:
+        """
+        將各 worker 的統計累加到主程序的計數器（targets: {名稱: 計數器}）
+
+        返回: 讀取到統計的 worker 數
+        """
+        paths = ParallelRunner.worker_files(summary, WORKER_STATS_FILE)
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+            for name, target in targets.items():
+                merge_counters(target, stats.get(name, {}))
+        return len(paths)
+
+    @staticmethod
+    def _read_junit(junit_path: Path) -> Dict:
+        """讀取單一 worker 的 JUnit XML 報告"""
+        result = {"tests": 0, "failed": 0, "skipped": 0, "time": 0.0,
+                  "failures": [], "suites": []}
+        if not junit_path.exists():
+            return result
+
+        root = ET.parse(junit_path).getroot()
+        suites = [root] if root.tag == "testsuite" else list(root.iter("testsuite"))
+        for suite in suites:
+            result["suites"].append(suite)
+            result["tests"] += int(suite.get("tests", 0))
+            result["failed"] += int(suite.get("failures", 0)) + int(suite.get("errors", 0))
+            result["skipped"] += int(suite.get("skipped", 0))
+            result["time"] += float(suite.get("time", 0.0))
+            for case in suite.iter("testcase"):
+                if case.find("failure") is not None or case.find("error") is not None:
+                    result["failures"].append(f"{case.get('classname')}::{case.get('name')}")
+        return result
+
+    @staticmethod
+    def merge_reports(workers: List[Dict]) -> Dict:
+        """將所有 worker 的 JUnit 報告合併為 test-results/junit.xml"""
+        merged = ET.Element("testsuites")
+        summary = {"tests": 0, "failed": 0, "skipped": 0, "failures": [],
+                   "crashed": [], "workers": []}
+
+        for worker in workers:
+            for suite in worker.pop("suites"):
+                suite.set("name", f"{suite.get('name', 'pytest')}[{worker['worker_id']}]")
+                merged.append(suite)
+            summary["tests"] += worker["tests"]
+            summary["failed"] += worker["failed"]
+            summary["skipped"] += worker["skipped"]
+            summary["failures"].extend(worker["failures"])
+            # 0 = 全部通過、1 = 有測試失敗，其他代碼表示 worker 本身異常
+            if worker["returncode"] not in (0, 1):
+                summary["crashed"].append(worker["worker_id"])
+            summary["workers"].append(worker)
+
+        RESULTS_ROOT.mkdir(parents=True, exist_ok=True)
+        ET.ElementTree(merged).write(RESULTS_ROOT / "junit.xml", encoding="utf-8", xml_declaration=True)
+        return summary
+
+    @staticmethod
+    def format_summary(summary: Dict) -> List[str]:
+        """將合併結果轉為終端機輸出的文字行"""
+        lines = []
+        for worker in summary["workers"]:
+            lines.append(
+                f"[{worker['worker_id']}] 分配 {worker['assigned']} 個測試（預估 {worker['estimated']:.0f}s），"
+                f"執行 {worker['tests']}、失敗 {worker['failed']}、跳過 {worker['skipped']}，"
+                f"耗時 {worker['time']:.1f}s（日誌: {RESULTS_ROOT / worker['worker_id'] / 'output.log'}）"
+            )
+        lines.append(
+            f"合計: {summary['tests']} 個測試，失敗 {summary['failed']}，跳過 {summary['skipped']}，"
+            f"總耗時 {summary['wall_time']:.1f}s"
+        )
+        for failure in summary["failures"]:
+            lines.append(f"  FAILED {failure}")
+        for worker_id in summary["crashed"]:
+            lines.append(f"  WORKER ERROR {worker_id}（請查看 output.log）")
+        lines.append(f"合併報告: {RESULTS_ROOT / 'junit.xml'}")
+        return lines
@@ -0,0 +1,75 @@
+"""平行分頁檢查 - 在同一個上下文的多個分頁中同時載入互不相依的唯讀頁面"""
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from playwright.sync_api import BrowserContext, Page
+
+from helpers.network_monitor import NetworkMonitor
+from helpers.popup_handler import PopupAutoDismisser
+
+# 檢查項目：(名稱, URL, 檢查函數)；檢查函數接收已載入的頁面，回傳值收集到結果中
+ReadOnlyCheck = Tuple[str, str, Callable[[Page], object]]
+
+# 在頁面內設定 location.href 開始導航，不等待伺服器回應
+_START_NAVIGATION_SCRIPT = "(url) => { window.location.href = url; }"
+
+
+class ParallelTabs:
+    """
+    同步 API 下的平行分頁執行
+
+    先在各分頁的 about:blank 上設定 location.href 開始導航（不等待伺服器回應，連 commit 也不等），
+    全部開始後再依序等待各分頁載入完成並執行檢查。
+    各分頁的載入在瀏覽器中同時進行，總耗時約為最慢的頁面，而不是所有頁面的首位元組時間相加。
+    只適用於不改變網站狀態、彼此不相依的檢查
+    """
+
+    @staticmethod
+    def run(context: BrowserContext, checks: List[ReadOnlyCheck], load_state: str = "domcontentloaded",
+            timeout: int = 10000) -> Dict[str, Dict]:
+        """
+        執行檢查並收集結果（單一檢查失敗不影響其他檢查）
+
+        返回: {名稱: {'ok', 'value', 'error', 'url', 'elapsed'}}（elapsed 為開始到該檢查完成的秒數）
+        """
+        started = time.perf_counter()
+        tabs: List[Tuple[str, Page, Callable[[Page], object], Optional[Exception]]] = []
+        for name, url, check in checks:
+            page = context.new_page()
+            PopupAutoDismisser.install(page)
+            NetworkMonitor.install(page)
+            error = None
+            try:
+                page.evaluate(_START_NAVIGATION_SCRIPT, url)
+            except Exception as e:
+                error = e
+            tabs.append((name, page, check, error))
+
+        results = {}
+        try:
+            for name, page, check, error in tabs:
+                result = {"ok": False, "value": None, "error": None, "url": None, "elapsed": 0.0}
+                try:
+                    if error is not None:
+                        raise error
+                    # 離開 about:blank 且達到 load_state 才算載入完成（導航可能重新導向到其他 URL）
+                    page.wait_for_url(lambda current: current != "about:blank", wait_until=load_state,
+                                      timeout=timeout)
+                    result["value"] = check(page)
+                    result["ok"] = True
+                except Exception as e:
+                    result["error"] = f"{type(e).__name__}: {e}"
+                result["url"] = page.url
+                result["elapsed"] = time.perf_counter() - started
+                results[name] = result
+        finally:
+            for _, page, _, _ in tabs:
+                page.close()
+        return results
+
+    @staticmethod
+    def assert_all_ok(results: Dict[str, Dict]):
+        """任一檢查失敗時，以包含所有失敗項目的訊息拋出 AssertionError"""
+        failures = [f"{name}: {result['error']}" for name, result in results.items() if not result["ok"]]
+        assert not failures, "平行分頁檢查失敗:\n" + "\n".join(failures)
@@ -0,0 +1,253 @@
+"""彈出視窗自動關閉 - 以 locator handler 在彈出視窗出現時才處理，取代每次導航後的全頁掃描"""
+
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from playwright.sync_api import Locator, Page
+
+from helpers.async_helpers import AsyncWaitHelpers
+from helpers.base_helpers import LogHelpers, WaitHelpers
+
+# 自動關閉的行銷彈出視窗：(名稱, 容器 CSS 選擇器)
+# 只列出特定的行銷彈窗，通用的 dialog/modal 選擇器會誤關流程中的商品選項對話框
+AUTO_DISMISS_OVERLAYS = (
+    ("sweetalert", ".swal2-container"),
+    ("popup_maker", ".pum-overlay.pum-active"),
+)
+
+# close_popup_if_exists 明確呼叫時檢查的彈出視窗類型（包含通用的對話框）
+KNOWN_OVERLAYS = AUTO_DISMISS_OVERLAYS + (
+    ("dialog", '[role="dialog"]'),
+    ("modal", '.modal, [class*="modal"]'),
+    ("popup", '[class*="popup"]'),
+    ("overlay", '[class*="overlay"]'),
+)
+
+# 「今日不再顯示」按鈕（優先點擊，避免同一彈出視窗再次出現）
+DO_NOT_SHOW_SELECTOR = 'button:has-text("今日不再顯示"), label:has-text("今日不再顯示")'
+
+# 關閉按鈕
+CLOSE_SELECTOR = (
+    'button:has-text("關閉"), button:has-text("×"), button:has-text("X"), '
+    'button.close, button[class*="close"], button[aria-label*="close"], .swal2-close'
+)
+
+# 一次檢查哪些類型的彈出視窗目前可見
+_VISIBLE_OVERLAYS_SCRIPT = """
+(selectors) => selectors.map(selector => Array.from(document.querySelectorAll(selector)).some(el => {
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden'
+        && style.display !== 'none' && style.opacity !== '0';
+}))
+"""
+
+
+class PopupAutoDismisser:
+    """
+    每個頁面註冊一次的彈出視窗處理器
+
+    Playwright 在執行動作前偵測到 AUTO_DISMISS_OVERLAYS 的彈出視窗可見時才呼叫處理器，
+    沒有彈出視窗時不產生任何額外往返。關閉無效（例如誤判的常駐元素）的類型會自動停用；
+    流程自己處理對話框期間以 suspended() 暫時移除處理器
+    """
+
+    # 所有頁面合計的統計：{類型: {"fired", "closed", "disabled", "total_ms"}}
+    stats: Dict[str, Dict] = {}
+
+    _installed: "WeakKeyDictionary[Page, PopupAutoDismisser]" = WeakKeyDictionary()
+
+    def __init__(self, page: Page):
+        self.page = page
+        self._locators: Dict[str, Locator] = {}
+
+    @classmethod
+    def install(cls, page: Page) -> "PopupAutoDismisser":
+        """在頁面上註冊處理器（重複呼叫會回傳同一個實例）"""
+        dismisser = cls._installed.get(page)
+        if dismisser is None:
+            dismisser = cls(page)
+            dismisser._register()
+            cls._installed[page] = dismisser
+        return dismisser
+
+    @classmethod
+    def for_page(cls, page: Page) -> Optional["PopupAutoDismisser"]:
+        """取得頁面上已註冊的處理器"""
+        return cls._installed.get(page)
+
+    def _overlay_locator(self, selector: str) -> Locator:
+        return self.page.locator(f"{selector} >> visible=true").first
+
+    def _register(self, overlays: Tuple = AUTO_DISMISS_OVERLAYS):
+        for name, selector in overlays:
+            locator = self._overlay_locator(selector)
+            self._locators[name] = locator
+            self.page.add_locator_handler(
+                locator,
+                lambda overlay, name=name: self.dismiss(name, overlay),
+                no_wait_after=True,
+            )
+
+    def _active_overlays(self) -> Tuple:
+        """目前啟用中的處理器類型（停用過的類型不會在 suspended() 結束後恢復）"""
+        return tuple((name, selector) for name, selector in AUTO_DISMISS_OVERLAYS if name in self._locators)
+
+    @contextmanager
+    def suspended(self):
+        """暫時移除處理器（流程自己處理對話框期間，避免處理器在動作前關閉它）"""
+        active = self._active_overlays()
+        for name, _ in active:
+            self.page.remove_locator_handler(self._locators.pop(name))
+        try:
+            yield self
+        finally:
+            if not self.page.is_closed():
+                self._register(active)
+
+    def dismiss(self, name: str, overlay: Locator) -> bool:
+        """關閉彈出視窗並記錄耗時，返回是否成功關閉"""
+        started = time.perf_counter()
+        try:
+            do_not_show = overlay.locator(DO_NOT_SHOW_SELECTOR).first
+            if do_not_show.count() > 0:
+                do_not_show.click(timeout=1000)
+
+            close_button = overlay.locator(CLOSE_SELECTOR).first
+            if close_button.count() > 0:
+                close_button.click(force=True, timeout=1000)
+            else:
+                self.page.keyboard.press("Escape")
+        except Exception as e:
+            LogHelpers.warning("關閉彈出窗口失敗 (%s): %s", name, e)
+
+        closed = WaitHelpers.wait_for_hidden(overlay, timeout=1000)
+        if not closed:
+            self.page.keyboard.press("Escape")
+            closed = WaitHelpers.wait_for_hidden(overlay, timeout=500)
+
+        if self._record(name, closed, started):
+            try:
+                self.page.remove_locator_handler(self._locators.pop(name))
+            except Exception:
+                pass
+        return closed
+
+    def _record(self, name: str, closed: bool, started: float) -> bool:
+        """記錄統計，返回是否應停用此類型的處理器"""
+        record = PopupAutoDismisser.stats.setdefault(
+            name, {"fired": 0, "closed": 0, "disabled": 0, "total_ms": 0.0}
+        )
+        record["fired"] += 1
+        record["closed"] += int(closed)
+        record["total_ms"] += (time.perf_counter() - started) * 1000
+
+        if not closed and name in self._locators:
+            # 關不掉的多半是誤判的常駐元素，停用以免每個動作前都觸發
+            record["disabled"] += 1
+            return True
+        return False
+
+    def dismiss_visible(self) -> bool:
+        """
+        立即關閉目前可見的已知彈出視窗（單次往返檢查）
+
+        返回: 沒有彈出視窗或全部關閉成功為 True
+        """
+        selectors = [selector for _, selector in KNOWN_OVERLAYS]
+        visible = self.page.evaluate(_VISIBLE_OVERLAYS_SCRIPT, selectors)
+        all_closed = True
+        for (name, selector), is_visible in zip(KNOWN_OVERLAYS, visible):
+            if is_visible:
+                all_closed = self.dismiss(name, self._overlay_locator(selector)) and all_closed
+        return all_closed
+
+    @classmethod
+    def summary(cls) -> str:
+        """各類型彈出視窗的觸發次數與平均關閉耗時"""
+        parts = []
+        for name, record in sorted(cls.stats.items()):
+            average = record["total_ms"] / record["fired"] if record["fired"] else 0.0
+            part = f"{name} 觸發 {record['fired']} 次、關閉 {record['closed']} 次、平均 {average:.0f} ms"
+            if record["disabled"]:
+                part += f"、停用 {record['disabled']} 次"
+            parts.append(part)
+        return "彈出視窗: " + "；".join(parts)
+
+
+class AsyncPopupAutoDismisser(PopupAutoDismisser):
+    """PopupAutoDismisser 的 playwright.async_api 版本（統計與同步版合計）"""
+
+    _installed = WeakKeyDictionary()
+
+    @classmethod
+    async def install(cls, page) -> "AsyncPopupAutoDismisser":
+        """在頁面上註冊處理器（重複呼叫會回傳同一個實例）"""
+        dismisser = cls._installed.get(page)
+        if dismisser is None:
+            dismisser = cls(page)
+            await dismisser._register()
+            cls._installed[page] = dismisser
+        return dismisser
+
+    async def _register(self, overlays: Tuple = AUTO_DISMISS_OVERLAYS):
+        for name, selector in overlays:
+            locator = self._overlay_locator(selector)
+            self._locators[name] = locator
+
+            async def handler(overlay, name=name):
+                await self.dismiss(name, overlay)
+
+            await self.page.add_locator_handler(locator, handler, no_wait_after=True)
+
+    @asynccontextmanager
+    async def suspended(self):
+        """暫時移除處理器（流程自己處理對話框期間，避免處理器在動作前關閉它）"""
+        active = self._active_overlays()
+        for name, _ in active:
+            await self.page.remove_locator_handler(self._locators.pop(name))
+        try:
+            yield self
+        finally:
+            if not self.page.is_closed():
+                await self._register(active)
+
+    async def dismiss(self, name: str, overlay) -> bool:
+        """關閉彈出視窗並記錄耗時，返回是否成功關閉"""
+        started = time.perf_counter()
+        try:
+            do_not_show = overlay.locator(DO_NOT_SHOW_SELECTOR).first
+            if await do_not_show.count() > 0:
+                await do_not_show.click(timeout=1000)
+
+            close_button = overlay.locator(CLOSE_SELECTOR).first
+            if await close_button.count() > 0:
+                await close_button.click(force=True, timeout=1000)
+            else:
+                await self.page.keyboard.press("Escape")
+        except Exception as e:
+            LogHelpers.warning("關閉彈出窗口失敗 (%s): %s", name, e)
+
+        closed = await AsyncWaitHelpers.wait_for_hidden(overlay, timeout=1000)
+        if not closed:
+            await self.page.keyboard.press("Escape")
+            closed = await AsyncWaitHelpers.wait_for_hidden(overlay, timeout=500)
+
+        if self._record(name, closed, started):
+            try:
+                await self.page.remove_locator_handler(self._locators.pop(name))
+            except Exception:
+                pass
+        return closed
+
+    async def dismiss_visible(self) -> bool:
+        """立即關閉目前可見的已知彈出視窗（單次往返檢查）"""
+        selectors = [selector for _, selector in KNOWN_OVERLAYS]
+        visible = await self.page.evaluate(_VISIBLE_OVERLAYS_SCRIPT, selectors)
+        all_closed = True
+        for (name, selector), is_visible in zip(KNOWN_OVERLAYS, visible):
+            if is_visible:
+                all_closed = await self.dismiss(name, self._overlay_locator(selector)) and all_closed
+        return all_closed
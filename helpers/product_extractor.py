@@ -0,0 +1,90 @@
+"""商品列表擷取 - 在一次頁面內執行中讀取分類 / 搜尋頁上的所有商品"""
+
+from typing import Dict, List, Optional
+
+from playwright.sync_api import Locator, Page
+
+# 標記商品容器的屬性，擷取後可直接以 CSS 定位到該商品（不需再次往返查找）
+PRODUCT_INDEX_ATTR = "data-pw-product-index"
+
+# 商品容器內的「加入購物車」按鈕
+ADD_TO_CART_SELECTOR = (
+    'button:has-text("加入購物車"), a.button:has-text("加入購物車"), '
+    '.add-to-cart, button.add_to_cart, .add_to_cart_button'
+)
+
+_EXTRACT_SCRIPT = """
+(indexAttr) => {
+    const text = (el) => (el && el.textContent || '').replace(/\\s+/g, ' ').trim();
+    const links = Array.from(document.querySelectorAll('a.woocommerce-loop-product__link'));
+    const seen = new Set();
+    const records = [];
+    for (const link of links) {
+        const container = link.closest('li.product, .product, [class*="product-item"]') || link.parentElement;
+        if (!container || seen.has(container)) continue;
+        seen.add(container);
+
+        const index = records.length;
+        container.setAttribute(indexAttr, String(index));
+
+        const title = container.querySelector('.woocommerce-loop-product__title') || link;
+        const price = container.querySelector('.price, .product-price, .woocommerce-Price-amount, [class*="price"]');
+        const button = Array.from(container.querySelectorAll('button, a.button, .add-to-cart, .add_to_cart_button'))
+            .find(b => text(b).includes('加入購物車') || /add[-_]to[-_]cart/.test(b.className));
+        const classes = container.className + ' ' + (button ? button.className : '');
+        const disabled = !button || button.disabled || button.classList.contains('disabled')
+            || button.getAttribute('aria-disabled') === 'true';
+
+        const productId = parseInt((button && button.getAttribute('data-product_id')) || '', 10);
+
+        records.push({
+            index,
+            product_id: Number.isNaN(productId) ? null : productId,
+            name: text(title),
+            url: link.href,
+            price: text(price) || 'N/A',
+            can_add_to_cart: !disabled,
+            has_variants: /product-type-variable|product_type_variable/.test(classes),
+            in_stock: !/outofstock/.test(classes),
+        });
+    }
+    return records;
+}
+"""
+
+
+class ProductExtractor:
+    """商品列表擷取"""
+
+    @staticmethod
+    def extract(page: Page) -> List[Dict]:
+        """
+        一次頁面內執行讀取所有商品
+
+        返回: [{'index', 'product_id', 'name', 'url', 'price', 'can_add_to_cart', 'has_variants', 'in_stock'}, ...]
+        （product_id 取自 WooCommerce 按鈕的 data-product_id，可交給 CartService 直接加入購物車）
+        """
+        return page.evaluate(_EXTRACT_SCRIPT, PRODUCT_INDEX_ATTR)
+
+    @staticmethod
+    async def extract_async(page) -> List[Dict]:
+        """extract() 的 async 版本（playwright.async_api 的 Page）"""
+        return await page.evaluate(_EXTRACT_SCRIPT, PRODUCT_INDEX_ATTR)
+
+    @staticmethod
+    def first_addable(products: List[Dict]) -> Optional[Dict]:
+        """第一個有庫存、沒有規格選項且可直接加入購物車的商品（有規格的商品需先選規格才能加入）"""
+        for product in products:
+            if product["can_add_to_cart"] and product["in_stock"] and not product["has_variants"]:
+                return product
+        return None
+
+    @staticmethod
+    def container(page: Page, product: Dict) -> Locator:
+        """擷取過的商品容器定位器"""
+        return page.locator(f'[{PRODUCT_INDEX_ATTR}="{product["index"]}"]')
+
+    @staticmethod
+    def add_to_cart_button(page: Page, product: Dict) -> Locator:
+        """擷取過的商品的「加入購物車」按鈕定位器"""
+        return ProductExtractor.container(page, product).locator(ADD_TO_CART_SELECTOR).first
@@ -0,0 +1,194 @@
+"""跨 worker 的請求節流 - 以共享檔案協調權杖桶與速率限制退避"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from helpers.file_lock import FileLock
+
+# 所有 worker 共用的狀態目錄
+GOVERNOR_DIR = Path("./.pw_cache/governor")
+
+# 會改變網站狀態的動作：(桶容量, 每秒補充的權杖數)
+DEFAULT_BUCKETS: Dict[str, Tuple[float, float]] = {
+    "add_to_cart": (3, 0.5),
+    "login": (2, 0.1),
+}
+
+# 速率限制退避：基準秒數、上限、恢復時每個 worker 的隨機錯開秒數
+BACKOFF_BASE = 15.0
+BACKOFF_MAX = 120.0
+BACKOFF_JITTER = 3.0
+
+# 退避結束超過此秒數後才再遇到限制，視為新的一次限制（連續限制次數歸零，不沿用上次執行的加倍）
+STRIKE_EXPIRY = BACKOFF_MAX
+
+
+class RateGovernor:
+    """
+    全站請求節流器
+
+    - acquire(action): 依權杖桶控制所有 worker 合計的動作頻率，不足時等待
+    - report_rate_limit(): 任一 worker 遇到 429 / too many requests 時設定共享退避期限，
+      所有 worker 在下一次 acquire 時一起等待（各自加上隨機錯開，避免同時恢復）
+    - enabled = False（HAR 重播模式）時不節流也不退避，不讀寫共享狀態
+    """
+
+    _shared: Optional["RateGovernor"] = None
+
+    def __init__(self, state_dir: Path = GOVERNOR_DIR, buckets: Optional[Dict[str, Tuple[float, float]]] = None,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / "state.json"
+        self.lock = FileLock(self.state_dir / "state.lock")
+        self.buckets = dict(DEFAULT_BUCKETS if buckets is None else buckets)
+        self.clock = clock
+        self.sleep = sleep
+        self.enabled = True
+        self.stats = {"acquired": 0, "throttled": 0, "backoffs": 0, "waited_seconds": 0.0}
+
+    @classmethod
+    def shared(cls) -> "RateGovernor":
+        """取得本程序共用的節流器"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"buckets": {}, "backoff_until": 0.0, "strikes": 0}
+
+    def _write(self, state: Dict):
+        tmp_path = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _wait(self, seconds: float):
+        self.stats["waited_seconds"] += seconds
+        self.sleep(seconds)
+
+    def _try_acquire(self, action: str) -> Optional[float]:
+        """嘗試取得權杖；成功返回 None，否則返回需要等待的秒數"""
+        if not self.enabled:
+            return None
+        capacity, rate = self.buckets.get(action, (None, None))
+        with self.lock:
+            state = self._read()
+            now = self.clock()
+            backoff = state["backoff_until"] - now
+            if backoff > 0:
+                return backoff + random.uniform(0, BACKOFF_JITTER)
+            if capacity is None:
+                # 沒有設定權杖桶的動作只受共享退避限制
+                return None
+            bucket = state["buckets"].get(action, {"tokens": capacity, "updated": now})
+            tokens = min(capacity, bucket["tokens"] + (now - bucket["updated"]) * rate)
+            if tokens < 1:
+                return (1 - tokens) / rate
+            state["buckets"][action] = {"tokens": tokens - 1, "updated": now}
+            self._write(state)
+        self.stats["acquired"] += 1
+        return None
+
+    def acquire(self, action: str) -> float:
+        """
+        取得執行動作的權杖（必要時等待）
+
+        返回: 等待的總秒數
+        """
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(action)
+            if delay is None:
+                return waited
+            self.stats["throttled"] += 1
+            self._wait(delay)
+            waited += delay
+
+    async def acquire_async(self, action: str) -> float:
+        """acquire() 的 async 版本，等待時不阻塞事件迴圈"""
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(action)
+            if delay is None:
+                return waited
+            self.stats["throttled"] += 1
+            self.stats["waited_seconds"] += delay
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def report_rate_limit(self, retry_after: Optional[float] = None) -> float:
+        """
+        回報遇到速率限制，設定所有 worker 共用的退避期限
+
+        退避期間內的重複回報（其他 worker 看到同一次限制）不會再加倍；
+        上次退避結束超過 STRIKE_EXPIRY 秒時從基準退避重新開始
+        返回: 退避結束的時間戳
+        """
+        if not self.enabled:
+            return self.clock()
+        with self.lock:
+            state = self._read()
+            now = self.clock()
+            if state["backoff_until"] <= now:
+                if now - state["backoff_until"] > STRIKE_EXPIRY:
+                    state["strikes"] = 0
+                state["strikes"] = state.get("strikes", 0) + 1
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (state["strikes"] - 1))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                state["backoff_until"] = now + delay
+                self._write(state)
+                self.stats["backoffs"] += 1
+            return state["backoff_until"]
+
+    def report_success(self):
+        """動作成功：退避期限已過時重置連續限制次數"""
+        if not self.enabled:
+            return
+        state = self._read()
+        if state.get("strikes") and state["backoff_until"] <= self.clock():
+            with self.lock:
+                state = self._read()
+                state["strikes"] = 0
+                self._write(state)
+
+    def backoff_remaining(self) -> float:
+        """共享退避剩餘秒數"""
+        if not self.enabled:
+            return 0.0
+        return max(0.0, self._read()["backoff_until"] - self.clock())
+
+    def _backoff_delay(self) -> float:
+        remaining = self.backoff_remaining()
+        return remaining + random.uniform(0, BACKOFF_JITTER) if remaining > 0 else 0.0
+
+    def wait_for_backoff(self) -> float:
+        """等待共享退避結束（加上隨機錯開），返回等待秒數"""
+        delay = self._backoff_delay()
+        if delay:
+            self._wait(delay)
+        return delay
+
+    async def wait_for_backoff_async(self) -> float:
+        """wait_for_backoff() 的 async 版本"""
+        delay = self._backoff_delay()
+        if delay:
+            self.stats["waited_seconds"] += delay
+            await asyncio.sleep(delay)
+        return delay
+
+    def summary(self) -> str:
+        """節流統計摘要"""
+        return (
+            f"請求節流: 取得權杖 {self.stats['acquired']} 次、等待 {self.stats['throttled']} 次"
+            f"（共 {self.stats['waited_seconds']:.1f} 秒），觸發退避 {self.stats['backoffs']} 次"
+        )
@@ -0,0 +1,224 @@
+"""重試引擎 - 依錯誤類型的重試策略、指數退避加隨機抖動、重試預算與斷路器"""
+
+import asyncio
+import random
+import re
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from helpers.base_helpers import LogHelpers
+from helpers.rate_governor import RateGovernor
+
+T = TypeVar("T")
+
+# 錯誤類型 → (最多重試次數, 初始延遲秒數, 延遲上限秒數)
+DEFAULT_POLICIES: Dict[str, Tuple[int, float, float]] = {
+    # 元素在重新渲染中被移除、被其他元素遮住：很快就會恢復
+    "detached": (3, 0.1, 1.0),
+    # 元素未在時間內就緒
+    "timeout": (2, 0.5, 4.0),
+    # 5xx、連線中斷：網站可能暫時異常，延遲較長並計入斷路器
+    "server_error": (2, 2.0, 10.0),
+    # 速率限制（RateGovernor 的共享退避進行中）：等待退避結束後重試一次
+    "rate_limited": (1, 0.0, 0.0),
+    # 斷言失敗、程式錯誤等：重試不會改變結果
+    "other": (0, 0.0, 0.0),
+}
+
+# 每個測試與整個 session 最多的重試次數
+DEFAULT_TEST_BUDGET = 5
+DEFAULT_SESSION_BUDGET = 30
+
+# 連續多少次網站異常後斷路，斷路後多少秒內直接失敗
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+# 只比對訊息的第一行（Playwright 的錯誤摘要）；其餘的 call log 含有選擇器與重試紀錄，不能作為分類依據
+_SERVER_ERROR_PATTERN = re.compile(r"\bnet::ERR_[A-Z_]+\b|\bHTTP 5\d\d\b")
+_DETACHED_PATTERN = re.compile(
+    r"\bElement is (?:not attached to the DOM|detached)\b|\bExecution context was destroyed\b", re.IGNORECASE
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """斷路器開啟中：網站連續異常，不再嘗試"""
+
+
+def classify(error: Exception, rate_limited: bool = False) -> str:
+    """
+    依例外類型與錯誤摘要（訊息第一行）將例外分類為 DEFAULT_POLICIES 中的錯誤類型
+
+    429 不會出現在 Playwright 的錯誤訊息中，由 NetworkMonitor、CartService 等看到回應時回報給 RateGovernor；
+    rate_limited 為 True（共享退避進行中）時，斷言以外的錯誤都視為速率限制造成
+    """
+    if isinstance(error, AssertionError):
+        return "other"
+    if rate_limited:
+        return "rate_limited"
+    if isinstance(error, (PlaywrightTimeoutError, TimeoutError)) or type(error).__name__ == "TimeoutError":
+        return "timeout"
+    lines = str(error).strip().splitlines()
+    summary = lines[0] if lines else ""
+    if isinstance(error, ConnectionError) or _SERVER_ERROR_PATTERN.search(summary):
+        return "server_error"
+    if _DETACHED_PATTERN.search(summary):
+        return "detached"
+    return "other"
+
+
+class RetryEngine:
+    """
+    重試引擎
+
+    - 依 classify() 的錯誤類型套用重試策略，延遲為指數退避加抖動（一半固定、一半隨機）
+    - 每次重試消耗每個測試與整個 session 的預算，任一用完即不再重試
+    - 連續 BREAKER_THRESHOLD 次網站異常（server_error）時斷路，冷卻期間所有動作直接拋出 CircuitOpenError；
+      冷卻結束後允許一次嘗試，成功即恢復
+    """
+
+    _shared: Optional["RetryEngine"] = None
+
+    def __init__(self, policies: Optional[Dict[str, Tuple[int, float, float]]] = None,
+                 test_budget: int = DEFAULT_TEST_BUDGET, session_budget: int = DEFAULT_SESSION_BUDGET,
+                 breaker_threshold: int = BREAKER_THRESHOLD, breaker_cooldown: float = BREAKER_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.test_budget = test_budget
+        self.session_budget = session_budget
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self.test_retries = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.stats = {"retries": 0, "recovered": 0, "exhausted": 0, "fail_fast": 0, "breaker_opened": 0, "by_kind": {}}
+
+    @classmethod
+    def shared(cls) -> "RetryEngine":
+        """取得本程序共用的重試引擎"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def start_test(self):
+        """新的測試開始：重置每個測試的預算"""
+        self.test_retries = 0
+
+    # ============ 斷路器 ============
+
+    def _check_circuit(self, name: str):
+        if self.open_until and self.clock() < self.open_until:
+            self.stats["fail_fast"] += 1
+            raise CircuitOpenError(
+                f"{name}: 網站連續 {self.consecutive_failures} 次異常，斷路中（剩餘 {self.open_until - self.clock():.0f} 秒）"
+            )
+
+    def _record_success(self, attempt: int):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        if attempt:
+            self.stats["recovered"] += 1
+
+    def _record_failure(self, kind: str):
+        if kind != "server_error":
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.breaker_threshold:
+            self.open_until = self.clock() + self.breaker_cooldown
+            self.stats["breaker_opened"] += 1
+            LogHelpers.warning("網站連續 %d 次異常，斷路 %.0f 秒", self.consecutive_failures, self.breaker_cooldown)
+
+    # ============ 重試判斷 ============
+
+    def backoff(self, attempt: int, base: float, cap: float, jitter: bool = True) -> float:
+        """第 attempt 次重試（從 0 開始）前的延遲"""
+        delay = min(cap, base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2) if jitter else delay
+
+    def _next_delay(self, name: str, error: Exception, attempt: int,
+                    policies: Dict[str, Tuple[int, float, float]], jitter: bool) -> Tuple[str, Optional[float]]:
+        """
+        失敗後決定是否重試
+
+        返回: (錯誤類型, 重試前的延遲秒數)，不重試時延遲為 None
+        """
+        kind = classify(error, RateGovernor.shared().backoff_remaining() > 0)
+        self._record_failure(kind)
+        retries, base, cap = policies.get(kind, policies.get("other", (0, 0.0, 0.0)))
+        if attempt >= retries:
+            return kind, None
+        if self.test_retries >= self.test_budget or self.stats["retries"] >= self.session_budget:
+            self.stats["exhausted"] += 1
+            LogHelpers.warning("%s: 重試預算已用完，不再重試（%s）", name, kind)
+            return kind, None
+        if self.open_until and self.clock() < self.open_until:
+            return kind, None
+
+        self.test_retries += 1
+        self.stats["retries"] += 1
+        self.stats["by_kind"][kind] = self.stats["by_kind"].get(kind, 0) + 1
+        delay = self.backoff(attempt, base, cap, jitter)
+        LogHelpers.debug("%s 失敗（%s），%.1f 秒後第 %d 次重試: %s", name, kind, delay, attempt + 1, error)
+        return kind, delay
+
+    def run(self, func: Callable[[], T], name: str = "action",
+            policies: Optional[Dict[str, Tuple[int, float, float]]] = None, jitter: bool = True) -> T:
+        """
+        執行動作，失敗時依策略重試
+
+        不再重試時拋出最後一次的例外；斷路中拋出 CircuitOpenError
+        """
+        policies = self.policies if policies is None else policies
+        attempt = 0
+        while True:
+            self._check_circuit(name)
+            try:
+                result = func()
+            except Exception as e:
+                kind, delay = self._next_delay(name, e, attempt, policies, jitter)
+                if delay is None:
+                    raise
+                if kind == "rate_limited":
+                    RateGovernor.shared().wait_for_backoff()
+                elif delay:
+                    self.sleep(delay)
+                attempt += 1
+                continue
+            self._record_success(attempt)
+            return result
+
+    async def run_async(self, func: Callable[[], Awaitable[T]], name: str = "action",
+                        policies: Optional[Dict[str, Tuple[int, float, float]]] = None, jitter: bool = True) -> T:
+        """run() 的 async 版本（func 返回 awaitable）"""
+        policies = self.policies if policies is None else policies
+        attempt = 0
+        while True:
+            self._check_circuit(name)
+            try:
+                result = await func()
+            except Exception as e:
+                kind, delay = self._next_delay(name, e, attempt, policies, jitter)
+                if delay is None:
+                    raise
+                if kind == "rate_limited":
+                    await RateGovernor.shared().wait_for_backoff_async()
+                elif delay:
+                    await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._record_success(attempt)
+            return result
+
+    def summary(self) -> str:
+        """重試統計摘要"""
+        kinds = "、".join(f"{kind} {count}" for kind, count in sorted(self.stats["by_kind"].items())) or "無"
+        line = (
+            f"重試: 共 {self.stats['retries']} 次（{kinds}），恢復 {self.stats['recovered']} 次，"
+            f"預算用完 {self.stats['exhausted']} 次"
+        )
+        if self.stats["breaker_opened"]:
+            line += f"，斷路 {self.stats['breaker_opened']} 次、直接失敗 {self.stats['fail_fast']} 次"
+        return line
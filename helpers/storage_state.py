@@ -0,0 +1,305 @@
+"""驗證狀態管理 - 每個 session 只載入一次 storage state，並在 cookie 過期前自動更新"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from helpers.base_helpers import LogHelpers
+from helpers.file_lock import FileLock
+
+# 代表登入狀態的 cookie（其他 cookie 多為分析追蹤用途，過期與否不影響登入）
+AUTH_COOKIE_PREFIXES = ("wordpress_logged_in_", "wordpress_sec_", "user_id")
+
+BASE_URL = "https://www.dogcatstar.com"
+
+# 更新登入狀態的跨 worker 鎖：登入可能需要數十秒，等待與失效時間都比一般的檔案鎖長
+REFRESH_LOCK_TIMEOUT = 180.0
+
+# 測試（authenticated_page、StorageStateManager）讀取的驗證狀態檔案
+AUTH_FILE = "./fixtures/user.json"
+
+_LOGIN_NONCE_PATTERN = re.compile(
+    r"""<input[^>]*name=["']woocommerce-login-nonce["'][^>]*value=["']([^"']+)["']"""
+    r"""|<input[^>]*value=["']([^"']+)["'][^>]*name=["']woocommerce-login-nonce["']"""
+)
+
+
+def parse_login_nonce(html: str) -> Optional[str]:
+    """從 my-account 頁面取出 WooCommerce 登入表單的 nonce"""
+    match = _LOGIN_NONCE_PATTERN.search(html)
+    if match is None:
+        return None
+    return match.group(1) or match.group(2)
+
+
+def _has_auth_cookie(state: Dict) -> bool:
+    return any(c.get("name", "").startswith("wordpress_logged_in_") for c in state.get("cookies", []))
+
+
+def login_via_http(email: str, password: str, base_url: str = BASE_URL) -> Dict:
+    """
+    以 HTTP 直接送出登入表單取得新的 storage state（不啟動瀏覽器）
+
+    優先使用 WooCommerce 的 my-account 登入表單；頁面上沒有表單 nonce 時改用 wp-login.php
+    """
+    from playwright.sync_api import sync_playwright
+    from helpers.rate_governor import RateGovernor
+
+    RateGovernor.shared().acquire("login")
+    with sync_playwright() as p:
+        request = p.request.new_context(base_url=base_url)
+        try:
+            account_page = request.get("/my-account/")
+            nonce = parse_login_nonce(account_page.text())
+            if nonce is not None:
+                request.post("/my-account/", form={
+                    "username": email,
+                    "password": password,
+                    "rememberme": "forever",
+                    "woocommerce-login-nonce": nonce,
+                    "_wp_http_referer": "/my-account/",
+                    "login": "登入",
+                })
+            else:
+                # wp-login.php 需要先取得測試 cookie
+                request.get("/wp-login.php")
+                request.post("/wp-login.php", form={
+                    "log": email,
+                    "pwd": password,
+                    "rememberme": "forever",
+                    "wp-submit": "Log In",
+                    "redirect_to": f"{base_url}/my-account/",
+                    "testcookie": "1",
+                })
+
+            state = request.storage_state()
+        finally:
+            request.dispose()
+
+    if not _has_auth_cookie(state):
+        raise RuntimeError("HTTP 登入失敗：回應中沒有登入 cookie")
+    return state
+
+
+def login_via_ui(email: str, password: str, headless: bool = True) -> Dict:
+    """
+    以 UI 登入流程取得新的 storage state
+
+    會啟動獨立的 Playwright 實例，因此可以在背景執行緒中呼叫
+    """
+    from playwright.sync_api import sync_playwright
+    from pages.login_page import LoginPage
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        try:
+            context = browser.new_context()
+            page = context.new_page()
+            LoginPage(page).login_with_email_and_password(email, password)
+            return context.storage_state()
+        finally:
+            browser.close()
+
+
+def login(email: str, password: str, ui_fallback: bool = False) -> Dict:
+    """
+    取得新的 storage state：以 HTTP 登入
+
+    HTTP 登入失敗時預設直接拋出錯誤（UI 流程只保留給登入測試本身）；
+    ui_fallback=True（--auth-ui-fallback）時記錄錯誤後改用 UI 流程
+    """
+    try:
+        return login_via_http(email, password)
+    except Exception as e:
+        if not ui_fallback:
+            raise
+        LogHelpers.warning("HTTP 登入失敗，改用 UI 流程: %s", e)
+        return login_via_ui(email, password)
+
+
+class StorageStateManager:
+    """
+    storage state 的記憶體快取
+
+    - load() 只讀取並解析檔案一次，之後由 state 屬性直接提供已解析的 dict
+    - 依登入 cookie 的 expires 判斷有效期限，ensure_fresh() 在 session 開始時先行檢查
+    - start_background_refresh() 在過期前 refresh_margin 秒於背景執行緒更新狀態
+    - 平行執行時更新以檔案鎖互斥，取得鎖後先重新讀取檔案，其他 worker 已更新時直接採用，不重複登入
+    """
+
+    def __init__(self, path: str, refresher: Optional[Callable[[], Dict]] = None,
+                 refresh_margin: float = 600):
+        self.path = Path(path)
+        self.refresher = refresher
+        self.refresh_margin = refresh_margin
+        self._state: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._listeners: List[Callable[[Dict], None]] = []
+        self.file_lock = FileLock(self.path.with_suffix(self.path.suffix + ".lock"),
+                                  timeout=REFRESH_LOCK_TIMEOUT, stale_after=REFRESH_LOCK_TIMEOUT)
+        self.last_error: Optional[str] = None
+
+    def load(self) -> Dict:
+        """讀取並解析 storage state 檔案"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        with self._lock:
+            self._state = state
+        return state
+
+    @property
+    def state(self) -> Dict:
+        """已解析的 storage state（可直接傳給 new_context(storage_state=...)）"""
+        with self._lock:
+            state = self._state
+        return state if state is not None else self.load()
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """註冊狀態更新後的回呼（可能在背景執行緒中被呼叫）"""
+        self._listeners.append(callback)
+
+    def auth_cookies(self, state: Optional[Dict] = None) -> List[Dict]:
+        """取得代表登入狀態的 cookies（state 預設為目前的狀態，以下方法相同）"""
+        state = self.state if state is None else state
+        return [
+            cookie for cookie in state.get("cookies", [])
+            if cookie.get("name", "").startswith(AUTH_COOKIE_PREFIXES)
+        ]
+
+    def expires_at(self, state: Optional[Dict] = None) -> Optional[float]:
+        """登入 cookie 中最早的到期時間（epoch 秒），全為 session cookie 時回傳 None"""
+        expiries = [c["expires"] for c in self.auth_cookies(state) if c.get("expires", -1) > 0]
+        return min(expiries) if expiries else None
+
+    def seconds_remaining(self, state: Optional[Dict] = None) -> Optional[float]:
+        """距離登入狀態過期的秒數"""
+        expires_at = self.expires_at(state)
+        return None if expires_at is None else expires_at - time.time()
+
+    def needs_refresh(self, state: Optional[Dict] = None) -> bool:
+        """是否缺少登入 cookie，或已進入更新時間窗口"""
+        if not self.auth_cookies(state):
+            return True
+        remaining = self.seconds_remaining(state)
+        return remaining is not None and remaining <= self.refresh_margin
+
+    def refresh(self) -> bool:
+        """
+        執行更新並寫回檔案
+
+        持有檔案鎖期間只有一個 worker 登入；取得鎖後檔案已是其他 worker 更新過的有效狀態時直接載入。
+        更新在獨立執行緒中進行，避免與目前執行緒上的 Sync Playwright 衝突
+        返回: 是否更新成功
+        """
+        if self.refresher is None:
+            self.last_error = "未設定 refresher"
+            return False
+
+        try:
+            with self.file_lock:
+                if self._reload_if_fresh():
+                    return True
+                return self._refresh_locked()
+        except TimeoutError as e:
+            # 持有鎖的 worker 仍在登入：它若已寫回有效狀態就使用，否則視為本次更新失敗
+            if self._reload_if_fresh():
+                return True
+            self.last_error = str(e)
+            return False
+
+    def _reload_if_fresh(self) -> bool:
+        """重新讀取檔案，內容不需要更新時才採用並通知監聽者（先檢查解析結果，不暫時替換目前的狀態）"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if self.needs_refresh(state):
+            return False
+        with self._lock:
+            previous, self._state = self._state, state
+        self.last_error = None
+        if state != previous:
+            for callback in self._listeners:
+                callback(state)
+        return True
+
+    def _refresh_locked(self) -> bool:
+        result = {}
+
+        def run():
+            try:
+                result["state"] = self.refresher()
+            except Exception as e:
+                result["error"] = str(e)
+
+        worker = threading.Thread(target=run, name="storage-state-refresh", daemon=True)
+        worker.start()
+        worker.join()
+
+        if "state" not in result:
+            self.last_error = result.get("error", "refresher 未回傳狀態")
+            return False
+
+        self._write(result["state"])
+        with self._lock:
+            self._state = result["state"]
+        self.last_error = None
+        for callback in self._listeners:
+            callback(result["state"])
+        return True
+
+    def _write(self, state: Dict):
+        """以暫存檔 + 取代的方式寫回，避免其他 worker 讀到寫到一半的檔案"""
+        tmp_path = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def ensure_fresh(self) -> bool:
+        """
+        Session 開始時的前置檢查：狀態已過期或即將過期時立即更新
+
+        返回: 目前狀態是否可用
+        """
+        if not self.needs_refresh():
+            return True
+        if self.refresh():
+            return True
+        # 更新失敗但 cookie 尚未真正過期時仍可使用
+        remaining = self.seconds_remaining()
+        return bool(self.auth_cookies()) and (remaining is None or remaining > 0)
+
+    def start_background_refresh(self):
+        """排程在過期前 refresh_margin 秒自動更新"""
+        self.stop()
+        remaining = self.seconds_remaining()
+        if remaining is None or self.refresher is None:
+            return
+
+        self._schedule(max(0.0, remaining - self.refresh_margin))
+
+    def _schedule(self, delay: float):
+        """在 delay 秒後執行更新；失敗時只要狀態尚未過期就每分鐘重試"""
+        def on_timer():
+            if self.refresh():
+                self.start_background_refresh()
+                return
+            remaining = self.seconds_remaining()
+            if remaining is not None and remaining > 0:
+                self._schedule(min(60.0, remaining))
+
+        self._timer = threading.Timer(delay, on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop(self):
+        """取消背景更新"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,219 @@
+"""步驟追蹤 - 以巢狀的計時區段記錄 測試 → 頁面物件方法 → Playwright 動作，匯出 Chrome trace 與 CSV"""
+
+import csv
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# 啟用 --trace-steps 時包裝的 Playwright 動作（只包裝會與瀏覽器往返的方法）
+PLAYWRIGHT_ACTIONS = {
+    "Page": (
+        "goto", "reload", "go_back", "click", "fill", "evaluate", "screenshot", "content", "title",
+        "wait_for_load_state", "wait_for_url", "wait_for_selector", "wait_for_timeout",
+    ),
+    "Locator": (
+        "click", "fill", "clear", "press", "count", "all", "wait_for", "scroll_into_view_if_needed",
+        "text_content", "inner_text", "input_value", "is_visible", "is_checked", "evaluate",
+    ),
+}
+
+
+class StepTracer:
+    """
+    記憶體中的區段收集器
+
+    - span(): 明確的區段（測試、頁面物件方法、Playwright 動作）
+    - step(): 由 LogHelpers.log_step 呼叫，結束同一層上一個步驟並開始新的步驟，
+      外層區段結束時一併結束
+    停用時 step() 立即返回，不產生額外負擔
+    """
+
+    enabled = False
+    spans: List[Dict] = []
+    _local = threading.local()
+    _epoch = time.perf_counter()
+    _instrumented = False
+
+    @classmethod
+    def _stack(cls) -> List[Dict]:
+        stack = getattr(cls._local, "stack", None)
+        if stack is None:
+            stack = cls._local.stack = []
+        return stack
+
+    @classmethod
+    def _now_us(cls) -> float:
+        return (time.perf_counter() - cls._epoch) * 1_000_000
+
+    @classmethod
+    def open(cls, name: str, category: str, args: Optional[Dict] = None) -> Dict:
+        """開始區段並放到目前執行緒的堆疊上"""
+        stack = cls._stack()
+        span = {
+            "name": name,
+            "cat": category,
+            "ts": cls._now_us(),
+            "tid": threading.get_ident(),
+            "depth": len(stack),
+            "test": stack[0]["name"] if stack and stack[0]["cat"] == "test" else (name if category == "test" else ""),
+            "args": args or {},
+        }
+        stack.append(span)
+        return span
+
+    @classmethod
+    def close(cls, span: Dict):
+        """結束區段（連同其中尚未結束的子區段，例如最後一個步驟）"""
+        stack = cls._stack()
+        if span not in stack:
+            return
+        now = cls._now_us()
+        while stack:
+            top = stack.pop()
+            top["dur"] = now - top["ts"]
+            cls.spans.append(top)
+            if top is span:
+                break
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, category: str = "span", **args):
+        """計時區段（未啟用時不記錄）"""
+        if not cls.enabled:
+            yield None
+            return
+        span = cls.open(name, category, args)
+        try:
+            yield span
+        finally:
+            cls.close(span)
+
+    @classmethod
+    def step(cls, name: str):
+        """結束目前層級的上一個步驟，開始新的步驟"""
+        if not cls.enabled:
+            return
+        stack = cls._stack()
+        if stack and stack[-1]["cat"] == "step":
+            cls.close(stack[-1])
+        cls.open(name, "step")
+
+    @classmethod
+    def traced(cls, func, name: str, category: str):
+        """將函數包裝為區段"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cls.enabled:
+                return func(*args, **kwargs)
+            span_args = {}
+            if len(args) > 1 and isinstance(args[1], str):
+                span_args["arg"] = args[1][:200]
+            span = cls.open(name, category, span_args)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cls.close(span)
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    @classmethod
+    def instrument_class(cls, target: type, methods: Iterable[str], category: str):
+        """包裝類別上的方法（重複呼叫不會重複包裝）"""
+        for method in methods:
+            func = target.__dict__.get(method)
+            if func is None or not callable(func) or getattr(func, "__traced__", False):
+                continue
+            setattr(target, method, cls.traced(func, f"{target.__name__}.{method}", category))
+
+    @classmethod
+    def instrument_page_objects(cls, classes: Iterable[type]):
+        """包裝頁面物件的公開方法與建構子（建構子會導航）"""
+        for page_class in classes:
+            methods = [
+                name for name, value in vars(page_class).items()
+                if callable(value) and (name == "__init__" or not name.startswith("_"))
+            ]
+            cls.instrument_class(page_class, methods, "page_object")
+
+    @classmethod
+    def instrument_playwright(cls):
+        """包裝 playwright.sync_api 的 Page / Locator 動作"""
+        if cls._instrumented:
+            return
+        from playwright.sync_api import Locator, Page
+
+        cls.instrument_class(Page, PLAYWRIGHT_ACTIONS["Page"], "playwright")
+        cls.instrument_class(Locator, PLAYWRIGHT_ACTIONS["Locator"], "playwright")
+        cls._instrumented = True
+
+    @classmethod
+    def export(cls, results_dir: Path, process_name: str = "pytest") -> Optional[Path]:
+        """
+        寫出 trace.json（Chrome trace event 格式，可用 chrome://tracing 或 Perfetto 開啟）與 trace.csv
+
+        返回: trace.json 路徑，沒有區段時為 None
+        """
+        if not cls.spans:
+            return None
+        results_dir = Path(results_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        spans = sorted(cls.spans, key=lambda span: span["ts"])
+
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": process_name}}]
+        for span in spans:
+            events.append({
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": round(span["ts"], 1),
+                "dur": round(span["dur"], 1),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": dict(span["args"], test=span["test"]),
+            })
+        trace_path = results_dir / "trace.json"
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+        with open(results_dir / "trace.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["test", "depth", "category", "name", "start_ms", "duration_ms"])
+            for span in spans:
+                writer.writerow([
+                    span["test"], span["depth"], span["cat"], span["name"],
+                    f"{span['ts'] / 1000:.1f}", f"{span['dur'] / 1000:.1f}",
+                ])
+        return trace_path
+
+    @staticmethod
+    def merge_exports(trace_paths: Iterable[Path], results_dir: Path) -> Optional[Path]:
+        """
+        將各 worker 的 trace.json 合併為 results_dir/trace.json（各 worker 以 pid 顯示為不同程序）
+
+        返回: 合併後的路徑，沒有任何區段時為 None
+        """
+        events = []
+        for trace_path in trace_paths:
+            with open(trace_path, "r", encoding="utf-8") as f:
+                events.extend(json.load(f)["traceEvents"])
+        if not events:
+            return None
+        results_dir = Path(results_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        merged_path = results_dir / "trace.json"
+        with open(merged_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return merged_path
+
+    @classmethod
+    def slowest(cls, category: str = "step", limit: int = 5) -> List[Dict]:
+        """指定類型中耗時最長的區段"""
+        candidates = [span for span in cls.spans if span["cat"] == category]
+        return sorted(candidates, key=lambda span: span["dur"], reverse=True)[:limit]
@@ -0,0 +1,215 @@
+"""等待統計 - 記錄每次固定等待與條件等待的呼叫位置與耗時，找出最該移除的等待"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 條件等待在此毫秒數內返回，視為條件早已滿足（等待本身多餘）
+ALREADY_MET_MS = 50
+
+# 包裝的 Playwright 等待方法：(類別名稱, 方法, 類型)
+PLAYWRIGHT_WAITS = (
+    ("Page", "wait_for_timeout", "fixed"),
+    ("Page", "wait_for_load_state", "condition"),
+    ("Page", "wait_for_url", "condition"),
+    ("Page", "wait_for_selector", "condition"),
+    ("Locator", "wait_for", "condition"),
+)
+
+# WaitHelpers 與 AsyncWaitHelpers 的等待方法（pause 是固定等待，其餘為條件等待）
+HELPER_WAITS = (
+    "wait_for_element", "wait_for_dom_stable", "wait_for_visible", "wait_for_hidden", "wait_for_enabled",
+    "wait_for_any_visible", "wait_for_count_change", "wait_for_response", "pause",
+)
+
+# 尋找呼叫位置時略過的檔案（等待的實作本身）
+_SKIPPED_FILES = ("wait_accounting.py", "base_helpers.py", "async_helpers.py", "tracing.py")
+
+
+class WaitAccounting:
+    """
+    等待統計收集器
+
+    巢狀的等待（例如 WaitHelpers.wait_for_visible 內部的 locator.wait_for）只記錄最外層一次，
+    async 版本以 contextvars 判斷巢狀，同時進行的不同 task 各自記錄；
+    呼叫位置取自第一個不屬於 Playwright 與等待輔助函數的堆疊框架，例如 cart_page.py:add_first_product_to_cart
+    """
+
+    enabled = False
+    # {(呼叫位置, 類型): {"count", "total_ms", "max_ms", "already_met"}}
+    sites: Dict[Tuple[str, str], Dict] = {}
+    active_seconds = 0.0
+    _local = threading.local()
+    _async_depth = contextvars.ContextVar("wait_accounting_depth", default=0)
+    _playwright_dir: Optional[str] = None
+
+    @classmethod
+    def _is_skipped(cls, filename: str) -> bool:
+        if cls._playwright_dir and filename.startswith(cls._playwright_dir):
+            return True
+        return os.path.basename(filename) in _SKIPPED_FILES
+
+    @classmethod
+    def call_site(cls) -> str:
+        """第一個不屬於等待實作的呼叫位置"""
+        frame = sys._getframe(1)
+        while frame is not None and cls._is_skipped(frame.f_code.co_filename):
+            frame = frame.f_back
+        if frame is None:
+            return "unknown"
+        return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+    @classmethod
+    def record(cls, site: str, kind: str, elapsed_ms: float):
+        entry = cls.sites.setdefault((site, kind), {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "already_met": 0})
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        if kind == "condition" and elapsed_ms < ALREADY_MET_MS:
+            entry["already_met"] += 1
+
+    @classmethod
+    def wrap(cls, func, kind: str):
+        """包裝等待函數（只有最外層的等待會被記錄）"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cls.enabled or getattr(cls._local, "depth", 0):
+                return func(*args, **kwargs)
+            site = cls.call_site()
+            cls._local.depth = 1
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cls._local.depth = 0
+                cls.record(site, kind, (time.perf_counter() - started) * 1000)
+
+        wrapper.__wait_accounted__ = True
+        return wrapper
+
+    @classmethod
+    def wrap_async(cls, func, kind: str):
+        """
+        包裝 async 等待函數（只有同一 task 中最外層的等待會被記錄）
+
+        包裝後是回傳 coroutine 的一般函數：呼叫位置在建立 coroutine 時取得，
+        因此交給 asyncio.gather / create_task 在其他 task 中執行的等待仍記錄到呼叫它的函數，而不是 asyncio 內部
+        """
+        async def timed(site, args, kwargs):
+            token = cls._async_depth.set(1)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                cls._async_depth.reset(token)
+                cls.record(site, kind, (time.perf_counter() - started) * 1000)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cls.enabled or cls._async_depth.get():
+                return func(*args, **kwargs)
+            return timed(cls.call_site(), args, kwargs)
+
+        wrapper.__wait_accounted__ = True
+        return wrapper
+
+    @classmethod
+    def install(cls):
+        """包裝 Playwright（sync 與 async）與 WaitHelpers / AsyncWaitHelpers 的等待方法並開始統計"""
+        import playwright
+        from playwright import async_api, sync_api
+        from helpers.async_helpers import AsyncWaitHelpers
+        from helpers.base_helpers import WaitHelpers
+
+        cls._playwright_dir = os.path.dirname(playwright.__file__)
+        for api, wrap in ((sync_api, cls.wrap), (async_api, cls.wrap_async)):
+            for class_name, method, kind in PLAYWRIGHT_WAITS:
+                target = getattr(api, class_name)
+                func = target.__dict__[method]
+                if not getattr(func, "__wait_accounted__", False):
+                    setattr(target, method, wrap(func, kind))
+
+        for helpers, wrap in ((WaitHelpers, cls.wrap), (AsyncWaitHelpers, cls.wrap_async)):
+            for method in HELPER_WAITS:
+                func = helpers.__dict__[method].__func__
+                if not getattr(func, "__wait_accounted__", False):
+                    kind = "fixed" if method == "pause" else "condition"
+                    setattr(helpers, method, staticmethod(wrap(func, kind)))
+
+        cls.enabled = True
+
+    @classmethod
+    def add_active_time(cls, seconds: float):
+        """累計測試執行時間（計算等待佔比用）"""
+        cls.active_seconds += seconds
+
+    @classmethod
+    def totals(cls) -> Dict:
+        fixed = sum(e["total_ms"] for (_, kind), e in cls.sites.items() if kind == "fixed") / 1000
+        condition = sum(e["total_ms"] for (_, kind), e in cls.sites.items() if kind == "condition") / 1000
+        return {
+            "fixed_seconds": round(fixed, 3),
+            "condition_seconds": round(condition, 3),
+            "test_seconds": round(cls.active_seconds, 3),
+            "idle_fraction": round((fixed + condition) / cls.active_seconds, 4) if cls.active_seconds else None,
+        }
+
+    @classmethod
+    def ranked(cls) -> List[Dict]:
+        """依總等待時間排序的呼叫位置"""
+        rows = [
+            {"site": site, "kind": kind, "count": e["count"], "total_ms": round(e["total_ms"], 1),
+             "max_ms": round(e["max_ms"], 1), "already_met": e["already_met"]}
+            for (site, kind), e in cls.sites.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    @classmethod
+    def export(cls, results_dir: Path) -> Optional[Path]:
+        """寫出 waits.json（總計與各呼叫位置），沒有任何等待時返回 None"""
+        if not cls.sites:
+            return None
+        results_dir = Path(results_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        path = results_dir / "waits.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"totals": cls.totals(), "sites": cls.ranked()}, f, ensure_ascii=False, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: Path):
+        """將其他程序寫出的 waits.json 累加到目前的統計（平行模式的主程序合併各 worker 的結果）"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for row in data["sites"]:
+            entry = cls.sites.setdefault(
+                (row["site"], row["kind"]), {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "already_met": 0}
+            )
+            entry["count"] += row["count"]
+            entry["total_ms"] += row["total_ms"]
+            entry["max_ms"] = max(entry["max_ms"], row["max_ms"])
+            entry["already_met"] += row["already_met"]
+        cls.active_seconds += data["totals"]["test_seconds"]
+
+    @classmethod
+    def report(cls, limit: int = 10) -> List[str]:
+        """session 結束時輸出的排行"""
+        totals = cls.totals()
+        fraction = totals["idle_fraction"]
+        lines = [
+            f"等待統計: 固定等待 {totals['fixed_seconds']:.1f}s、條件等待 {totals['condition_seconds']:.1f}s"
+            + (f"，佔測試時間 {fraction:.1%}" if fraction is not None else "")
+        ]
+        for row in cls.ranked()[:limit]:
+            kind = "固定" if row["kind"] == "fixed" else "條件"
+            line = f"  {row['total_ms'] / 1000:7.2f}s  {kind}  {row['site']}  x{row['count']}"
+            if row["already_met"]:
+                line += f"（{row['already_met']} 次條件早已滿足）"
+            lines.append(line)
+        return lines
@@ -0,0 +1,4 @@
+# pages.aio 套件 - playwright.async_api 版本的頁面物件
+from pages.aio.cart_page import CartPage
+from pages.aio.login_page import LoginPage
+from pages.aio.myaccount_page import MyAccountPage
@@ -0,0 +1,405 @@
+from playwright.async_api import Page, expect
+from helpers.async_helpers import AsyncWaitHelpers
+from helpers.base_helpers import LogHelpers
+from helpers.locator_resolver import LocatorResolver
+from helpers.network_monitor import AsyncNetworkMonitor
+from helpers.popup_handler import AsyncPopupAutoDismisser
+from helpers.rate_governor import RateGovernor
+from helpers.retry_engine import CircuitOpenError, RetryEngine
+from helpers.product_extractor import ADD_TO_CART_SELECTOR, ProductExtractor
+from helpers.parallel import get_results_dir
+from pages.shared import (
+    CONFIRM_BUTTON_CHAIN, DELETE_BUTTON_CHAIN, EMPTY_CART_TEXT_SCRIPT, CartLocators, confirm_button_from_match,
+)
+
+
+class CartPage(CartLocators):
+    """購物車頁面 - Page Object Model（playwright.async_api 版本）"""
+
+    def __init__(self, page: Page):
+        # 建構子不能 await，請使用 await CartPage.open(page) 建立並導航到首頁
+        self.page = page
+        self.network = AsyncNetworkMonitor.install(page)
+
+    @classmethod
+    async def open(cls, page: Page) -> "CartPage":
+        """建立頁面物件並導航到首頁（對應同步版的建構子）"""
+        cart_page = cls(page)
+        await cart_page.page.goto("https://www.dogcatstar.com/")
+        return cart_page
+
+    async def close_popup_if_exists(self):
+        """
+        檢測並關閉購物車頁面上的彈出窗口
+        支持關閉按鈕和"今日不再顯示"按鈕
+        """
+        LogHelpers.debug("檢查是否有彈出窗口...")
+        dismisser = await AsyncPopupAutoDismisser.install(self.page)
+        closed = await dismisser.dismiss_visible()
+        if not closed:
+            LogHelpers.warning("彈出窗口未能關閉")
+        return closed
+
+    # 需要探測元素的定位器（其餘定位器見 CartLocators）
+    async def get_empty_cart_heading(self):
+        """購物車空頁面的標題"""
+        return await LocatorResolver.resolve_async(self.page, "CartPage.empty_cart_heading",
+                                                   self._empty_cart_heading_strategies())
+
+    async def get_cat_section_button(self):
+        """貓貓專區按鈕"""
+        return await LocatorResolver.resolve_async(self.page, "CartPage.cat_section_button",
+                                                   self._cat_section_strategies(), fallback=self._cat_section_fallback)
+
+    # ============ 購物車操作方法 ============
+
+    async def get_first_product_info(self):
+        """
+        獲取頁面上第一個產品的信息
+        返回: {'name': 產品名稱, 'price': 價格}
+        """
+        LogHelpers.log_step("尋找商品信息...")
+
+        products = await ProductExtractor.extract_async(self.page)
+        LogHelpers.log_step(f"找到 {len(products)} 個商品鏈接")
+
+        if len(products) > 0:
+            product_name = products[0]['name']
+            product_price = products[0]['price']
+            LogHelpers.log_step(f"✓ 找到商品: {product_name}")
+            LogHelpers.log_step(f"  價格: {product_price}")
+        else:
+            # 備用方案
+            LogHelpers.log_step("未找到商品鏈接，使用備用選擇器...")
+            product_name_locator = self.page.locator('.product-item-name, [class*="product-title"], h2, h3').first
+            product_name = (await product_name_locator.text_content()).strip() \
+                if await product_name_locator.count() > 0 else "Unknown Product"
+
+            price_locator = self.page.locator('[class*="price"], [class*="amount"]').first
+            product_price = (await price_locator.text_content()).strip() \
+                if await price_locator.count() > 0 else "Unknown Price"
+
+        return {
+            'name': product_name,
+            'price': product_price
+        }
+
+    async def add_first_product_to_cart(self, wait_for_observation=False):
+        """
+        添加第一個產品到購物車（含定制化選項處理和速率限制處理）
+
+        參數:
+            wait_for_observation (bool): 是否在操作完成後等待2秒以觀察結果（非headless模式）
+
+        返回: 產品信息 {'name': 名稱, 'price': 價格}
+        """
+        # 流程中會等待並操作商品選項對話框，期間暫停彈出視窗自動關閉
+        dismisser = await AsyncPopupAutoDismisser.install(self.page)
+        async with dismisser.suspended():
+            return await self._add_first_product_to_cart(wait_for_observation)
+
+    async def _add_first_product_to_cart(self, wait_for_observation):
+        LogHelpers.log_step("準備添加商品到購物車...")
+
+        LogHelpers.log_step("找到商品容器...")
+        products = await ProductExtractor.extract_async(self.page)
+
+        if len(products) == 0:
+            LogHelpers.log_step("ERROR: 未找到商品鏈接")
+            return await self.get_first_product_info()
+
+        product = ProductExtractor.first_addable(products) or products[0]
+        product_info = {'name': product['name'], 'price': product['price']}
+        LogHelpers.log_step(f"商品信息: {product_info['name']} - {product_info['price']}")
+
+        LogHelpers.log_step("滾動到商品...")
+        await ProductExtractor.container(self.page, product).scroll_into_view_if_needed()
+        await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=2000)
+
+        LogHelpers.log_step("尋找 '加入購物車' 按鈕...")
+        if product['can_add_to_cart']:
+            add_to_cart_button = ProductExtractor.add_to_cart_button(self.page, product)
+        else:
+            add_to_cart_button = self.page.locator(ADD_TO_CART_SELECTOR).first
+
+        if not (product['can_add_to_cart'] or await add_to_cart_button.count() > 0):
+            LogHelpers.log_step("ERROR: 未找到 '加入購物車' 按鈕")
+            return product_info
+
+        governor = RateGovernor.shared()
+        LogHelpers.log_step("✓ 找到按鈕，正在點擊...")
+        try:
+            await add_to_cart_button.scroll_into_view_if_needed()
+            await AsyncWaitHelpers.wait_for_enabled(add_to_cart_button, timeout=1000)
+            waited = await governor.acquire_async("add_to_cart")
+            if waited:
+                LogHelpers.log_step(f"請求節流，已等待 {waited:.1f} 秒")
+            checkpoint = self.network.checkpoint()
+            await RetryEngine.shared().run_async(lambda: add_to_cart_button.click(force=True), "add_to_cart_click")
+            LogHelpers.log_step("✓ 按鈕已點擊")
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            if "rate" in error_msg.lower() or "limit" in error_msg.lower():
+                LogHelpers.log_step(f"ERROR: 觸發速率限制: {error_msg}")
+                governor.report_rate_limit()
+            else:
+                LogHelpers.log_step(f"ERROR: Click failed with: {error_msg}")
+            return product_info
+
+        LogHelpers.log_step("等待選項對話框...")
+        await AsyncWaitHelpers.wait_for_any_visible(
+            self.page,
+            '[role="dialog"], [class*="modal"], [class*="popup"], button:has-text("確定加入")',
+            timeout=3000,
+        )
+        await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=1500)
+
+        if self.network.page_health(since=checkpoint)["rate_limited"]:
+            LogHelpers.log_step("ERROR: 檢測到速率限制回應")
+            waited = await governor.wait_for_backoff_async()
+            LogHelpers.log_step(f"共享退避 {waited:.1f} 秒")
+            await self.page.reload()
+            await self.page.wait_for_load_state("domcontentloaded", timeout=10000)
+
+        LogHelpers.log_step("處理定制化選項...")
+        await self._handle_product_customization()
+
+        LogHelpers.log_step("尋找確認按鈕...")
+        await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=1500)
+
+        confirm_button = confirm_button_from_match(await CONFIRM_BUTTON_CHAIN.resolve_async(self.page))
+
+        if confirm_button is not None:
+            try:
+                LogHelpers.log_step("點擊確認按鈕...")
+                await confirm_button.scroll_into_view_if_needed()
+                await AsyncWaitHelpers.wait_for_enabled(confirm_button, timeout=1000)
+                response = await AsyncWaitHelpers.wait_for_response(
+                    self.page,
+                    lambda r: "add_to_cart" in r.url or "add-to-cart" in r.url or "/cart" in r.url,
+                    action=lambda: RetryEngine.shared().run_async(
+                        lambda: confirm_button.click(force=True), "confirm_click"
+                    ),
+                    timeout=3000,
+                )
+                LogHelpers.log_step("✓ 確認按鈕已點擊")
+                if response is not None and response.status == 429:
+                    LogHelpers.log_step("ERROR: 確認時觸發速率限制")
+                elif response is not None:
+                    governor.report_success()
+                if response is None:
+                    await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=1500)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                error_msg = str(e)
+                if "rate" in error_msg.lower():
+                    LogHelpers.log_step(f"ERROR: 確認時觸發速率限制")
+                    governor.report_rate_limit()
+                else:
+                    LogHelpers.log_step(f"WARNING: Confirm click failed: {error_msg}")
+        else:
+            LogHelpers.log_step("WARNING: 未找到任何確認按鈕")
+
+        if wait_for_observation:
+            LogHelpers.log_step("等待觀察結果...")
+            await AsyncWaitHelpers.pause(self.page, 2000, "非 headless 模式下觀察結果")
+
+        return product_info
+
+    async def _handle_product_customization(self):
+        """
+        處理產品定制化選項（如規格、數量、顏色等）
+        優先選擇"鲁斯佛款"，否則選擇第一個可用選項
+        """
+        LogHelpers.debug("開始處理商品定制化選項...")
+        await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+
+        try:
+            LogHelpers.debug("策略 1: 尋找 '鲁斯佛款' 選項...")
+            rostoff_option = self.page.locator('button:has-text("鲁斯佛"), span:has-text("鲁斯佛")').first
+            if await rostoff_option.count() > 0:
+                try:
+                    await rostoff_option.click()
+                    await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                    LogHelpers.debug("✓ '鲁斯佛款' 已選擇")
+                    return
+                except Exception as e:
+                    LogHelpers.debug("✗ '鲁斯佛款' 點擊失敗: %s", e)
+
+            LogHelpers.debug("策略 2: 尋找規格選項按鈕...")
+            option_buttons = await self.page.locator(
+                'button[class*="variant"], button[class*="option"], button[class*="size"]'
+            ).all()
+            if len(option_buttons) > 0:
+                try:
+                    await option_buttons[0].click()
+                    await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                    LogHelpers.debug("✓ 規格選項已選擇")
+                    return
+                except Exception as e:
+                    LogHelpers.debug("✗ 規格選項點擊失敗: %s", e)
+
+            LogHelpers.debug("策略 3: 尋找單選按鈕或複選框...")
+            radio_buttons = await self.page.locator('input[type="radio"], input[type="checkbox"]').all()
+            try:
+                for radio in radio_buttons:
+                    if not await radio.is_checked():
+                        await radio.click()
+                        await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                        LogHelpers.debug("✓ 單選框已選擇")
+                        return
+            except Exception as e:
+                LogHelpers.debug("✗ 單選框處理失敗: %s", e)
+
+            LogHelpers.debug("策略 4: 尋找數量輸入框...")
+            quantity_input = self.page.locator('input[type="number"], input[name*="quantity"], input[name*="qty"]').first
+            if await quantity_input.count() > 0:
+                try:
+                    await quantity_input.clear()
+                    await quantity_input.fill("1")
+                    await AsyncWaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                    LogHelpers.debug("✓ 數量已設置為 1")
+                except Exception as e:
+                    LogHelpers.debug("✗ 數量輸入框處理失敗: %s", e)
+
+            LogHelpers.debug("商品定制化選項處理完成")
+
+        except Exception as e:
+            LogHelpers.warning("定制化處理期間發生異常: %s", e)
+
+    async def get_cart_items_count(self):
+        """
+        獲取購物車中商品的數量
+        返回: 商品數量 (int)
+        """
+        return await self.page.locator('[class*="cart-item"], tr[class*="item"]').count()
+
+    async def verify_product_in_cart(self, product_name):
+        """
+        驗證特定產品是否在購物車中
+        返回: True/False
+        """
+        return await self.page.locator(f'text="{product_name}"').count() > 0
+
+    async def clear_cart(self):
+        """
+        清空購物車中的所有商品
+        """
+        LogHelpers.log_step("尋找刪除按鈕...")
+
+        match = await DELETE_BUTTON_CHAIN.resolve_async(self.page)
+        if match is None:
+            LogHelpers.log_step("WARNING: 未找到任何刪除按鈕")
+            return
+
+        buttons = self.page.locator(match.candidate)
+        LogHelpers.log_step(f"✓ 找到 {match.count} 個刪除按鈕 (選擇器: {match.candidate})")
+
+        for attempt in range(match.count):
+            try:
+                remaining = await buttons.count()
+                if remaining == 0:
+                    LogHelpers.log_step("✓ 所有商品已刪除")
+                    break
+
+                btn = buttons.first
+                LogHelpers.log_step(f"點擊刪除按鈕 {attempt + 1}...")
+                await btn.scroll_into_view_if_needed()
+                await AsyncWaitHelpers.wait_for_enabled(btn, timeout=500)
+                await btn.click(force=True)
+                await AsyncWaitHelpers.wait_for_count_change(buttons, remaining, timeout=2000)
+            except Exception as e:
+                LogHelpers.log_step(f"WARNING: 刪除失敗: {str(e)}")
+                break
+
+    # 操作
+    async def go_to_cart(self):
+        """點擊購物車連結"""
+        await self.cart_link.click()
+
+    async def go_to_user(self):
+        """點擊使用者連結"""
+        await self.user_link.click()
+
+    async def verify_empty_cart(self):
+        """驗證購物車為空"""
+        empty_text = self.page.locator("text=/購物車.*空|cart.*empty/i")
+        if await empty_text.count() > 0:
+            assert await empty_text.is_visible(), "購物車為空提示不可見"
+            return
+
+        empty_div = self.page.get_by_test_id("paper-cart-empty")
+        if await empty_div.count() > 0:
+            assert await empty_div.is_visible(), "購物車空狀態指示符不可見"
+            return
+
+        cart_items = self.page.locator("[class*='cart-item'], [class*='product-item']")
+        if await cart_items.count() == 0:
+            return
+
+        health = self.network.page_health()
+        if health["cart_empty"]:
+            return
+
+        page_info = await self.page.evaluate(EMPTY_CART_TEXT_SCRIPT)
+        if page_info["empty_text"]:
+            return
+
+        if page_info["length"] < 5000 and not page_info["mentions_product"]:
+            LogHelpers.log_step("⚠️ 購物車頁面內容較少，判定為空")
+            return
+
+        print("\n❌ 購物車驗證失敗")
+        print(f"頁面 URL: {self.page.url}")
+        print(f"頁面標題: {await self.page.title()}")
+        print(f"頁面內容長度: {page_info['length']}")
+        if not health["ok"]:
+            print(f"網路狀態: {health}")
+
+        await self.page.screenshot(path=str(get_results_dir() / "cart_verification_failure.png"))
+
+        raise AssertionError("無法驗證購物車狀態 - 頁面內容無法判斷購物車是否為空")
+
+    async def click_cat_section(self):
+        """點擊貓貓專區"""
+        await (await self.get_cat_section_button()).click()
+
+    async def navigate_to_cat_section(self):
+        """導航到貓貓專區 - 別名方法"""
+        await self.click_cat_section()
+
+    async def click_ai_search(self):
+        """點擊AI搜尋"""
+        await self.ai_search_button.click()
+
+    async def search_product(self, keyword: str):
+        """搜尋產品"""
+        await self.ai_search_input.click()
+        await self.ai_search_input.fill(keyword)
+
+    async def click_first_product(self):
+        """點擊第一個產品"""
+        await self.product_links.first.click()
+
+    async def select_product_variant(self, variant_name: str):
+        """選擇產品變體（如款式）"""
+        await self.page.get_by_role("button", name=variant_name).click()
+
+    async def add_product_to_cart(self):
+        """新增產品到購物車"""
+        await self.add_to_cart_button.click()
+
+    async def close_popup(self):
+        """關閉彈出視窗"""
+        await self.popup_close_button.click()
+
+    async def verify_item_in_cart(self, item_name: str):
+        """驗證購物車中有特定商品"""
+        await expect(self.cart_item_heading).to_contain_text(item_name)
+
+    async def remove_item_from_cart(self, index: int = 0):
+        """從購物車刪除商品"""
+        await self.remove_button.filter(has_text="").nth(index).click()
@@ -0,0 +1,115 @@
+from playwright.async_api import Page
+from helpers.async_helpers import AsyncWaitHelpers
+from helpers.locator_resolver import LocatorResolver
+from helpers.rate_governor import RateGovernor
+from pages.shared import (
+    CONFIRM_BUTTONS_CHAIN, EMAIL_INPUT_SELECTOR, PASSWORD_INPUT_SELECTOR, LoginLocators, password_confirm_from_match,
+)
+
+
+class LoginPage(LoginLocators):
+    """登入頁面 - Page Object Model（playwright.async_api 版本）"""
+
+    def __init__(self, page: Page):
+        # 建構子不能 await，請使用 await LoginPage.open(page) 建立並導航到登入頁
+        self.page = page
+
+    @classmethod
+    async def open(cls, page: Page) -> "LoginPage":
+        """建立頁面物件並導航到登入頁（對應同步版的建構子）"""
+        login_page = cls(page)
+        await page.goto("https://www.dogcatstar.com/my-account/")
+        return login_page
+
+    # 需要探測元素的定位器（其餘定位器見 LoginLocators）
+    async def get_email_input_field(self):
+        """電郵輸入框"""
+        return await LocatorResolver.resolve_async(self.page, "LoginPage.email_input_field",
+                                                   self._email_input_strategies(), fallback=self._email_input_fallback)
+
+    async def get_email_confirm_button(self):
+        """電郵確認按鈕（第一個確認按鈕），沒有時為 None"""
+        buttons = self.confirm_buttons
+        return buttons.first if await buttons.count() > 0 else None
+
+    async def get_password_input_field(self):
+        """密碼輸入框"""
+        return await LocatorResolver.resolve_async(self.page, "LoginPage.password_input_field",
+                                                   self._password_input_strategies(), fallback=self._password_input_fallback)
+
+    async def get_password_confirm_button(self):
+        """密碼確認按鈕"""
+        return password_confirm_from_match(await CONFIRM_BUTTONS_CHAIN.resolve_async(self.page))
+
+    # 操作方法
+    async def login_with_email_and_password(self, email: str, password: str):
+        """使用電郵和密碼登入 - 分步驟操作"""
+        try:
+            # 所有 worker 共用的登入頻率限制
+            await RateGovernor.shared().acquire_async("login")
+
+            # 步驟 1: 點擊使用 Email 登入
+            await self.email_login_button.click()
+            await AsyncWaitHelpers.wait_for_any_visible(self.page, EMAIL_INPUT_SELECTOR)
+
+            # 步驟 2: 輸入電郵
+            email_field = await self.get_email_input_field()
+            await email_field.click()
+            await email_field.fill(email)
+
+            # 步驟 3: 點擊電郵確認按鈕
+            email_confirm = await self.get_email_confirm_button()
+            if email_confirm:
+                await email_confirm.click()
+                await AsyncWaitHelpers.wait_for_visible(self.password_login_button)
+
+            # 步驟 4: 點擊密碼登入
+            password_btn = self.password_login_button
+            await password_btn.scroll_into_view_if_needed()
+            await AsyncWaitHelpers.wait_for_enabled(password_btn)
+            await password_btn.click()
+            await AsyncWaitHelpers.wait_for_any_visible(self.page, PASSWORD_INPUT_SELECTOR)
+
+            # 步驟 5: 輸入密碼
+            password_field = await self.get_password_input_field()
+            await password_field.click()
+            await password_field.fill(password)
+
+            # 步驟 6: 點擊密碼確認按鈕
+            password_confirm = await self.get_password_confirm_button()
+            if password_confirm:
+                await password_confirm.click()
+                await self.page.wait_for_url("**/my-account/**", timeout=15000)
+
+        except Exception as e:
+            print(f"❌ 登入過程中出錯: {str(e)}")
+            raise
+
+    async def login_by_email(self):
+        """點擊電郵登入"""
+        await self.email_login_button.click()
+
+    async def enter_email(self, email: str):
+        """輸入電郵"""
+        await (await self.get_email_input_field()).fill(email)
+
+    async def confirm_email(self):
+        """確認電郵"""
+        email_confirm = await self.get_email_confirm_button()
+        if email_confirm:
+            await email_confirm.click()
+
+    async def login_with_password(self):
+        """點擊密碼登入"""
+        await self.password_login_button.click()
+
+    async def enter_password(self, password: str):
+        """輸入密碼"""
+        await (await self.get_password_input_field()).fill(password)
+
+    async def confirm_password(self):
+        """確認密碼"""
+        password_confirm = await self.get_password_confirm_button()
+        if password_confirm:
+            await password_confirm.click()
+            await self.page.wait_for_url("**/my-account/**", timeout=15000)
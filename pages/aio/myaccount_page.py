@@ -0,0 +1,20 @@
+from playwright.async_api import Page
+
+class MyAccountPage:
+    """我的帳戶頁面（playwright.async_api 版本，請使用 await MyAccountPage.open(page) 建立）"""
+
+    def __init__(self, page:Page):
+        self.page = page
+        self.email_login = page.get_by_role("button", name="使用 Email 登入")
+        self.email_input = page.get_by_role("textbox", name="請輸入")
+        self.email_confirm = page.get_by_role("button", name="確認")
+        self.usePassword_button = page.get_by_role("button", name="密碼登入")
+        self.password_input = page.get_by_role("textbox", name="請輸入")
+        self.login_button = page.get_by_role("button", name="確認")
+
+    @classmethod
+    async def open(cls, page: Page) -> "MyAccountPage":
+        """建立頁面物件並導航到我的帳戶頁面"""
+        my_account = cls(page)
+        await page.goto("https://www.dogcatstar.com/my-account/")
+        return my_account
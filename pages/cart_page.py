@@ -1,137 +1,50 @@
 from playwright.sync_api import Page, expect
-from helpers.base_helpers import LogHelpers
+from helpers.base_helpers import LogHelpers, WaitHelpers
+from helpers.locator_resolver import LocatorResolver
+from helpers.network_monitor import NetworkMonitor
+from helpers.popup_handler import PopupAutoDismisser
+from helpers.rate_governor import RateGovernor
+from helpers.retry_engine import CircuitOpenError, RetryEngine
+from helpers.product_extractor import ADD_TO_CART_SELECTOR, ProductExtractor
+from helpers.parallel import get_results_dir
+from pages.shared import (
+    CONFIRM_BUTTON_CHAIN, DELETE_BUTTON_CHAIN, EMPTY_CART_TEXT_SCRIPT, CartLocators, confirm_button_from_match,
+)
 
 
-class CartPage:
+class CartPage(CartLocators):
     """購物車頁面 - Page Object Model"""
 
     def __init__(self, page: Page):
         self.page = page
+        self.network = NetworkMonitor.install(page)
         self.page.goto("https://www.dogcatstar.com/")
     
     def close_popup_if_exists(self):
         """
         檢測並關閉購物車頁面上的彈出窗口
         支持關閉按鈕和"今日不再顯示"按鈕
+
+        頁面上已註冊 PopupAutoDismisser，之後出現的彈出窗口會在下一個動作前自動關閉；
+        這裡只處理目前已可見的彈出窗口（一次往返檢查）
         """
-        LogHelpers.log_step("檢查是否有彈出窗口...")
-        self.page.wait_for_timeout(1000)  # 等待彈出窗口加載
-        
-        # 查找彈出窗口容器
-        popup_selectors = [
-            '[role="dialog"]',
-            '[class*="modal"]',
-            '[class*="popup"]',
-            '[class*="overlay"]',
-            '.swal2-container',  # SweetAlert
-            '.modal',
-        ]
-        
-        popup_found = False
-        for selector in popup_selectors:
-            popups = self.page.locator(selector).all()
-            if len(popups) > 0:
-                # 檢查彈出窗口是否可見
-                for popup in popups:
-                    if popup.is_visible():
-                        LogHelpers.log_step(f"✓ 找到彈出窗口: {selector}")
-                        popup_found = True
-                        
-                        # 先嘗試找"今日不再顯示"按鈕
-                        do_not_show_button = popup.locator('button:has-text("今日不再顯示"), label:has-text("今日不再顯示")').first
-                        if do_not_show_button.count() > 0:
-                            try:
-                                LogHelpers.log_step("點擊 '今日不再顯示'...")
-                                do_not_show_button.click()
-                                self.page.wait_for_timeout(500)
-                            except Exception as e:
-                                LogHelpers.log_step(f"WARNING: 點擊失敗: {str(e)}")
-                        
-                        # 然後尋找關閉按鈕
-                        close_buttons = [
-                            popup.locator('button:has-text("關閉")'),
-                            popup.locator('button:has-text("×")'),
-                            popup.locator('button:has-text("X")'),
-                            popup.locator('button.close, button[class*="close"], button[aria-label*="close"]'),
-                            popup.locator('.swal2-close'),  # SweetAlert
-                        ]
-                        
-                        for close_btn in close_buttons:
-                            if close_btn.first.count() > 0:
-                                try:
-                                    LogHelpers.log_step("點擊關閉按鈕...")
-                                    close_btn.first.click(force=True)
-                                    self.page.wait_for_timeout(500)
-                                    LogHelpers.log_step("✓ 彈出窗口已關閉")
-                                    return True
-                                except Exception as e:
-                                    LogHelpers.log_step(f"WARNING: 關閉失敗: {str(e)}")
-                                    continue
-                        
-                        # 如果都找不到，嘗試點擊彈出窗口外部關閉
-                        try:
-                            LogHelpers.log_step("嘗試按 ESC 鍵關閉...")
-                            self.page.press("Escape")
-                            self.page.wait_for_timeout(500)
-                            LogHelpers.log_step("✓ 已按 ESC 鍵")
-                            return True
-                        except Exception as e:
-                            LogHelpers.log_step(f"WARNING: ESC 失敗: {str(e)}")
-        
-        if not popup_found:
-            LogHelpers.log_step("✓ 未發現彈出窗口")
-        
-        return not popup_found
-    
-    # 定位器
-    @property
-    def cart_link(self):
-        # 嘗試使用 test-id 或 icon 相關選擇器
-        return self.page.locator("a[href*='cart'], [class*='cart']").first
-    
-    @property
-    def user_link(self):
-        # 嘗試使用 test-id 或 icon 相關選擇器
-        return self.page.locator("a[href*='account'], [class*='user']").first
+        LogHelpers.debug("檢查是否有彈出窗口...")
+        closed = PopupAutoDismisser.install(self.page).dismiss_visible()
+        if not closed:
+            LogHelpers.warning("彈出窗口未能關閉")
+        return closed
     
+    # 定位器（其餘定位器見 CartLocators）
     @property
     def empty_cart_heading(self):
-        # 查找購物車空頁面的標題
-        empty_div = self.page.get_by_test_id("paper-cart-empty")
-        if empty_div.count() > 0:
-            heading = empty_div.locator("h1, h2, h3, h4, h5, h6, p").first
-            return heading
-        # 備選方案：查找包含特定文本的元素
-        return self.page.locator("text=購物車中沒有商品").first
+        # 查找購物車空頁面的標題（記住此頁面上成功的策略，下次優先嘗試）
+        return LocatorResolver.resolve(self.page, "CartPage.empty_cart_heading", self._empty_cart_heading_strategies())
     
     @property
     def cat_section_button(self):
-        # 多種選擇器嘗試方案
-        # 1. 先嘗試使用 role 選擇器
-        button = self.page.get_by_role("button", name="貓貓專區")
-        if button.count() > 0:
-            return button.first
-        
-        # 2. 嘗試使用文本包含
-        button = self.page.locator("button:has-text('貓貓專區')")
-        if button.count() > 0:
-            return button.first
-        
-        # 3. 嘗試使用任何包含"貓"的按鈕
-        button = self.page.locator("button, a, [role='button']").filter(has_text="貓")
-        if button.count() > 0:
-            return button.first
-        
-        # 4. 如果都找不到，返回一個會報錯的定位器
-        return self.page.locator("button:has-text('貓貓專區')")
-    
-    @property
-    def ai_search_button(self):
-        return self.page.get_by_role("button", name="AI搜尋")
-    
-    @property
-    def ai_search_input(self):
-        return self.page.get_by_role("textbox", name="毛孩腎病適合吃什麼？")
+        # 多種選擇器嘗試方案（記住此頁面上成功的策略，下次優先嘗試）
+        return LocatorResolver.resolve(self.page, "CartPage.cat_section_button", self._cat_section_strategies(),
+                                       fallback=self._cat_section_fallback)
     
     # ============ 購物車操作方法 ============
     
@@ -142,21 +55,14 @@ class CartPage:
         """
         LogHelpers.log_step("尋找商品信息...")
         
-        # 使用 WooCommerce 標準選擇器查找商品
-        # 嘗試使用 a.woocommerce-loop-product__link 這是真實商品鏈接
-        product_links = self.page.locator('a.woocommerce-loop-product__link').all()
-        LogHelpers.log_step(f"找到 {len(product_links)} 個商品鏈接")
+        # 使用 WooCommerce 標準選擇器（a.woocommerce-loop-product__link）一次讀取所有商品
+        products = ProductExtractor.extract(self.page)
+        LogHelpers.log_step(f"找到 {len(products)} 個商品鏈接")
         
-        if len(product_links) > 0:
-            # 使用第一個商品鏈接的文本作為商品名稱
-            first_product_link = product_links[0]
-            product_name = first_product_link.text_content().strip()
+        if len(products) > 0:
+            product_name = products[0]['name']
+            product_price = products[0]['price']
             LogHelpers.log_step(f"✓ 找到商品: {product_name}")
-            
-            # 尋找價格 - 通常在商品鏈接的父元素內
-            parent = first_product_link.locator("..")
-            price_locator = parent.locator('.price, .product-price, .woocommerce-Price-amount, [class*="price"]').first
-            product_price = price_locator.text_content().strip() if price_locator.count() > 0 else "N/A"
             LogHelpers.log_step(f"  價格: {product_price}")
         else:
             # 備用方案
@@ -181,60 +87,77 @@ class CartPage:
         
         返回: 產品信息 {'name': 名稱, 'price': 價格}
         """
+        # 流程中會等待並操作商品選項對話框，期間暫停彈出視窗自動關閉
+        with PopupAutoDismisser.install(self.page).suspended():
+            return self._add_first_product_to_cart(wait_for_observation)
+    
+    def _add_first_product_to_cart(self, wait_for_observation):
         LogHelpers.log_step("準備添加商品到購物車...")
         
-        # 先記錄產品信息
-        product_info = self.get_first_product_info()
-        LogHelpers.log_step(f"商品信息: {product_info['name']} - {product_info['price']}")
-        
-        # 找到第一個商品鏈接所在的容器
+        # 一次讀取頁面上的所有商品（名稱、價格、是否可直接加入購物車）
         LogHelpers.log_step("找到商品容器...")
-        product_links = self.page.locator('a.woocommerce-loop-product__link').all()
+        products = ProductExtractor.extract(self.page)
         
-        if len(product_links) == 0:
+        if len(products) == 0:
             LogHelpers.log_step("ERROR: 未找到商品鏈接")
-            return product_info
+            return self.get_first_product_info()
         
-        # 獲取第一個商品的容器（直接使用 Page 進行全頁搜索）
-        first_product_link = product_links[0]
+        # 優先選擇第一個有庫存且可直接加入購物車的商品
+        product = ProductExtractor.first_addable(products) or products[0]
+        product_info = {'name': product['name'], 'price': product['price']}
+        LogHelpers.log_step(f"商品信息: {product_info['name']} - {product_info['price']}")
         
-        LogHelpers.log_step("滾動到第一個商品...")
-        first_product_link.scroll_into_view_if_needed()
-        self.page.wait_for_timeout(2000)
+        LogHelpers.log_step("滾動到商品...")
+        ProductExtractor.container(self.page, product).scroll_into_view_if_needed()
+        WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=2000)  # 等待延遲載入的內容
         
-        # 在頁面上查找添加購物車按鈕（通常在第一個商品附近）
+        # 使用該商品卡片內的加入購物車按鈕；卡片內沒有按鈕時改為全頁搜尋
         LogHelpers.log_step("尋找 '加入購物車' 按鈕...")
-        add_to_cart_buttons = self.page.locator('button:has-text("加入購物車"), a.button:has-text("加入購物車"), .add-to-cart, button.add_to_cart').all()
-        LogHelpers.log_step(f"找到 {len(add_to_cart_buttons)} 個按鈕")
+        if product['can_add_to_cart']:
+            add_to_cart_button = ProductExtractor.add_to_cart_button(self.page, product)
+        else:
+            add_to_cart_button = self.page.locator(ADD_TO_CART_SELECTOR).first
         
-        if len(add_to_cart_buttons) > 0:
-            # 使用第一個按鈕
-            add_to_cart_button = add_to_cart_buttons[0]
+        if product['can_add_to_cart'] or add_to_cart_button.count() > 0:
+            governor = RateGovernor.shared()
             LogHelpers.log_step("✓ 找到按鈕，正在點擊...")
             try:
                 add_to_cart_button.scroll_into_view_if_needed()
-                self.page.wait_for_timeout(1000)
-                add_to_cart_button.click(force=True)
+                WaitHelpers.wait_for_enabled(add_to_cart_button, timeout=1000)
+                # 所有 worker 共用的加入購物車頻率限制
+                waited = governor.acquire("add_to_cart")
+                if waited:
+                    LogHelpers.log_step(f"請求節流，已等待 {waited:.1f} 秒")
+                checkpoint = self.network.checkpoint()
+                # 元素重新渲染、暫時性的網站異常時依策略重試
+                RetryEngine.shared().run(lambda: add_to_cart_button.click(force=True), "add_to_cart_click")
                 LogHelpers.log_step("✓ 按鈕已點擊")
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 error_msg = str(e)
                 if "rate" in error_msg.lower() or "limit" in error_msg.lower():
                     LogHelpers.log_step(f"ERROR: 觸發速率限制: {error_msg}")
-                    LogHelpers.log_step("等待 60 秒後重試...")
-                    self.page.wait_for_timeout(60000)
+                    # 通知所有 worker 一起退避，由下一次 acquire 等待
+                    governor.report_rate_limit()
                 else:
                     LogHelpers.log_step(f"ERROR: Click failed with: {error_msg}")
                 return product_info
             
-            # 等待任何選項對話框或選擇面板出現（增加等待時間）
-            LogHelpers.log_step("等待選項對話框（3秒）...")
-            self.page.wait_for_timeout(3000)
+            # 等待任何選項對話框或選擇面板出現（最多 3 秒）
+            LogHelpers.log_step("等待選項對話框...")
+            WaitHelpers.wait_for_any_visible(
+                self.page,
+                '[role="dialog"], [class*="modal"], [class*="popup"], button:has-text("確定加入")',
+                timeout=3000,
+            )
+            WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=1500)
             
-            # 檢查是否出現速率限制錯誤
-            if "rate limit" in self.page.content().lower() or "too many requests" in self.page.content().lower():
-                LogHelpers.log_step("ERROR: 檢測到速率限制訊息")
-                LogHelpers.log_step("等待 90 秒...")
-                self.page.wait_for_timeout(90000)
+            # 檢查點擊後的回應是否觸發速率限制（監控器已通知所有 worker 退避）
+            if self.network.page_health(since=checkpoint)["rate_limited"]:
+                LogHelpers.log_step("ERROR: 檢測到速率限制回應")
+                waited = governor.wait_for_backoff()
+                LogHelpers.log_step(f"共享退避 {waited:.1f} 秒")
                 # 嘗試重新加載頁面
                 self.page.reload()
                 self.page.wait_for_load_state("domcontentloaded", timeout=10000)
@@ -245,43 +168,41 @@ class CartPage:
             
             # 尋找並點擊確認按鈕
             LogHelpers.log_step("尋找確認按鈕...")
-            self.page.wait_for_timeout(1500)
-            
-            # 嘗試多種確認按鈕選擇器
-            confirm_button = None
-            for selector in [
-                'button:has-text("確定加入")',
-                'button:has-text("確認")',
-                'button:has-text("確定")',
-                'button.confirm, button.submit'
-            ]:
-                btn = self.page.locator(selector).first
-                if btn.count() > 0:
-                    LogHelpers.log_step(f"✓ 找到確認按鈕: {selector}")
-                    confirm_button = btn
-                    break
+            WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=1500)
             
-            # 如果沒找到確認按鈕，試試找第二個"加入購物車"按鈕
-            if confirm_button is None:
-                all_add_buttons = self.page.locator('button:has-text("加入購物車")').all()
-                if len(all_add_buttons) > 1:
-                    LogHelpers.log_step(f"✓ 找到 {len(all_add_buttons)} 個按鈕，使用第二個")
-                    confirm_button = all_add_buttons[1]
+            # 一次頁面內執行找出第一個存在的確認按鈕選擇器
+            confirm_button = confirm_button_from_match(CONFIRM_BUTTON_CHAIN.resolve(self.page))
             
             # 點擊確認按鈕
             if confirm_button is not None:
                 try:
                     LogHelpers.log_step("點擊確認按鈕...")
                     confirm_button.scroll_into_view_if_needed()
-                    self.page.wait_for_timeout(1000)
-                    confirm_button.click(force=True)
+                    WaitHelpers.wait_for_enabled(confirm_button, timeout=1000)
+                    # 點擊後等待加入購物車的請求完成（最多 3 秒）
+                    response = WaitHelpers.wait_for_response(
+                        self.page,
+                        lambda r: "add_to_cart" in r.url or "add-to-cart" in r.url or "/cart" in r.url,
+                        action=lambda: RetryEngine.shared().run(
+                            lambda: confirm_button.click(force=True), "confirm_click"
+                        ),
+                        timeout=3000,
+                    )
                     LogHelpers.log_step("✓ 確認按鈕已點擊")
-                    self.page.wait_for_timeout(3000)
+                    if response is not None and response.status == 429:
+                        # 監控器已通知所有 worker 退避
+                        LogHelpers.log_step("ERROR: 確認時觸發速率限制")
+                    elif response is not None:
+                        governor.report_success()
+                    if response is None:
+                        WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=300, timeout=1500)
+                except CircuitOpenError:
+                    raise
                 except Exception as e:
                     error_msg = str(e)
                     if "rate" in error_msg.lower():
                         LogHelpers.log_step(f"ERROR: 確認時觸發速率限制")
-                        self.page.wait_for_timeout(90000)
+                        governor.report_rate_limit()
                     else:
                         LogHelpers.log_step(f"WARNING: Confirm click failed: {error_msg}")
             else:
@@ -290,7 +211,7 @@ class CartPage:
             # 如果需要觀察，等待2秒
             if wait_for_observation:
                 LogHelpers.log_step("等待觀察結果...")
-                self.page.wait_for_timeout(2000)
+                WaitHelpers.pause(self.page, 2000, "非 headless 模式下觀察結果")
         else:
             LogHelpers.log_step("ERROR: 未找到 '加入購物車' 按鈕")
         
@@ -301,81 +222,81 @@ class CartPage:
         處理產品定制化選項（如規格、數量、顏色等）
         優先選擇"鲁斯佛款"，否則選擇第一個可用選項
         """
-        LogHelpers.log_step("開始處理商品定制化選項...")
-        self.page.wait_for_timeout(500)
+        LogHelpers.debug("開始處理商品定制化選項...")
+        WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
         
         try:
             # 策略1: 尋找並點擊"鲁斯佛款"選項
-            LogHelpers.log_step("策略 1: 尋找 '鲁斯佛款' 選項...")
+            LogHelpers.debug("策略 1: 尋找 '鲁斯佛款' 選項...")
             rostoff_option = self.page.locator('button:has-text("鲁斯佛"), span:has-text("鲁斯佛")').first
             if rostoff_option.count() > 0:
                 try:
-                    LogHelpers.log_step("✓ 找到 '鲁斯佛款' 選項，正在點擊...")
+                    LogHelpers.debug("✓ 找到 '鲁斯佛款' 選項，正在點擊...")
                     rostoff_option.click()
-                    self.page.wait_for_timeout(500)
-                    LogHelpers.log_step("✓ '鲁斯佛款' 已選擇")
+                    WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                    LogHelpers.debug("✓ '鲁斯佛款' 已選擇")
                     return
                 except Exception as e:
-                    LogHelpers.log_step(f"✗ '鲁斯佛款' 點擊失敗: {str(e)}")
+                    LogHelpers.debug("✗ '鲁斯佛款' 點擊失敗: %s", e)
             else:
-                LogHelpers.log_step("✗ 未找到 '鲁斯佛款' 選項")
+                LogHelpers.debug("✗ 未找到 '鲁斯佛款' 選項")
             
             # 策略2: 尋找並點擊任何規格選項按鈕
-            LogHelpers.log_step("策略 2: 尋找規格選項按鈕...")
+            LogHelpers.debug("策略 2: 尋找規格選項按鈕...")
             option_buttons = self.page.locator('button[class*="variant"], button[class*="option"], button[class*="size"]').all()
-            LogHelpers.log_step(f"找到 {len(option_buttons)} 個規格選項按鈕")
+            LogHelpers.debug("找到 %d 個規格選項按鈕", len(option_buttons))
             if len(option_buttons) > 0:
                 try:
                     button_text = option_buttons[0].text_content()
-                    LogHelpers.log_step(f"正在點擊第一個規格按鈕: '{button_text}'")
+                    LogHelpers.debug("正在點擊第一個規格按鈕: '%s'", button_text)
                     option_buttons[0].click()
-                    self.page.wait_for_timeout(500)
-                    LogHelpers.log_step("✓ 規格選項已選擇")
+                    WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                    LogHelpers.debug("✓ 規格選項已選擇")
                     return
                 except Exception as e:
-                    LogHelpers.log_step(f"✗ 規格選項點擊失敗: {str(e)}")
+                    LogHelpers.debug("✗ 規格選項點擊失敗: %s", e)
             else:
-                LogHelpers.log_step("✗ 未找到規格選項按鈕")
+                LogHelpers.debug("✗ 未找到規格選項按鈕")
             
             # 策略3: 選擇單選按鈕或複選框
-            LogHelpers.log_step("策略 3: 尋找單選按鈕或複選框...")
+            LogHelpers.debug("策略 3: 尋找單選按鈕或複選框...")
             radio_buttons = self.page.locator('input[type="radio"], input[type="checkbox"]').all()
-            LogHelpers.log_step(f"找到 {len(radio_buttons)} 個單選/複選框")
+            LogHelpers.debug("找到 %d 個單選/複選框", len(radio_buttons))
             if len(radio_buttons) > 0:
                 try:
                     # 查找第一個未勾選的
                     for j, radio in enumerate(radio_buttons):
                         is_checked = radio.is_checked()
-                        LogHelpers.log_step(f"單選框 {j+1}: 已勾選={is_checked}")
+                        LogHelpers.debug("單選框 %d: 已勾選=%s", j+1, is_checked)
                         if not is_checked:
-                            LogHelpers.log_step(f"正在點擊未勾選的單選框 {j+1}...")
+                            LogHelpers.debug("正在點擊未勾選的單選框 %d...", j+1)
                             radio.click()
-                            self.page.wait_for_timeout(500)
-                            LogHelpers.log_step("✓ 單選框已選擇")
+                            WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                            LogHelpers.debug("✓ 單選框已選擇")
                             return
                 except Exception as e:
-                    LogHelpers.log_step(f"✗ 單選框處理失敗: {str(e)}")
+                    LogHelpers.debug("✗ 單選框處理失敗: %s", e)
             
             # 策略4: 尋找並調整數量為1
-            LogHelpers.log_step("策略 4: 尋找數量輸入框...")
+            LogHelpers.debug("策略 4: 尋找數量輸入框...")
             quantity_input = self.page.locator('input[type="number"], input[name*="quantity"], input[name*="qty"]').first
             if quantity_input.count() > 0:
                 try:
                     current_value = quantity_input.input_value()
-                    LogHelpers.log_step(f"找到數量輸入框，當前值: {current_value}")
+                    LogHelpers.debug("找到數量輸入框，當前值: %s", current_value)
                     quantity_input.clear()
                     quantity_input.fill("1")
-                    self.page.wait_for_timeout(500)
-                    LogHelpers.log_step("✓ 數量已設置為 1")
+                    WaitHelpers.wait_for_dom_stable(self.page, quiet_ms=200, timeout=500)
+                    LogHelpers.debug("✓ 數量已設置為 1")
                 except Exception as e:
-                    LogHelpers.log_step(f"✗ 數量輸入框處理失敗: {str(e)}")
+                    LogHelpers.debug("✗ 數量輸入框處理失敗: %s", e)
             else:
-                LogHelpers.log_step("✗ 未找到數量輸入框")
+                LogHelpers.debug("✗ 未找到數量輸入框")
             
-            LogHelpers.log_step("商品定制化選項處理完成")
+            LogHelpers.debug("商品定制化選項處理完成")
         
         except Exception as e:
-            LogHelpers.log_step(f"WARNING: 定制化處理期間發生異常: {str(e)}")
+            LogHelpers.warning("定制化處理期間發生異常: %s", e)
     
     def get_cart_items_count(self):
         """
@@ -401,66 +322,39 @@ class CartPage:
         """
         LogHelpers.log_step("尋找刪除按鈕...")
         
-        # 嘗試多種刪除按鈕選擇器
-        selectors = [
-            'button:has-text("刪除")',
-            'button:has-text("移除")',
-            'button:has-text("Remove")',
-            'button.remove, a.remove, [class*="remove"]',
-            '.product-remove a, .product-remove button',
-            'a[data-product_key]'  # WooCommerce 標準刪除按鈕
-        ]
+        # 一次頁面內執行找出第一個存在的刪除按鈕選擇器
+        match = DELETE_BUTTON_CHAIN.resolve(self.page)
+        if match is None:
+            LogHelpers.log_step("WARNING: 未找到任何刪除按鈕")
+            return
         
-        for selector in selectors:
-            delete_buttons = self.page.locator(selector).all()
-            if len(delete_buttons) > 0:
-                LogHelpers.log_step(f"✓ 找到 {len(delete_buttons)} 個刪除按鈕 (選擇器: {selector})")
-                
-                # 逐個點擊刪除按鈕
-                attempt = 0
-                while attempt < len(delete_buttons):
-                    try:
-                        # 重新查找按鈕，因為 DOM 可能已更改
-                        new_buttons = self.page.locator(selector).all()
-                        if len(new_buttons) == 0:
-                            LogHelpers.log_step("✓ 所有商品已刪除")
-                            break
-                        
-                        btn = new_buttons[0]
-                        LogHelpers.log_step(f"點擊刪除按鈕 {attempt + 1}...")
-                        btn.scroll_into_view_if_needed()
-                        self.page.wait_for_timeout(500)
-                        btn.click(force=True)
-                        LogHelpers.log_step("✓ 已點擊")
-                        self.page.wait_for_timeout(2000)  # 等待購物車更新
-                        attempt += 1
-                    except Exception as e:
-                        LogHelpers.log_step(f"WARNING: 刪除失敗: {str(e)}")
-                        break
-                
-                return  # 成功找到並嘗試刪除
+        selector = match.candidate
+        LogHelpers.log_step(f"✓ 找到 {match.count} 個刪除按鈕 (選擇器: {selector})")
         
-        LogHelpers.log_step("WARNING: 未找到任何刪除按鈕")
-    
-    @property
-    def product_links(self):
-        return self.page.get_by_role("link", name="product")
-    
-    @property
-    def add_to_cart_button(self):
-        return self.page.get_by_test_id("button-add-to-cart")
-    
-    @property
-    def popup_close_button(self):
-        return self.page.get_by_test_id("popup-close-button")
-    
-    @property
-    def cart_item_heading(self):
-        return self.page.get_by_test_id("paper-card-main-normal").locator("h6")
-    
-    @property
-    def remove_button(self):
-        return self.page.get_by_test_id("paper-card-main-normal").get_by_role("button")
+        # 逐個點擊刪除按鈕
+        attempt = 0
+        while attempt < match.count:
+            try:
+                # 重新查找按鈕，因為 DOM 可能已更改
+                new_buttons = self.page.locator(selector).all()
+                if len(new_buttons) == 0:
+                    LogHelpers.log_step("✓ 所有商品已刪除")
+                    break
+                
+                btn = new_buttons[0]
+                LogHelpers.log_step(f"點擊刪除按鈕 {attempt + 1}...")
+                btn.scroll_into_view_if_needed()
+                WaitHelpers.wait_for_enabled(btn, timeout=500)
+                btn.click(force=True)
+                LogHelpers.log_step("✓ 已點擊")
+                # 等待購物車更新：刪除按鈕數量改變即表示該商品已移除
+                WaitHelpers.wait_for_count_change(
+                    self.page.locator(selector), len(new_buttons), timeout=2000
+                )
+                attempt += 1
+            except Exception as e:
+                LogHelpers.log_step(f"WARNING: 刪除失敗: {str(e)}")
+                break
     
     # 操作
     def go_to_cart(self):
@@ -491,13 +385,18 @@ class CartPage:
             # 沒有項目，購物車為空
             return
         
-        # 方法 4: 直接檢查頁面內容
-        page_text = self.page.content()
-        if "購物車中沒有商品" in page_text or "Your cart is empty" in page_text or "cart is empty" in page_text.lower():
+        # 方法 4: 購物車 AJAX 回應已表明購物車為空
+        health = self.network.page_health()
+        if health["cart_empty"]:
+            return
+        
+        # 方法 5: 在頁面內檢查內容（只回傳結果，不把整頁 HTML 傳回 Python）
+        page_info = self.page.evaluate(EMPTY_CART_TEXT_SCRIPT)
+        if page_info["empty_text"]:
             return
         
         # 如果頁面長度很小且沒有明顯產品內容，可能就是空的
-        if len(page_text) < 5000 and "product" not in page_text.lower():
+        if page_info["length"] < 5000 and not page_info["mentions_product"]:
             LogHelpers.log_step("⚠️ 購物車頁面內容較少，判定為空")
             return
         
@@ -505,10 +404,12 @@ class CartPage:
         print("\n❌ 購物車驗證失敗")
         print(f"頁面 URL: {self.page.url}")
         print(f"頁面標題: {self.page.title()}")
-        print(f"頁面內容長度: {len(page_text)}")
+        print(f"頁面內容長度: {page_info['length']}")
+        if not health["ok"]:
+            print(f"網路狀態: {health}")
         
         # 拍攝截圖用於診斷
-        self.page.screenshot(path="./test-results/cart_verification_failure.png")
+        self.page.screenshot(path=str(get_results_dir() / "cart_verification_failure.png"))
         
         raise AssertionError("無法驗證購物車狀態 - 頁面內容無法判斷購物車是否為空")
     
@@ -1,100 +1,85 @@
 from playwright.sync_api import Page
+from helpers.base_helpers import WaitHelpers
+from helpers.locator_resolver import LocatorResolver
+from helpers.rate_governor import RateGovernor
+from pages.shared import (
+    CONFIRM_BUTTONS_CHAIN, EMAIL_INPUT_SELECTOR, PASSWORD_INPUT_SELECTOR, LoginLocators, password_confirm_from_match,
+)
 
 
-class LoginPage:
+class LoginPage(LoginLocators):
     """登入頁面 - Page Object Model"""
 
     def __init__(self, page: Page):
         self.page = page
         self.page.goto("https://www.dogcatstar.com/my-account/")
     
-    # 定位器 - 使用更穩健的策略
-    @property
-    def email_login_button(self):
-        """使用 Email 登入按鈕"""
-        return self.page.get_by_role("button", name="使用 Email 登入")
-    
+    # 定位器 - 使用更穩健的策略（其餘定位器見 LoginLocators）
     @property
     def email_input_field(self):
         """電郵輸入框 - 使用特定的選擇器"""
-        # 嘗試使用 get_by_placeholder 先找到具體的郵件輸入框
-        email_field = self.page.locator("input[type='email'], input[placeholder*='郵']").first
-        if email_field.count() > 0:
-            return email_field
-        # 備選方案：使用 get_by_role 但加上更多過濾
-        return self.page.get_by_role("textbox").locator("visible=true").first
+        return LocatorResolver.resolve(self.page, "LoginPage.email_input_field", self._email_input_strategies(),
+                                       fallback=self._email_input_fallback)
     
     @property
     def email_confirm_button(self):
         """電郵確認按鈕 - 查找所有確認按鈕的第一個"""
-        buttons = self.page.get_by_role("button", name="確認")
+        buttons = self.confirm_buttons
         return buttons.first if buttons.count() > 0 else None
     
-    @property
-    def password_login_button(self):
-        """密碼登入按鈕"""
-        return self.page.get_by_role("button", name="密碼登入")
-    
     @property
     def password_input_field(self):
         """密碼輸入框 - 使用特定的選擇器"""
-        # 嘗試使用 get_by_type 選擇密碼輸入框
-        password_field = self.page.locator("input[type='password']").first
-        if password_field.count() > 0:
-            return password_field
-        # 備選方案
-        return self.page.get_by_role("textbox").nth(1)
+        return LocatorResolver.resolve(self.page, "LoginPage.password_input_field", self._password_input_strategies(),
+                                       fallback=self._password_input_fallback)
     
     @property
     def password_confirm_button(self):
         """密碼確認按鈕 - 查找所有確認按鈕的最後一個"""
-        buttons = self.page.get_by_role("button", name="確認")
-        if buttons.count() > 1:
-            return buttons.nth(1)
-        elif buttons.count() > 0:
-            return buttons.last
-        return None
+        return password_confirm_from_match(CONFIRM_BUTTONS_CHAIN.resolve(self.page))
     
     # 操作方法
     def login_with_email_and_password(self, email: str, password: str):
         """使用電郵和密碼登入 - 分步驟操作"""
         try:
+            # 所有 worker 共用的登入頻率限制
+            RateGovernor.shared().acquire("login")
+            
             # 步驟 1: 點擊使用 Email 登入
             email_btn = self.email_login_button
             if email_btn:
                 email_btn.click()
-                self.page.wait_for_timeout(500)
+                # 等待電郵輸入框出現
+                WaitHelpers.wait_for_any_visible(self.page, EMAIL_INPUT_SELECTOR)
             
-            # 步驟 2: 輸入電郵
+            # 步驟 2: 輸入電郵（fill 會自動等待輸入框可編輯）
             email_field = self.email_input_field
             if email_field:
                 email_field.click()
-                self.page.wait_for_timeout(200)
                 email_field.fill(email)
-                self.page.wait_for_timeout(300)
             
             # 步驟 3: 點擊電郵確認按鈕
             email_confirm = self.email_confirm_button
             if email_confirm:
                 email_confirm.click()
-                self.page.wait_for_timeout(1500)  # 等待頁面轉換到密碼步驟
+                # 等待頁面轉換到密碼步驟
+                WaitHelpers.wait_for_visible(self.password_login_button)
             
             # 步驟 4: 檢查密碼登入按鈕是否出現
             password_btn = self.password_login_button
             if password_btn:
                 # 確保按鈕可見且可點擊
                 password_btn.scroll_into_view_if_needed()
-                self.page.wait_for_timeout(300)
+                WaitHelpers.wait_for_enabled(password_btn)
                 password_btn.click()
-                self.page.wait_for_timeout(500)
+                # 等待密碼輸入框出現
+                WaitHelpers.wait_for_any_visible(self.page, PASSWORD_INPUT_SELECTOR)
             
             # 步驟 5: 輸入密碼
             password_field = self.password_input_field
             if password_field:
                 password_field.click()
-                self.page.wait_for_timeout(200)
                 password_field.fill(password)
-                self.page.wait_for_timeout(300)
             
             # 步驟 6: 點擊密碼確認按鈕
             password_confirm = self.password_confirm_button
@@ -0,0 +1,180 @@
+"""
+同步與 async 頁面物件共用的腳本、定位器鏈與定位器
+
+定位器只是描述，建立時不與瀏覽器往返，因此 *Locators 類別的屬性對 playwright.sync_api 與
+playwright.async_api 的 Page 都適用；需要探測元素的部分由各版本的頁面物件自行呼叫
+"""
+
+from helpers.base_helpers import LogHelpers
+from helpers.locator_chain import LocatorChain
+
+# 在頁面內檢查購物車為空的文字與頁面大小
+EMPTY_CART_TEXT_SCRIPT = """
+() => {
+    const html = document.documentElement.outerHTML;
+    const lowered = html.toLowerCase();
+    return {
+        length: html.length,
+        empty_text: html.includes('購物車中沒有商品') || lowered.includes('cart is empty'),
+        mentions_product: lowered.includes('product'),
+    };
+}
+"""
+
+# 加入購物車彈窗的確認按鈕候選（依序）；都沒有時使用第二個「加入購物車」按鈕
+CONFIRM_BUTTON_CHAIN = LocatorChain("confirm", [
+    'button:has-text("確定加入")',
+    'button:has-text("確認")',
+    'button:has-text("確定")',
+    'button.confirm, button.submit',
+    'button:has-text("加入購物車")',
+])
+
+# 購物車刪除按鈕候選（依序）
+DELETE_BUTTON_CHAIN = LocatorChain("delete", [
+    'button:has-text("刪除")',
+    'button:has-text("移除")',
+    'button:has-text("Remove")',
+    'button.remove, a.remove, [class*="remove"]',
+    '.product-remove a, .product-remove button',
+    'a[data-product_key]',  # WooCommerce 標準刪除按鈕
+])
+
+# 「確認」按鈕（與 get_by_role("button", name="確認") 相同：可見的按鈕、名稱包含「確認」）
+CONFIRM_BUTTONS_CHAIN = LocatorChain("login-confirm", [
+    'button:has-text("確認"), [role="button"]:has-text("確認"), input[type="submit"][value*="確認"]',
+], visible_only=True)
+
+# 登入流程中等待出現的輸入框
+EMAIL_INPUT_SELECTOR = "input[type='email'], input[placeholder*='郵']"
+PASSWORD_INPUT_SELECTOR = "input[type='password']"
+
+
+def confirm_button_from_match(match):
+    """
+    由 CONFIRM_BUTTON_CHAIN 的解析結果取得確認按鈕
+
+    最後一個候選（加入購物車）只在有兩個以上時使用第二個，其他候選使用第一個
+    """
+    if match is None:
+        return None
+    if match.index == len(CONFIRM_BUTTON_CHAIN.candidates) - 1:
+        if match.count < 2:
+            return None
+        LogHelpers.log_step(f"✓ 找到 {match.count} 個按鈕，使用第二個")
+        return match.locator.nth(1)
+    LogHelpers.log_step(f"✓ 找到確認按鈕: {match.candidate}")
+    return match.locator.first
+
+
+def password_confirm_from_match(match):
+    """密碼確認按鈕：有兩個以上確認按鈕時使用第二個，否則使用最後一個"""
+    if match is None:
+        return None
+    return match.locator.nth(1) if match.count > 1 else match.locator.last
+
+
+class CartLocators:
+    """購物車頁面的定位器（需要 self.page）"""
+
+    @property
+    def cart_link(self):
+        # 嘗試使用 test-id 或 icon 相關選擇器
+        return self.page.locator("a[href*='cart'], [class*='cart']").first
+
+    @property
+    def user_link(self):
+        # 嘗試使用 test-id 或 icon 相關選擇器
+        return self.page.locator("a[href*='account'], [class*='user']").first
+
+    @property
+    def ai_search_button(self):
+        return self.page.get_by_role("button", name="AI搜尋")
+
+    @property
+    def ai_search_input(self):
+        return self.page.get_by_role("textbox", name="毛孩腎病適合吃什麼？")
+
+    @property
+    def product_links(self):
+        return self.page.get_by_role("link", name="product")
+
+    @property
+    def add_to_cart_button(self):
+        return self.page.get_by_test_id("button-add-to-cart")
+
+    @property
+    def popup_close_button(self):
+        return self.page.get_by_test_id("popup-close-button")
+
+    @property
+    def cart_item_heading(self):
+        return self.page.get_by_test_id("paper-card-main-normal").locator("h6")
+
+    @property
+    def remove_button(self):
+        return self.page.get_by_test_id("paper-card-main-normal").get_by_role("button")
+
+    def _empty_cart_heading_strategies(self):
+        """購物車空頁面標題的候選策略（交給 LocatorResolver 探測）"""
+        return [
+            ("test_id", lambda: self.page.get_by_test_id("paper-cart-empty").locator("h1, h2, h3, h4, h5, h6, p").first),
+            # 備選方案：查找包含特定文本的元素
+            ("text", lambda: self.page.locator("text=購物車中沒有商品").first),
+        ]
+
+    def _cat_section_strategies(self):
+        """貓貓專區按鈕的候選策略（交給 LocatorResolver 探測）"""
+        return [
+            # 1. 先嘗試使用 role 選擇器
+            ("role", lambda: self.page.get_by_role("button", name="貓貓專區").first),
+            # 2. 嘗試使用文本包含
+            ("has_text", lambda: self.page.locator("button:has-text('貓貓專區')").first),
+            # 3. 嘗試使用任何包含"貓"的按鈕
+            ("any_cat", lambda: self.page.locator("button, a, [role='button']").filter(has_text="貓").first),
+        ]
+
+    def _cat_section_fallback(self):
+        # 都找不到時返回一個會報錯的定位器
+        return self.page.locator("button:has-text('貓貓專區')")
+
+
+class LoginLocators:
+    """登入頁面的定位器（需要 self.page）"""
+
+    @property
+    def email_login_button(self):
+        """使用 Email 登入按鈕"""
+        return self.page.get_by_role("button", name="使用 Email 登入")
+
+    @property
+    def password_login_button(self):
+        """密碼登入按鈕"""
+        return self.page.get_by_role("button", name="密碼登入")
+
+    @property
+    def confirm_buttons(self):
+        """所有「確認」按鈕"""
+        return self.page.get_by_role("button", name="確認")
+
+    def _email_input_strategies(self):
+        """電郵輸入框的候選策略（交給 LocatorResolver 探測）"""
+        return [
+            # 嘗試使用 get_by_placeholder 先找到具體的郵件輸入框
+            ("email_type", lambda: self.page.locator(EMAIL_INPUT_SELECTOR).first),
+        ]
+
+    def _email_input_fallback(self):
+        # 備選方案：使用 get_by_role 但加上更多過濾
+        return self.page.get_by_role("textbox").locator("visible=true").first
+
+    def _password_input_strategies(self):
+        """密碼輸入框的候選策略（交給 LocatorResolver 探測）"""
+        return [
+            # 嘗試使用 get_by_type 選擇密碼輸入框
+            ("password_type", lambda: self.page.locator(PASSWORD_INPUT_SELECTOR).first),
+        ]
+
+    def _password_input_fallback(self):
+        # 備選方案
+        return self.page.get_by_role("textbox").nth(1)
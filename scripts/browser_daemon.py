@@ -0,0 +1,93 @@
+"""
+常駐瀏覽器腳本
+
+啟動一個長時間執行的 Chromium，之後的 pytest 執行會自動連線到它（browser fixture），
+省去每次執行的瀏覽器啟動時間；閒置超過指定時間後自動關閉
+
+使用方式：
+    python scripts/browser_daemon.py start              # 前景執行，Ctrl+C 結束
+    python scripts/browser_daemon.py start --detach     # 背景執行
+    python scripts/browser_daemon.py status
+    python scripts/browser_daemon.py stop
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+# 添加父級目錄到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helpers.browser_daemon import DEFAULT_IDLE_TIMEOUT, DEFAULT_PORT, BrowserDaemon
+from playwright.sync_api import sync_playwright
+
+
+def start(args) -> int:
+    daemon = BrowserDaemon()
+    endpoint = daemon.available()
+    if endpoint is not None:
+        print(f"✅ 常駐瀏覽器已在執行（pid {endpoint['pid']}，port {endpoint['port']}）")
+        return 0
+
+    if args.detach:
+        command = [sys.executable, __file__, "start", "--port", str(args.port), "--idle-timeout", str(args.idle_timeout)]
+        if args.headless:
+            command.append("--headless")
+        subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        print("🚀 常駐瀏覽器已在背景啟動，以 status 確認狀態")
+        return 0
+
+    with sync_playwright() as p:
+        executable = p.chromium.executable_path
+    print(f"🚀 啟動常駐瀏覽器：{executable}")
+    endpoint = daemon.start(executable, port=args.port, headless=args.headless)
+    print(f"✅ {endpoint['browser']}（pid {endpoint['pid']}，port {endpoint['port']}）")
+    print(f"💤 閒置 {args.idle_timeout} 秒後自動關閉，Ctrl+C 立即結束")
+    try:
+        daemon.serve(idle_timeout=args.idle_timeout)
+    except KeyboardInterrupt:
+        daemon.stop()
+    print("🛑 常駐瀏覽器已關閉")
+    return 0
+
+
+def status(args) -> int:
+    daemon = BrowserDaemon()
+    endpoint = daemon.available()
+    if endpoint is None:
+        print("⚪ 沒有執行中的常駐瀏覽器")
+        return 1
+    print(f"✅ {endpoint['browser']}（pid {endpoint['pid']}，port {endpoint['port']}）")
+    print(f"   閒置 {daemon.idle_seconds(endpoint):.0f} 秒")
+    return 0
+
+
+def stop(args) -> int:
+    if BrowserDaemon().stop():
+        print("🛑 常駐瀏覽器已關閉")
+    else:
+        print("⚪ 沒有執行中的常駐瀏覽器")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="常駐瀏覽器（跨 pytest 執行共用）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = subparsers.add_parser("start", help="啟動常駐瀏覽器")
+    start_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="remote debugging port")
+    start_parser.add_argument("--headless", action="store_true", help="以 headless 模式啟動")
+    start_parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT, help="閒置多少秒後自動關閉")
+    start_parser.add_argument("--detach", action="store_true", help="在背景執行")
+    start_parser.set_defaults(handler=start)
+
+    subparsers.add_parser("status", help="顯示常駐瀏覽器狀態").set_defaults(handler=status)
+    subparsers.add_parser("stop", help="關閉常駐瀏覽器").set_defaults(handler=stop)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@
 
 此腳本會自動進行登入並保存驗證狀態
 目的：減少重複登入時間，提升測試效率
+
+預設以 HTTP 直接登入（不啟動瀏覽器，數秒內完成），失敗時改用 UI 流程；
+加上 --ui 參數可強制使用 UI 流程
 """
 
 import json
@@ -13,10 +16,34 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fixtures.test_data import TEST_USERS
+from helpers.storage_state import AUTH_FILE as AUTH_FILE_PATH, login_via_http
 from playwright.sync_api import sync_playwright
 
+# 與 conftest 的 authenticated_page / StorageStateManager 讀取同一個檔案
+AUTH_FILE = Path(AUTH_FILE_PATH)
+
+
+def capture_auth_state_http():
+    """以 HTTP 登入捕獲認證狀態"""
+    print("🔐 開始 HTTP 登入...")
+    user = TEST_USERS["valid_user"]
+    try:
+        state = login_via_http(user["email"], user["password"])
+    except Exception as e:
+        print(f"⚠️ HTTP 登入失敗，改用 UI 流程：{e}")
+        return False
+    
+    AUTH_FILE.parent.mkdir(exist_ok=True)
+    with open(AUTH_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    
+    print(f"✅ 驗證狀態已保存至：{AUTH_FILE}")
+    print(f"📊 檔案大小：{AUTH_FILE.stat().st_size} bytes")
+    return True
+
+
 def capture_auth_state():
-    """捕獲認證狀態"""
+    """以 UI 流程捕獲認證狀態"""
     print("🔐 開始登入流程...")
     
     with sync_playwright() as p:
@@ -105,7 +132,7 @@ def capture_auth_state():
             
             # 保存认证状态
             print("💾 保存驗證狀態...")
-            auth_file = Path("./fixtures/auth.json")
+            auth_file = AUTH_FILE
             auth_file.parent.mkdir(exist_ok=True)
             page.context.storage_state(path=str(auth_file))
             
@@ -124,5 +151,8 @@ def capture_auth_state():
 
 
 if __name__ == "__main__":
-    success = capture_auth_state()
+    if "--ui" in sys.argv:
+        success = capture_auth_state()
+    else:
+        success = capture_auth_state_http() or capture_auth_state()
     exit(0 if success else 1)
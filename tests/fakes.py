@@ -0,0 +1,383 @@
+"""
+單元測試共用的替身物件
+
+以記錄呼叫的假頁面、定位器、上下文、回應與時鐘取代 Playwright 物件與真實時間，不啟動瀏覽器也不連網；
+各測試需要的行為（evaluate 的結果、元素數量、預先設定的回應）以建構參數設定
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+
+class FakeClock:
+    """可手動推進的時鐘，sleep 直接推進時間並記錄等待的秒數"""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+# ============ 定位器 ============
+
+class FakeLocator:
+    """
+    記錄選擇器的假定位器
+
+    first / last / nth() / locator() 以 " >> " 串接選擇器建立新的定位器（與 Playwright 的寫法相同），
+    新定位器沿用 count、fail、delay 並共用 wait_for 的狀態紀錄
+    count: count() 的回傳值；probes: 每次 count() 時記錄選擇器的清單
+    fail: wait_for 逾時；delay: wait_for 花費的秒數
+    """
+
+    def __init__(self, selector: str = "", count: int = 0, fail: bool = False, delay: float = 0.0, probes=None):
+        self.selector = selector
+        self._count = count
+        self.fail = fail
+        self.delay = delay
+        self.probes = probes
+        self.states = []
+
+    def _derive(self, selector: str):
+        derived = type(self)(f"{self.selector} >> {selector}", self._count, self.fail, self.delay, self.probes)
+        derived.states = self.states
+        return derived
+
+    @property
+    def first(self):
+        return self._derive("nth=0")
+
+    @property
+    def last(self):
+        return self._derive("nth=-1")
+
+    def nth(self, index: int):
+        return self._derive(f"nth={index}")
+
+    def locator(self, selector: str):
+        return self._derive(selector)
+
+    def count(self) -> int:
+        if self.probes is not None:
+            self.probes.append(self.selector)
+        return self._count
+
+    def wait_for(self, state: str = "visible", timeout: int = 5000):
+        self.states.append(state)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+
+
+class FakeAsyncLocator(FakeLocator):
+    """playwright.async_api 定位器的替身"""
+
+    async def count(self) -> int:
+        return FakeLocator.count(self)
+
+    async def wait_for(self, state: str = "visible", timeout: int = 5000):
+        self.states.append(state)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+
+
+# ============ 頁面 ============
+
+class FakePage:
+    """
+    記錄呼叫的假頁面（playwright.sync_api.Page 的替身）
+
+    context: 所屬的 FakeContext，goto / route / close 依序記錄在 context.log
+    counts: 選擇器 → 該定位器 count() 的回傳值
+    evaluate_result: evaluate 的結果，可以是固定值、要拋出的例外，或以 (page, script, arg) 計算結果的函數；
+        未設定時使用 context 的設定
+    sleep: wait_for_timeout 實際等待的函數（預設只記錄毫秒數）
+    response_arrives: expect_response 是否等到回應
+    """
+
+    locator_class = FakeLocator
+
+    def __init__(self, context=None, url: str = "about:blank", counts=None, evaluate_result=None,
+                 sleep=None, response_arrives: bool = True):
+        self.context = context
+        self.url = url
+        self.main_frame = SimpleNamespace(url=url)
+        self.counts = counts or {}
+        self.evaluate_result = evaluate_result
+        self.sleep = sleep
+        self.response_arrives = response_arrives
+        # 以 evaluate 開始、尚未完成的導航（wait_for_url 時完成）
+        self.pending_url = None
+        self.handlers = {}
+        self.locator_handlers = {}
+        self.locators = []
+        self.evaluated = []
+        self.waited = []
+        self.screenshots = []
+        self.screenshot_sizes = {}
+        self.closed = False
+
+    def _log(self, *entry):
+        if self.context is not None:
+            self.context.log.append(entry)
+
+    def on(self, event: str, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event: str, payload):
+        """觸發以 on() 註冊的事件處理器"""
+        for handler in list(self.handlers.get(event, [])):
+            handler(payload)
+
+    def locator(self, selector: str):
+        locator = self.locator_class(selector, count=self.counts.get(selector, 0))
+        self.locators.append(locator)
+        return locator
+
+    def get_by_role(self, role: str, name=None):
+        return self.locator(f"role={role}[name={name}]")
+
+    def add_locator_handler(self, locator, handler, no_wait_after: bool = False):
+        self.locator_handlers[locator.selector] = handler
+
+    def remove_locator_handler(self, locator):
+        del self.locator_handlers[locator.selector]
+
+    def evaluate(self, script: str, arg=None):
+        self.evaluated.append(arg)
+        result = self.evaluate_result
+        if result is None and self.context is not None:
+            result = self.context.evaluate_result
+        if isinstance(result, Exception):
+            raise result
+        return result(self, script, arg) if callable(result) else result
+
+    def goto(self, url: str, wait_until: str = "load"):
+        self._log("goto", url)
+        self.url = self.main_frame.url = url
+        self.emit("framenavigated", self.main_frame)
+
+    def route(self, pattern, handler):
+        self._log("route", pattern)
+
+    def wait_for_url(self, url, wait_until: str = "load", timeout: float = 30000):
+        """完成以 evaluate 開始的導航（pending_url）後比對網址，不符合時逾時"""
+        self._log("wait_for_url", self.pending_url)
+        if self.pending_url is not None:
+            self.url = self.main_frame.url = self.pending_url
+            self.pending_url = None
+        if not (url(self.url) if callable(url) else url == self.url):
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+
+    def wait_for_timeout(self, milliseconds: int):
+        self.waited.append(milliseconds)
+        if self.sleep is not None:
+            self.sleep(milliseconds / 1000)
+
+    @contextmanager
+    def expect_response(self, url_or_predicate, timeout: int = 5000):
+        info = SimpleNamespace(value=None)
+        yield info
+        if not self.response_arrives:
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded while waiting for response")
+        info.value = f"response:{url_or_predicate}"
+
+    def screenshot(self, type: str = "png", quality=None, **kwargs) -> bytes:
+        """依品質（screenshot_sizes）回傳不同大小的假 JPEG"""
+        self.screenshots.append(kwargs)
+        return b"\xff\xd8" + b"x" * self.screenshot_sizes.get(quality, 100)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self):
+        self.closed = True
+        self._log("close", self.url)
+        if self.context is not None and self in self.context.pages:
+            self.context.pages.remove(self)
+        self.emit("close", self)
+
+
+class FakeAsyncPage(FakePage):
+    """playwright.async_api.Page 的替身：需要 await 的方法改為 coroutine"""
+
+    locator_class = FakeAsyncLocator
+
+    async def add_locator_handler(self, locator, handler, no_wait_after: bool = False):
+        FakePage.add_locator_handler(self, locator, handler, no_wait_after)
+
+    async def remove_locator_handler(self, locator):
+        FakePage.remove_locator_handler(self, locator)
+
+    async def evaluate(self, script: str, arg=None):
+        return FakePage.evaluate(self, script, arg)
+
+    async def goto(self, url: str, wait_until: str = "load"):
+        FakePage.goto(self, url, wait_until)
+
+    async def wait_for_url(self, url, wait_until: str = "load", timeout: float = 30000):
+        FakePage.wait_for_url(self, url, wait_until, timeout)
+
+    async def wait_for_timeout(self, milliseconds: int):
+        self.waited.append(milliseconds)
+        if self.sleep is not None:
+            await asyncio.sleep(milliseconds / 1000)
+
+
+# ============ 上下文與瀏覽器 ============
+
+class FakeContext:
+    """
+    記錄呼叫的假 BrowserContext
+
+    log: 上下文與其頁面的操作紀錄；routes: route / route_from_har 的參數
+    request: context.request 的替身（FakeRequestContext）
+    evaluate_result: 此上下文建立的頁面的 evaluate 結果（見 FakePage）
+    """
+
+    def __init__(self, storage_state=None, request=None, evaluate_result=None):
+        self.storage_state = storage_state
+        self.request = request
+        self.evaluate_result = evaluate_result
+        self.cookies = list((storage_state or {}).get("cookies", []))
+        self.pages = []
+        self.log = []
+        self.routes = []
+        self.handlers = {}
+        self.closed = False
+
+    def on(self, event: str, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        for handler in self.handlers.get("page", []):
+            handler(page)
+        return page
+
+    def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    def route_from_har(self, path, **kwargs):
+        self.routes.append((path, kwargs))
+
+    def unroute_all(self, behavior=None):
+        self.log.append(("unroute_all", behavior))
+
+    def clear_cookies(self):
+        self.cookies = []
+
+    def clear_permissions(self):
+        self.log.append(("clear_permissions",))
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    """記錄建立過的上下文；evaluate_result 傳給每個新的上下文"""
+
+    def __init__(self, evaluate_result=None):
+        self.evaluate_result = evaluate_result
+        self.contexts = []
+
+    def new_context(self, storage_state=None):
+        context = FakeContext(storage_state, evaluate_result=self.evaluate_result)
+        self.contexts.append(context)
+        return context
+
+
+# ============ 網路 ============
+
+class FakeRequest:
+    """頁面請求（Request）的替身"""
+
+    def __init__(self, url: str = "", resource_type: str = "xhr", frame=None, redirected_from=None):
+        self.url = url
+        self.resource_type = resource_type
+        self.frame = frame
+        self.redirected_from = redirected_from
+
+    def is_navigation_request(self) -> bool:
+        return self.resource_type == "document"
+
+
+class FakeResponse:
+    """
+    回應的替身（頁面的 Response 與 APIRequestContext 的 APIResponse 共用）
+
+    body 為字串時 json() 解析它，其他值（預設為空的 JSON 物件）由 text() 序列化
+    """
+
+    def __init__(self, url: str = "", status: int = 200, body=None, headers=None, request=None):
+        self.url = url
+        self.status = status
+        self.ok = 200 <= status <= 299
+        self.headers = headers or {}
+        self.request = request or FakeRequest(url)
+        self._body = {} if body is None else body
+
+    def text(self) -> str:
+        return self._body if isinstance(self._body, str) else json.dumps(self._body)
+
+    def json(self):
+        return json.loads(self._body) if isinstance(self._body, str) else self._body
+
+
+class FakeRequestContext:
+    """
+    APIRequestContext（context.request）的替身：記錄請求並依序回傳預先設定的回應
+
+    預先設定的回應用完後以 default() 建立回應；沒有 default 時拋出 AssertionError（不應送出請求）
+    """
+
+    def __init__(self, responses=(), default=None):
+        self.responses = list(responses)
+        self.default = default
+        self.calls = []
+
+    def get(self, url: str, **kwargs):
+        return self.fetch(url, method="GET", **kwargs)
+
+    def fetch(self, url: str, method: str = "GET", data=None, headers=None):
+        self.calls.append({"url": url, "method": method, "data": data, "headers": headers or {}})
+        if self.responses:
+            return self.responses.pop(0)
+        if self.default is not None:
+            return self.default()
+        raise AssertionError(f"不應送出請求: {method} {url}")
+
+
+class FakeRoute:
+    """記錄路由最後的處理方式（fulfill / abort / fallback）"""
+
+    def __init__(self, url: str, resource_type: str):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    def fulfill(self, status, content_type, body):
+        self.outcome = ("fulfill", status, content_type, body)
+
+    def abort(self, error_code):
+        self.outcome = ("abort", error_code)
+
+    def fallback(self):
+        self.outcome = ("fallback",)
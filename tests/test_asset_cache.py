@@ -0,0 +1,81 @@
+"""
+資源快取單元測試
+
+不啟動瀏覽器，只驗證快取標頭解析與 LRU 淘汰
+"""
+
+import time
+
+import pytest
+from helpers.asset_cache import AssetCache, freshness_lifetime
+from tests.fakes import FakeResponse
+
+
+class TestFreshnessLifetime:
+    """快取標頭解析測試"""
+
+    @pytest.mark.unit
+    def test_max_age_and_no_store(self):
+        """max-age 決定有效期，no-store / private 不可快取"""
+        now = time.time()
+        assert freshness_lifetime({"cache-control": "public, max-age=3600"}, now) == 3600
+        assert freshness_lifetime({"cache-control": "no-store"}, now) is None
+        assert freshness_lifetime({"cache-control": "private, max-age=60"}, now) is None
+
+    @pytest.mark.unit
+    def test_revalidation_only(self):
+        """no-cache 或只有 ETag 時可儲存但每次都要重新驗證"""
+        now = time.time()
+        assert freshness_lifetime({"cache-control": "no-cache", "etag": '"a"'}, now) == 0.0
+        assert freshness_lifetime({"etag": '"a"'}, now) == 0.0
+        assert freshness_lifetime({}, now) is None
+
+
+class TestAssetCacheEviction:
+    """LRU 淘汰測試"""
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used_until_under_cap(self, tmp_path):
+        """超過上限時先淘汰最久未使用的項目，並刪除其 blob"""
+        cache = AssetCache(cache_dir=tmp_path, max_bytes=250)
+        for index, last_access in enumerate([30, 10, 20]):
+            digest = f"blob{index}"
+            (cache.blob_dir / digest).write_bytes(b"x" * 100)
+            cache.index[f"GET https://example.com/{index}.js"] = {
+                "blob": digest, "status": 200, "headers": {}, "size": 100,
+                "stored_at": 0, "expires_at": 0, "last_access": last_access,
+            }
+
+        cache.evict()
+
+        assert sorted(cache.index) == ["GET https://example.com/0.js", "GET https://example.com/2.js"]
+        assert not (cache.blob_dir / "blob1").exists()
+        assert cache.stats["evicted"] == 1
+
+
+class TestAssetCacheStore:
+    """儲存回應測試"""
+
+    @pytest.mark.unit
+    def test_set_cookie_is_not_stored(self, tmp_path):
+        """Set-Cookie 不寫入索引，重播時不會帶到其他上下文"""
+        cache = AssetCache(cache_dir=tmp_path)
+        headers = {"Cache-Control": "max-age=3600", "Set-Cookie": "lb=node-3", "Content-Type": "text/css"}
+        cache._store("GET https://example.com/a.css", FakeResponse(headers=headers), b"body {}", time.time())
+
+        stored = cache.index["GET https://example.com/a.css"]["headers"]
+        assert stored == {"cache-control": "max-age=3600", "content-type": "text/css"}
+        assert list(cache.blob_dir.glob("*.tmp")) == []
+
+    @pytest.mark.unit
+    def test_store_evicts_when_over_cap(self, tmp_path):
+        """儲存後超過上限即依 LRU 淘汰，不必等到 close()"""
+        cache = AssetCache(cache_dir=tmp_path, max_bytes=250)
+        now = time.time()
+        for index in range(3):
+            cache._store(f"GET https://example.com/{index}.js", FakeResponse(headers={"cache-control": "max-age=60"}),
+                         bytes([index]) * 100, now + index)
+
+        assert sorted(cache.index) == ["GET https://example.com/1.js", "GET https://example.com/2.js"]
+        assert cache.total_bytes == 200
+        assert len(list(cache.blob_dir.iterdir())) == 2
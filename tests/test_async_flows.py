@@ -0,0 +1,63 @@
+"""
+並行流程測試 - 使用 async 頁面物件
+
+同一個程序、同一個事件迴圈上同時執行多個互不相依的流程，
+總耗時約等於最慢的流程，而不是所有流程相加
+"""
+
+import asyncio
+
+import pytest
+from pages.aio import CartPage
+from helpers.base_helpers import LogHelpers
+
+
+class TestAsyncFlows:
+    """async 並行流程測試"""
+
+    @pytest.mark.regression
+    @pytest.mark.ui
+    def test_concurrent_read_only_pages(self, run_async, async_pages):
+        """
+        測試：同時載入 my-account、購物車與貓貓專區（已登入狀態）
+
+        每個流程使用各自的上下文，互不影響
+        """
+        async def visit(url: str, expected: str):
+            page = await async_pages(authenticated=True)
+            await page.goto(url, wait_until="domcontentloaded", timeout=10000)
+            LogHelpers.log_step(f"URL: {page.url}")
+            assert expected in page.url, f"未進入預期頁面，URL: {page.url}"
+            return await page.title()
+
+        titles = run_async(asyncio.gather(
+            visit("https://www.dogcatstar.com/my-account/", "my-account"),
+            visit("https://www.dogcatstar.com/cart/", "dogcatstar.com"),
+            visit("https://www.dogcatstar.com/product-category/cat/", "cat"),
+        ))
+
+        assert all(titles), "頁面標題為空"
+        LogHelpers.log_step("[PASS] 三個頁面已同時載入")
+
+    @pytest.mark.regression
+    @pytest.mark.ui
+    def test_concurrent_product_lookups(self, run_async, async_pages):
+        """
+        測試：在兩個分類頁同時讀取第一個商品信息（匿名狀態）
+        """
+        async def first_product(url: str):
+            page = await async_pages()
+            cart_page = await CartPage.open(page)
+            await cart_page.close_popup_if_exists()
+            await page.goto(url, wait_until="domcontentloaded", timeout=10000)
+            return await cart_page.get_first_product_info()
+
+        products = run_async(asyncio.gather(
+            first_product("https://www.dogcatstar.com/product-category/cat/"),
+            first_product("https://www.dogcatstar.com/product-category/dog/"),
+        ))
+
+        for product in products:
+            LogHelpers.log_step(f"商品: {product['name']} - {product['price']}")
+            assert product["name"], "未取得商品名稱"
+        LogHelpers.log_step("[PASS] 兩個分類頁的商品信息已同時取得")
@@ -0,0 +1,70 @@
+"""
+async 頁面物件單元測試
+
+以假的 async 頁面驗證需要探測元素的定位器以明確的 get_ 方法取得，且與同步版共用定位器定義，不啟動瀏覽器
+"""
+
+import asyncio
+import inspect
+
+import pytest
+from pages import aio
+from pages.cart_page import CartPage
+from pages.login_page import LoginPage
+from pages.shared import CartLocators, LoginLocators
+from tests.fakes import FakeAsyncPage
+
+
+def confirm_page(buttons=0):
+    """有 buttons 個「確認」按鈕的 async 頁面（CONFIRM_BUTTONS_CHAIN 的解析結果與 get_by_role 的數量一致）"""
+    return FakeAsyncPage(counts={"role=button[name=確認]": buttons}, evaluate_result=[0, buttons] if buttons else None)
+
+
+class TestAsyncPages:
+    """async 頁面物件測試"""
+
+    @pytest.mark.unit
+    def test_probing_locators_are_explicit_coroutines(self):
+        """需要探測的定位器只有 async def get_ 方法，沒有回傳 coroutine 的屬性"""
+        for page_class, names in (
+            (aio.LoginPage, ["email_input_field", "email_confirm_button", "password_input_field",
+                             "password_confirm_button"]),
+            (aio.CartPage, ["empty_cart_heading", "cat_section_button"]),
+        ):
+            for name in names:
+                assert not hasattr(page_class, name)
+                assert inspect.iscoroutinefunction(getattr(page_class, f"get_{name}"))
+
+    @pytest.mark.unit
+    def test_sync_and_async_share_locators(self):
+        """同步與 async 版本的頁面物件繼承同一份定位器定義"""
+        assert issubclass(CartPage, CartLocators) and issubclass(aio.CartPage, CartLocators)
+        assert issubclass(LoginPage, LoginLocators) and issubclass(aio.LoginPage, LoginLocators)
+
+    @pytest.mark.unit
+    def test_confirm_buttons(self):
+        """電郵確認按鈕為第一個、密碼確認按鈕在兩個以上時為第二個；沒有按鈕時為 None"""
+        async def scenario(page):
+            login_page = aio.LoginPage(page)
+            return await login_page.get_email_confirm_button(), await login_page.get_password_confirm_button()
+
+        email_confirm, password_confirm = asyncio.run(scenario(confirm_page(buttons=2)))
+        assert email_confirm.selector == "role=button[name=確認] >> nth=0"
+        assert password_confirm.selector.endswith(" >> nth=1")
+        assert asyncio.run(scenario(confirm_page())) == (None, None)
+
+    @pytest.mark.unit
+    def test_cdp_port_only_when_async_browser_is_used(self):
+        """只有收集到使用 async_browser 的測試時，browser fixture 才開放 CDP 連接埠"""
+        from conftest import needs_async_browser
+
+        class FakeItem:
+            def __init__(self, *fixturenames):
+                self.fixturenames = list(fixturenames)
+
+        class FakeSession:
+            def __init__(self, *items):
+                self.items = list(items)
+
+        assert not needs_async_browser(FakeSession(FakeItem("browser", "page")))
+        assert needs_async_browser(FakeSession(FakeItem("page"), FakeItem("async_pages", "async_browser")))
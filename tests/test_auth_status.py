@@ -7,6 +7,7 @@
 
 import pytest
 from helpers.base_helpers import LogHelpers
+from helpers.parallel import get_results_dir
 
 
 class TestAuthStatus:
@@ -69,7 +70,7 @@ class TestAuthStatus:
             print("  3. 需要重新登入並更新 user.json")
             
             # 拍攝截圖以便診斷
-            page.screenshot(path="./test-results/login_status_check_failure.png")
+            page.screenshot(path=str(get_results_dir() / "login_status_check_failure.png"))
             assert False, "登入狀態無效 - user.json 可能已過期，需要重新更新"
         
         LogHelpers.log_step("✅ 測試通過：登入狀態有效")
@@ -0,0 +1,41 @@
+"""
+基準測試工具單元測試
+
+驗證統計、退步比較與替身網站的路徑對應，不啟動瀏覽器
+"""
+
+import pytest
+from benchmarks.run_benchmarks import compare, summarize
+from benchmarks.stub_site import STUB_DIR, StubSite
+
+
+class TestBenchmarkTools:
+    """基準測試工具測試"""
+
+    @pytest.mark.unit
+    def test_summarize_median_and_p95(self):
+        """p95 取 nearest-rank，20 個樣本時為第 19 小的值"""
+        stats = summarize([float(value) for value in range(1, 21)])
+        assert stats["n"] == 20
+        assert stats["median_ms"] == 10.5
+        assert stats["p95_ms"] == 19.0
+        assert (stats["min_ms"], stats["max_ms"]) == (1.0, 20.0)
+
+    @pytest.mark.unit
+    def test_compare_reports_only_regressions_over_threshold(self):
+        """只有中位數退步超過門檻的項目被列出"""
+        baseline = {"new_context": {"median_ms": 10.0}, "cart_page_init": {"median_ms": 100.0}}
+        results = {"new_context": {"median_ms": 11.0}, "cart_page_init": {"median_ms": 150.0}, "browser_launch": {"median_ms": 1.0}}
+
+        regressions = compare(results, baseline, max_regression=0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("cart_page_init")
+
+    @pytest.mark.unit
+    def test_stub_site_resolves_shop_paths_only(self):
+        """目錄路徑對應 index.html；其他網域與目錄外的路徑不對應"""
+        site = StubSite()
+        assert site.resolve("https://www.dogcatstar.com/") == (STUB_DIR / "index.html").resolve()
+        assert site.resolve("https://www.dogcatstar.com/cart/?x=1") == (STUB_DIR / "cart" / "index.html").resolve()
+        assert site.resolve("https://www.dogcatstar.com/../conftest.py") is None
+        assert site.resolve("https://cdn.example.com/") is None
@@ -0,0 +1,91 @@
+"""
+常駐瀏覽器單元測試
+
+以本機 HTTP 伺服器模擬 DevTools 的 /json/version 與 /json/list，不啟動瀏覽器
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from helpers.browser_daemon import BrowserDaemon
+
+
+class FakeDevTools(BaseHTTPRequestHandler):
+    """回應 DevTools HTTP 端點"""
+
+    pages = []
+
+    def do_GET(self):
+        if self.path == "/json/version":
+            body = {"Browser": "Chrome/120.0", "webSocketDebuggerUrl": "ws://127.0.0.1/devtools/browser/x"}
+        elif self.path == "/json/list":
+            body = [{"type": "page", "url": url} for url in self.pages]
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def devtools():
+    server = HTTPServer(("127.0.0.1", 0), FakeDevTools)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeDevTools.pages = ["about:blank"]
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def write_endpoint(path, port):
+    path.write_text(json.dumps({"pid": os.getpid(), "port": port}), encoding="utf-8")
+
+
+class TestBrowserDaemon:
+    """常駐瀏覽器測試"""
+
+    @pytest.mark.unit
+    def test_available_when_health_check_passes(self, devtools, tmp_path):
+        """端點健康時返回端點資訊"""
+        endpoint_file = tmp_path / "browser_daemon.json"
+        write_endpoint(endpoint_file, devtools)
+
+        endpoint = BrowserDaemon(endpoint_file).available()
+        assert endpoint["port"] == devtools
+        assert BrowserDaemon.health_check(devtools)["Browser"] == "Chrome/120.0"
+
+    @pytest.mark.unit
+    def test_stale_endpoint_removed(self, devtools, tmp_path):
+        """沒有瀏覽器回應的端點檔案被刪除，fixture 改為自行啟動瀏覽器"""
+        endpoint_file = tmp_path / "browser_daemon.json"
+        write_endpoint(endpoint_file, 1)
+
+        assert BrowserDaemon(endpoint_file).available() is None
+        assert not endpoint_file.exists()
+
+    @pytest.mark.unit
+    def test_idle_seconds_reset_by_open_pages(self, devtools, tmp_path):
+        """只有空白頁時依端點檔案的修改時間計算閒置；有開啟中的網頁時視為使用中"""
+        endpoint_file = tmp_path / "browser_daemon.json"
+        write_endpoint(endpoint_file, devtools)
+        past = time.time() - 600
+        os.utime(endpoint_file, (past, past))
+        daemon = BrowserDaemon(endpoint_file)
+
+        assert daemon.idle_seconds({"port": devtools}) >= 600
+
+        FakeDevTools.pages = ["about:blank", "https://www.dogcatstar.com/"]
+        assert daemon.idle_seconds({"port": devtools}) == 0.0
+        assert time.time() - endpoint_file.stat().st_mtime < 60
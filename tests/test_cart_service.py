@@ -0,0 +1,79 @@
+"""
+購物車 API 單元測試
+
+以假的 request 物件驗證 Store API 請求內容與 Nonce 處理，不連網
+"""
+
+import pytest
+from helpers.cart_service import CartService
+from helpers.rate_governor import RateGovernor
+from tests.fakes import FakeContext, FakeRequestContext, FakeResponse
+
+
+@pytest.fixture(autouse=True)
+def governor(tmp_path, monkeypatch):
+    governor = RateGovernor(tmp_path, buckets={})
+    monkeypatch.setattr(RateGovernor, "_shared", governor)
+    return governor
+
+
+class TestCartService:
+    """購物車 API 測試"""
+
+    @pytest.mark.unit
+    def test_clear_fetches_nonce_then_deletes_items(self):
+        """第一次寫入前由 GET /cart 取得 Nonce，清空只需一次 DELETE"""
+        request = FakeRequestContext([
+            FakeResponse(body={"items": [], "items_count": 2}, headers={"nonce": "abc"}),
+            FakeResponse(body=[]),
+        ])
+        CartService(FakeContext(request=request)).clear()
+
+        assert [call["method"] for call in request.calls] == ["GET", "DELETE"]
+        assert request.calls[1]["url"].endswith("/wp-json/wc/store/v1/cart/items")
+        assert request.calls[1]["headers"]["Nonce"] == "abc"
+
+    @pytest.mark.unit
+    def test_multiple_products_use_single_batch_request(self):
+        """多個商品以一次 batch 請求加入，變體屬性原樣帶入"""
+        request = FakeRequestContext([
+            FakeResponse(headers={"nonce": "abc"}),
+            FakeResponse(body={"responses": []}),
+        ])
+        service = CartService(FakeContext(request=request))
+        service.add_products([
+            {"id": 11},
+            {"id": 22, "quantity": 2, "variation": [{"attribute": "款式", "value": "標準款"}]},
+        ])
+
+        batch = request.calls[1]
+        assert batch["url"].endswith("/wp-json/wc/store/v1/batch")
+        assert [r["path"] for r in batch["data"]["requests"]] == ["/wc/store/v1/cart/add-item"] * 2
+        assert batch["data"]["requests"][0]["body"] == {"id": 11, "quantity": 1}
+        assert batch["data"]["requests"][1]["body"]["variation"][0]["value"] == "標準款"
+
+    @pytest.mark.unit
+    def test_expired_nonce_is_refreshed_once(self):
+        """Nonce 失效時重新取得並重試一次"""
+        request = FakeRequestContext([
+            FakeResponse(headers={"nonce": "old"}),
+            FakeResponse(status=403, body={"code": "woocommerce_rest_invalid_nonce"}),
+            FakeResponse(headers={"nonce": "new"}),
+            FakeResponse(body={"items_count": 1}),
+        ])
+        result = CartService(FakeContext(request=request)).add_product(11)
+
+        assert result == {"items_count": 1}
+        assert request.calls[3]["headers"]["Nonce"] == "new"
+
+    @pytest.mark.unit
+    def test_first_addable_product_skips_variable_and_out_of_stock(self):
+        """只選擇可購買、有庫存且不需選擇規格的商品"""
+        request = FakeRequestContext([FakeResponse(body=[
+            {"id": 1, "is_purchasable": True, "is_in_stock": False, "has_options": False},
+            {"id": 2, "is_purchasable": True, "is_in_stock": True, "has_options": True},
+            {"id": 3, "is_purchasable": True, "is_in_stock": True, "has_options": False},
+        ])])
+
+        assert CartService(FakeContext(request=request)).first_addable_product_id() == 3
+        assert "/wp-json/wc/store/v1/products?type=simple" in request.calls[0]["url"]
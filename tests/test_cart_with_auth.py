@@ -9,6 +9,8 @@
 import pytest
 from pages.cart_page import CartPage
 from helpers.base_helpers import LogHelpers, WaitHelpers
+from helpers.parallel_tabs import ParallelTabs
+from helpers.popup_handler import PopupAutoDismisser
 
 
 class TestCartWithAuth:
@@ -16,10 +18,12 @@ class TestCartWithAuth:
     
     @pytest.mark.smoke
     @pytest.mark.ui
-    def test_cart_is_initially_empty(self, authenticated_page):
+    def test_cart_is_initially_empty(self, authenticated_page, empty_cart):
         """
         測試：驗證購物車功能可用（已登入狀態）
         
+        前置條件：購物車已透過 API 清空（empty_cart fixture）
+        
         步驟：
         1. 導航到購物車頁面
         2. 驗證頁面加載成功（可能重定向）
@@ -100,18 +104,47 @@ class TestCartWithAuth:
         assert content_length > 1000, "頁面內容不足"
         
         LogHelpers.log_step("[PASS] 貓貓專區頁面已加載")
+    
+    @pytest.mark.regression
+    @pytest.mark.ui
+    def test_clear_prefilled_cart(self, authenticated_page, filled_cart):
+        """
+        測試：清空已有商品的購物車
+        
+        前置條件：購物車已透過 API 清空並加入一個商品（filled_cart fixture），不經過 UI 選品
+        
+        步驟：
+        1. 導航到購物車頁面
+        2. 以 UI 清空購物車
+        3. 驗證頁面與 API 的購物車皆為空
+        """
+        page = authenticated_page
+        cart_page = CartPage(page)
+        assert filled_cart.items_count() > 0, "API 未能預先加入商品"
+        
+        LogHelpers.log_step("導航到購物車頁面")
+        page.goto("https://www.dogcatstar.com/cart/")
+        page.wait_for_load_state("domcontentloaded", timeout=10000)
+        cart_page.close_popup_if_exists()
+        
+        LogHelpers.log_step("清空購物車")
+        cart_page.clear_cart()
+        page.reload()
+        page.wait_for_load_state("domcontentloaded", timeout=10000)
+        cart_page.verify_empty_cart()
+        
+        assert filled_cart.items_count() == 0, "API 查詢購物車仍有商品"
+        LogHelpers.log_step("[PASS] 購物車已清空")
 
 
 class TestShoppingIntegration:
-    """完整購物流程集成測試 - 演示在單一頁面實例上的完整流程"""
+    """完整購物流程集成測試 - 演示在同一個已登入 session 上的完整流程"""
     
     @pytest.mark.regression
     @pytest.mark.ui
     def test_complete_shopping_flow(self, authenticated_page):
         """
-        測試：完整的購物流程 - 在單一頁面實例上執行所有步驟
-        
-        這是一個集成測試，展示在同一頁面實例上執行多個步驟。
+        測試：完整的購物流程 - 在同一個已登入上下文中檢查多個頁面
         
         流程步驟：
         1. 驗證登入狀態 (my-account 頁面)
@@ -119,59 +152,52 @@ class TestShoppingIntegration:
         3. 導航到貓貓專區
         4. 驗證頁面加載完成
         
-        注意：所有步驟共享同一個page實例和session，保持登入狀態。
+        注意：這些檢查只讀取頁面且互不相依，在同一上下文的分頁中同時載入，
+        所有分頁共享同一個 session，保持登入狀態。
         """
         page = authenticated_page
+        cookie_count = len(page.context.cookies())
         
         LogHelpers.log_step("=" * 60)
         LogHelpers.log_step("開始完整購物流程集成測試")
-        LogHelpers.log_step("說明: 所有步驟在同一頁面實例上執行")
+        LogHelpers.log_step("說明: 唯讀檢查在同一上下文的分頁中同時執行")
         LogHelpers.log_step("=" * 60)
         
-        # 步驟 1: 驗證登入狀態
-        LogHelpers.log_step("\n[步驟 1/4] 驗證登入狀態 - 訪問 my-account 頁面")
-        page.goto("https://www.dogcatstar.com/my-account/")
-        page.wait_for_load_state("domcontentloaded", timeout=10000)
-        LogHelpers.log_step(f"URL: {page.url}")
-        LogHelpers.log_step(f"標題: {page.title()}")
-        LogHelpers.log_step(f"Cookie 數量: {len(page.context.cookies())}")
-        assert "my-account" in page.url, "未進入 my-account 頁面"
-        LogHelpers.log_step("[PASS] 登入狀態驗證成功\n")
-        
-        # 步驟 2: 訪問購物車 (保持登入狀態)
-        LogHelpers.log_step("[步驟 2/4] 訪問購物車頁面 (保持登入狀態)")
-        page.goto("https://www.dogcatstar.com/cart/")
-        page.wait_for_load_state("domcontentloaded", timeout=10000)
-        LogHelpers.log_step(f"URL: {page.url}")
-        
-        # 關閉購物車頁面上的任何彈出窗口
-        LogHelpers.log_step("檢查並關閉購物車彈出窗口...")
-        cart_page.close_popup_if_exists()
-        page.wait_for_timeout(1000)
-        
-        LogHelpers.log_step(f"頁面內容長度: {len(page.content())} 字符")
-        LogHelpers.log_step(f"Cookie 數量: {len(page.context.cookies())} (保持不變)")
-        LogHelpers.log_step("[PASS] 購物車頁面已加載\n")
-        
-        # 步驟 3: 導航到貓貓專區 (保持登入狀態)
-        LogHelpers.log_step("[步驟 3/4] 導航到貓貓專區 (保持登入狀態)")
-        page.goto("https://www.dogcatstar.com/product-category/cat/")
-        page.wait_for_load_state("domcontentloaded", timeout=10000)
-        LogHelpers.log_step(f"URL: {page.url}")
-        assert "cat" in page.url and "product" in page.url, "未進入貓貓專區"
-        LogHelpers.log_step(f"Cookie 數量: {len(page.context.cookies())} (保持不變)")
-        LogHelpers.log_step("[PASS] 進入貓貓專區成功\n")
-        
-        # 步驟 4: 驗證頁面加載完成 (保持登入狀態)
-        LogHelpers.log_step("[步驟 4/4] 驗證頁面加載完成")
-        title = page.title()
-        LogHelpers.log_step(f"頁面標題: {title}")
-        page_content = page.content()
-        LogHelpers.log_step(f"頁面內容長度: {len(page_content)} 字符")
-        LogHelpers.log_step(f"Cookie 數量: {len(page.context.cookies())} (保持不變)")
-        assert title and len(title) > 0, "頁面標題為空"
-        assert len(page_content) > 1000, "頁面內容不足"
-        LogHelpers.log_step("[PASS] 頁面加載完成\n")
+        def check_my_account(tab):
+            # 步驟 1: 驗證登入狀態
+            assert "my-account" in tab.url, "未進入 my-account 頁面"
+            return tab.title()
+        
+        def check_cart(tab):
+            # 步驟 2: 訪問購物車 (關閉購物車頁面上的任何彈出窗口)
+            PopupAutoDismisser.install(tab).dismiss_visible()
+            return tab.title()
+        
+        def check_cat_section(tab):
+            # 步驟 3、4: 進入貓貓專區並驗證頁面加載完成
+            assert "cat" in tab.url and "product" in tab.url, "未進入貓貓專區"
+            title = tab.title()
+            assert title and len(title) > 0, "頁面標題為空"
+            page_length = tab.evaluate("() => document.documentElement.outerHTML.length")
+            assert page_length > 1000, "頁面內容不足"
+            return title
+        
+        results = ParallelTabs.run(page.context, [
+            ("[步驟 1/4] 驗證登入狀態", "https://www.dogcatstar.com/my-account/", check_my_account),
+            ("[步驟 2/4] 訪問購物車頁面", "https://www.dogcatstar.com/cart/", check_cart),
+            ("[步驟 3-4/4] 貓貓專區並驗證加載", "https://www.dogcatstar.com/product-category/cat/", check_cat_section),
+        ])
+        
+        for name, result in results.items():
+            status = "[PASS]" if result["ok"] else "[FAIL]"
+            LogHelpers.log_step(f"{status} {name} - URL: {result['url']} ({result['elapsed']:.1f}s)")
+            if result["ok"]:
+                LogHelpers.log_step(f"標題: {result['value']}")
+            else:
+                LogHelpers.log_step(f"錯誤: {result['error']}")
+        LogHelpers.log_step(f"Cookie 數量: {len(page.context.cookies())} (開始時 {cookie_count})")
+        
+        ParallelTabs.assert_all_ok(results)
         
         LogHelpers.log_step("=" * 60)
         LogHelpers.log_step("完整購物流程集成測試通過!")
@@ -180,7 +206,7 @@ class TestShoppingIntegration:
     
     @pytest.mark.regression
     @pytest.mark.ui
-    def test_add_product_and_clear_cart(self, authenticated_page):
+    def test_add_product_and_clear_cart(self, authenticated_page, empty_cart):
         """
         測試：完整購物流程 - 登錄驗證 → 選品 → 加入購物車 → 驗證 → 清空
         
@@ -193,6 +219,7 @@ class TestShoppingIntegration:
         6. 清空購物車
         
         注意：非headless模式下，每個操作完成後會停留2秒以觀察結果
+        前置條件：購物車已透過 API 清空（empty_cart fixture），加入與清空仍經由 UI 測試
         """
         page = authenticated_page
         cart_page = CartPage(page)
@@ -308,6 +335,7 @@ class TestShoppingIntegration:
         page.wait_for_timeout(1000)
         
         remaining_items = cart_page.get_cart_items_count()
+        LogHelpers.log_step(f"API 查詢購物車商品數: {empty_cart.items_count()}")
         LogHelpers.log_step("=" * 40)
         LogHelpers.log_step("清空結果:")
         LogHelpers.log_step(f"  清空前商品數: {cart_items_count}")
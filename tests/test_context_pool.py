@@ -0,0 +1,93 @@
+"""
+上下文池單元測試
+
+以假的瀏覽器與上下文驗證歸還時的重置、使用次數回收、重置失敗與登入狀態更換，不啟動瀏覽器
+"""
+
+import pytest
+from helpers.context_pool import _BLANK_PATH, ContextPool
+from tests.fakes import FakeBrowser
+
+
+def reset_storage(page, script, saved_origins):
+    """_RESET_STORAGE_SCRIPT：記錄清除 storage 的來源"""
+    page.context.log.append(("reset_storage", page.main_frame.url))
+
+
+def target_closed(page, script, saved_origins):
+    """重置時頁面已被關閉"""
+    raise RuntimeError("Target closed")
+
+
+LOGGED_IN = {
+    "cookies": [{"name": "wordpress_logged_in_x", "value": "1", "domain": "www.dogcatstar.com", "path": "/"}],
+    "origins": [{"origin": "https://www.dogcatstar.com", "localStorage": [{"name": "k", "value": "v"}]}],
+}
+
+
+class TestContextPool:
+    """上下文池測試"""
+
+    @pytest.mark.unit
+    def test_release_resets_and_reuses_context(self):
+        """歸還時關閉頁面、清除造訪過與 storage state 中的來源、移除路由並還原登入 cookies，下次租借同一個上下文"""
+        browser = FakeBrowser(evaluate_result=reset_storage)
+        pool = ContextPool(browser, size=1, storage_state=LOGGED_IN, name="auth")
+        pool.warm_up()
+
+        with pool.lease() as context:
+            page = context.new_page()
+            page.goto("https://shop.example.com/cart/")
+            context.add_cookies([{"name": "session", "value": "tmp"}])
+            context.log.clear()
+
+        assert page.closed and context.pages == []
+        assert [entry for entry in context.log if entry[0] in ("goto", "reset_storage")] == [
+            ("goto", "https://shop.example.com" + _BLANK_PATH),
+            ("reset_storage", "https://shop.example.com" + _BLANK_PATH),
+            ("goto", "https://www.dogcatstar.com" + _BLANK_PATH),
+            ("reset_storage", "https://www.dogcatstar.com" + _BLANK_PATH),
+        ]
+        assert ("unroute_all", "ignoreErrors") in context.log
+        assert context.cookies == LOGGED_IN["cookies"]
+        assert pool.acquire() is context
+        assert pool.stats == {"created": 1, "leases": 2, "recycled": 0, "reset_failures": 0}
+
+    @pytest.mark.unit
+    def test_recycles_after_max_uses_and_on_reset_failure(self):
+        """達到使用上限或重置失敗的上下文關閉並換新；池滿時租借拋出錯誤"""
+        browser = FakeBrowser(evaluate_result=reset_storage)
+        pool = ContextPool(browser, size=1, max_uses=2)
+
+        first = pool.acquire()
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        pool.release(first)
+        assert first.closed and pool.stats["recycled"] == 1
+
+        second = pool.acquire()
+        assert second is not first
+        second.new_page().goto("https://www.dogcatstar.com/")
+        second.evaluate_result = target_closed
+        pool.release(second)
+        assert second.closed and pool.stats["reset_failures"] == 1
+        assert pool.acquire() is browser.contexts[-1] and len(browser.contexts) == 3
+
+    @pytest.mark.unit
+    def test_updated_storage_state_replaces_contexts(self):
+        """更換登入狀態後，閒置上下文在下次租借時關閉，租借中的上下文歸還時回收"""
+        browser = FakeBrowser(evaluate_result=reset_storage)
+        pool = ContextPool(browser, size=2, storage_state={"cookies": [], "origins": []})
+        pool.warm_up()
+        leased = pool.acquire()
+        idle = pool._idle[0]
+
+        pool.update_storage_state(LOGGED_IN)
+        fresh = pool.acquire()
+
+        assert idle.closed and fresh.storage_state == LOGGED_IN
+        pool.release(leased)
+        assert leased.closed
+        assert pool._idle[0].storage_state == LOGGED_IN
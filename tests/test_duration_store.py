@@ -0,0 +1,47 @@
+"""
+測試耗時紀錄單元測試
+
+驗證 EWMA 合併、被跳過測試的處理與最長處理時間優先分配，不啟動瀏覽器
+"""
+
+import pytest
+from helpers.duration_store import DurationStore, lpt_schedule
+from helpers.parallel import ParallelRunner
+
+
+class TestDurationStore:
+    """測試耗時紀錄測試"""
+
+    @pytest.mark.unit
+    def test_flush_merges_with_ewma(self, tmp_path):
+        """同一測試的各階段相加；再次寫入時以 EWMA 合併，被跳過的測試不寫入"""
+        store = DurationStore(tmp_path / "durations.json", alpha=0.5)
+        store.record("t::slow", 1.0)
+        store.record("t::slow", 9.0)
+        store.record("t::skipped", 0.1, skipped=True)
+        assert store.flush() == 1
+
+        store.record("t::slow", 20.0)
+        store.flush()
+
+        estimates = store.estimates(["t::slow", "t::skipped"])
+        assert estimates["t::slow"] == 15.0
+        # 沒有紀錄的測試使用已知耗時的中位數
+        assert estimates["t::skipped"] == 15.0
+
+    @pytest.mark.unit
+    def test_lpt_balances_long_tests(self):
+        """最長的測試先分配，各 worker 的總耗時接近"""
+        estimates = {"flow": 180.0, "login": 60.0, "cart": 60.0, "nav_a": 50.0, "nav_b": 10.0}
+        shards = lpt_schedule(list(estimates), 2, estimates)
+
+        loads = sorted(sum(estimates[nodeid] for nodeid in shard) for shard in shards)
+        assert loads == [180.0, 180.0]
+        assert ["flow"] in shards
+
+    @pytest.mark.unit
+    def test_shard_without_history_splits_evenly(self):
+        """沒有歷史紀錄時每個 worker 分到的測試數相同，且不產生空的分片"""
+        shards = ParallelRunner.shard([f"t{index}" for index in range(7)], 3)
+        assert sorted(len(shard) for shard in shards) == [2, 2, 3]
+        assert ParallelRunner.shard(["only"], 4) == [["only"]]
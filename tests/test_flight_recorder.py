@@ -0,0 +1,91 @@
+"""
+失敗記錄器單元測試
+
+以假的頁面驗證環狀緩衝區、大小上限與失敗時的寫檔，不啟動瀏覽器
+"""
+
+import json
+
+import pytest
+from helpers.base_helpers import LogHelpers
+from helpers.flight_recorder import FlightRecorder
+from tests.fakes import FakePage
+
+
+def cart_page(sizes=None):
+    """購物車頁面；screenshot 依品質回傳 sizes 指定大小的假 JPEG"""
+    page = FakePage(url="https://www.dogcatstar.com/cart/",
+                    evaluate_result={"title": "購物車", "dialog": None, "text": "購物車中沒有商品"})
+    page.screenshot_sizes = sizes or {}
+    return page
+
+
+@pytest.fixture
+def recorder_capacity(monkeypatch):
+    monkeypatch.setattr(FlightRecorder, "capacity", 3)
+    monkeypatch.setattr(FlightRecorder, "_listening", False)
+    monkeypatch.setattr(FlightRecorder, "_current", None)
+    monkeypatch.setattr(FlightRecorder, "screenshot_interval", 5.0)
+    monkeypatch.setattr(LogHelpers, "_listeners", [])
+    return 3
+
+
+class TestFlightRecorder:
+    """失敗記錄器測試"""
+
+    @pytest.mark.unit
+    def test_ring_keeps_last_steps_only(self, recorder_capacity):
+        """log_step 觸發快照，緩衝區只保留最近 capacity 個；頁面關閉後不再記錄"""
+        page = cart_page()
+        recorder = FlightRecorder.install(page)
+
+        for number in range(5):
+            LogHelpers.log_step(number, f"步驟 {number}")
+
+        assert [entry["step"] for entry in recorder.snapshots] == ["Step 2: 步驟 2", "Step 3: 步驟 3", "Step 4: 步驟 4"]
+        page.close()
+        assert FlightRecorder.for_page(page) is None
+
+    @pytest.mark.unit
+    def test_oversized_snapshot_retaken_then_dropped(self, recorder_capacity):
+        """超過大小上限時以低品質重拍，仍超過則只保留 URL 與 DOM 摘要"""
+        recorder = FlightRecorder(cart_page(sizes={50: 500, 20: 80}), capacity=2, max_bytes=100)
+        recorder.snapshot("重拍")
+        assert len(recorder.snapshots[-1]["image"]) == 82
+
+        recorder = FlightRecorder(cart_page(sizes={50: 500, 20: 300}), capacity=2, max_bytes=100)
+        recorder.snapshot("放棄圖片")
+        assert recorder.snapshots[-1]["image"] is None
+        assert recorder.snapshots[-1]["dom"]["title"] == "購物車"
+
+    @pytest.mark.unit
+    def test_dump_writes_images_and_index(self, recorder_capacity, tmp_path):
+        """dump 寫出 JPEG 與 flight.json"""
+        recorder = FlightRecorder(cart_page(), capacity=3)
+        recorder.snapshot("加入購物車")
+        recorder.snapshot("測試失敗（call）")
+
+        index = json.loads(recorder.dump(tmp_path / "flight").read_text(encoding="utf-8"))
+        assert [entry["image"] for entry in index] == ["00.jpg", "01.jpg"]
+        assert (tmp_path / "flight" / "01.jpg").read_bytes().startswith(b"\xff\xd8")
+        assert index[0]["url"] == "https://www.dogcatstar.com/cart/"
+
+    @pytest.mark.unit
+    def test_step_screenshots_throttled_to_current_page(self, recorder_capacity):
+        """步驟只記錄 URL 與 DOM；目前的頁面依間隔截圖，其他頁面不截圖，且不停用動畫"""
+        now = [100.0]
+        other, current = cart_page(), cart_page()
+        FlightRecorder.install(other)
+        recorder = FlightRecorder.install(current)
+        recorder.clock = lambda: now[0]
+
+        for number in range(3):
+            LogHelpers.log_step(number, f"步驟 {number}")
+        now[0] += 5.0
+        LogHelpers.log_step(3, "步驟 3")
+
+        assert [entry["image"] is not None for entry in recorder.snapshots] == [False, False, True]
+        assert all(entry["dom"] for entry in recorder.snapshots)
+        assert other.screenshots == []
+        assert [kwargs["animations"] for kwargs in current.screenshots] == ["allow", "allow"]
+
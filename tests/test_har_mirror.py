@@ -0,0 +1,68 @@
+"""
+HAR 錄製 / 重播單元測試
+
+以假的上下文與 API 回應驗證錄製檔路徑、route_from_har 參數、購物車 API 的錄製與重播，
+以及重播時停用請求節流，不啟動瀏覽器也不連網
+"""
+
+import pytest
+from helpers.cart_service import CartService
+from helpers.har_mirror import HarMirror
+from helpers.rate_governor import RateGovernor
+from tests.fakes import FakeContext, FakeRequestContext, FakeResponse
+
+
+def cart_request():
+    """每次都回傳同一份購物車內容的 API 請求"""
+    return FakeRequestContext(default=lambda: FakeResponse(body='{"items_count": 2, "items": []}',
+                                                           headers={"nonce": "abc"}))
+
+
+NODEID = "tests/test_cart_with_auth.py::TestCart::test_x"
+
+
+class TestHarMirror:
+    """HAR 錄製 / 重播測試"""
+
+    @pytest.mark.unit
+    def test_apply_per_mode(self, tmp_path):
+        """錄製時更新錄製檔，重播時錄製檔以外的請求一律中止，live 模式不套用"""
+        context = FakeContext(request=cart_request())
+        assert HarMirror("live", tmp_path).apply(context, NODEID) is None
+
+        path = HarMirror("record", tmp_path).apply(context, NODEID)
+        assert path == tmp_path / "test_cart_with_auth__TestCart__test_x.zip"
+        assert context.routes[-1][1]["update"] is True
+
+        HarMirror("replay", tmp_path).apply(context, NODEID)
+        assert context.routes[-1][1] == {"not_found": "abort"}
+        assert HarMirror("live", tmp_path).api_recording(NODEID) is None
+
+    @pytest.mark.unit
+    def test_cart_api_recorded_then_replayed_offline(self, tmp_path):
+        """錄製模式下保存 Store API 回應；重播時依序使用錄製的回應，不送出請求"""
+        request = cart_request()
+        recording = HarMirror("record", tmp_path).api_recording(NODEID)
+        service = CartService(FakeContext(request=request), recording=recording)
+        assert service.items_count() == 2
+        service.clear()
+        recording.save()
+        assert [call["method"] for call in request.calls] == ["GET", "DELETE"]
+
+        replay = HarMirror("replay", tmp_path).api_recording(NODEID)
+        service = CartService(FakeContext(request=FakeRequestContext()), recording=replay)
+        assert service.items_count() == 2
+        service.clear()
+        with pytest.raises(RuntimeError, match="API 錄製檔中沒有此請求"):
+            service.clear()
+
+    @pytest.mark.unit
+    def test_disabled_governor_never_waits(self, tmp_path):
+        """停用時不節流、不退避，也不寫入共享狀態"""
+        governor = RateGovernor(tmp_path, buckets={"login": (1, 0.0001)}, sleep=lambda seconds: 1 / 0)
+        governor.enabled = False
+        governor.report_rate_limit()
+        for _ in range(3):
+            assert governor.acquire("login") == 0.0
+        assert governor.wait_for_backoff() == 0.0
+        assert not (tmp_path / "state.json").exists()
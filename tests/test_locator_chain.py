@@ -0,0 +1,103 @@
+"""
+定位器鏈單元測試
+
+驗證候選選擇器的編譯、解析結果的組成與確認按鈕的選擇規則，單元測試以假頁面代替瀏覽器；
+TestLocatorChainInBrowser 在真實頁面上執行頁面內的解析腳本
+"""
+
+import asyncio
+
+import pytest
+from helpers.locator_chain import LocatorChain, compile_candidate
+from pages.shared import (
+    CONFIRM_BUTTON_CHAIN, CONFIRM_BUTTONS_CHAIN, confirm_button_from_match, password_confirm_from_match,
+)
+from tests.fakes import FakeAsyncPage, FakePage
+
+
+class TestLocatorChain:
+    """定位器鏈測試"""
+
+    @pytest.mark.unit
+    def test_compile_splits_union_and_has_text(self):
+        """最外層逗號切開聯集，:has-text 轉為不分大小寫的文字條件，引號內的逗號不切開"""
+        assert compile_candidate('button:has-text("Remove"), a.remove') == [("button", ["remove"]), ("a.remove", [])]
+        assert compile_candidate(':has-text("a,  b")') == [("*", ["a, b"])]
+        assert compile_candidate('.cart :has-text("刪除")') == [(".cart *", ["刪除"])]
+
+    @pytest.mark.unit
+    def test_compile_rejects_playwright_only_selectors(self):
+        """無法在頁面內執行的選擇器在建立時就拋出錯誤"""
+        for selector in ['text="確認"', "button >> nth=1", "button:visible", 'div:text("x")']:
+            with pytest.raises(ValueError):
+                compile_candidate(selector)
+
+    @pytest.mark.unit
+    def test_resolve_is_one_evaluate_and_returns_candidate_locator(self):
+        """一次 evaluate 得到符合的候選；定位器是該候選本身的選擇器，沒有符合時為 None"""
+        chain = LocatorChain("demo", ["button.a", "button.b"])
+        page = FakePage(evaluate_result=[1, 3])
+
+        match = chain.resolve(page)
+
+        assert len(page.evaluated) == 1
+        assert match.index == 1 and match.candidate == "button.b" and match.count == 3
+        assert match.locator.selector == "button.b"
+        assert LocatorChain("visible", ["button.b"], visible_only=True).resolve(FakePage(evaluate_result=[0, 1])).locator.selector == (
+            "button.b >> visible=true"
+        )
+        assert chain.resolve(FakePage()) is None
+        assert asyncio.run(chain.resolve_async(FakeAsyncPage(evaluate_result=[0, 1]))).candidate == "button.a"
+
+    @pytest.mark.unit
+    def test_confirm_button_rules(self):
+        """一般候選使用第一個；最後的「加入購物車」候選只在兩個以上時使用第二個"""
+        fallback = len(CONFIRM_BUTTON_CHAIN.candidates) - 1
+
+        def resolve(chain, result):
+            return chain.resolve(FakePage(evaluate_result=result))
+
+        assert confirm_button_from_match(resolve(CONFIRM_BUTTON_CHAIN, [0, 2])).selector.endswith(" >> nth=0")
+        assert confirm_button_from_match(resolve(CONFIRM_BUTTON_CHAIN, [fallback, 1])) is None
+        assert confirm_button_from_match(resolve(CONFIRM_BUTTON_CHAIN, [fallback, 2])).selector.endswith(" >> nth=1")
+        assert password_confirm_from_match(resolve(CONFIRM_BUTTONS_CHAIN, [0, 2])).selector.endswith(" >> nth=1")
+        assert password_confirm_from_match(resolve(CONFIRM_BUTTONS_CHAIN, [0, 1])).selector.endswith(" >> nth=-1")
+
+
+class TestLocatorChainInBrowser:
+    """在真實頁面上執行解析腳本"""
+
+    @pytest.mark.ui
+    def test_resolve_in_page(self, page):
+        """:has-text 不分大小寫；聯集候選計算所有元素；visible_only 排除隱藏元素"""
+        page.set_content("""
+            <button class="cancel">取消</button>
+            <button class="submit">送出</button>
+            <a class="remove">REMOVE</a>
+            <button class="confirm">確認</button>
+            <button style="display: none">確認</button>
+            <div role="button">確認</div>
+        """)
+
+        match = LocatorChain("demo", ['button:has-text("確定加入")', 'a:has-text("remove")']).resolve(page)
+        assert (match.index, match.count) == (1, 1)
+        assert LocatorChain("demo", ['button.confirm, button.submit']).resolve(page).count == 2
+
+        confirm = CONFIRM_BUTTONS_CHAIN.resolve(page)
+        assert confirm.count == 2
+        assert confirm.locator.count() == 2
+        assert LocatorChain("none", ["button.missing"]).resolve(page) is None
+
+    @pytest.mark.ui
+    def test_locator_survives_rerender(self, page):
+        """解析後元素被重新渲染，定位器在動作時重新解析到新的元素"""
+        page.set_content("""
+            <div id="modal"><button class="confirm" onclick="window.clicked = true">確定加入</button></div>
+        """)
+        match = CONFIRM_BUTTON_CHAIN.resolve(page)
+        assert match.index == 0
+
+        page.evaluate("() => { const modal = document.getElementById('modal'); modal.innerHTML = modal.innerHTML; }")
+        confirm_button_from_match(match).click(timeout=2000)
+
+        assert page.evaluate("() => window.clicked") is True
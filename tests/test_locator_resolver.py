@@ -0,0 +1,143 @@
+"""
+多策略定位器解析單元測試
+
+以簡單的替身物件取代頁面與定位器，驗證成功策略的記憶與重新學習
+"""
+
+import json
+
+import pytest
+from helpers import locator_resolver
+from helpers.locator_resolver import LocatorResolver, url_pattern
+from tests.fakes import FakeLocator, FakePage
+
+URL = "https://www.dogcatstar.com/product-category/cat/"
+
+
+def fake_strategies(names, matches, probes):
+    """每個名稱一個策略；名稱在 matches 中的定位器有符合的元素，count() 時記錄到 probes"""
+    return [(name, lambda name=name: FakeLocator(name, count=int(name in matches), probes=probes)) for name in names]
+
+
+@pytest.fixture
+def resolver(tmp_path, monkeypatch):
+    """每個測試使用獨立的紀錄檔與狀態"""
+    monkeypatch.setattr(locator_resolver, "CACHE_PATH", tmp_path / "locators.json")
+    monkeypatch.setattr(LocatorResolver, "_winners", None)
+    monkeypatch.setattr(LocatorResolver, "_dirty", False)
+    monkeypatch.setattr(LocatorResolver, "_lookup_counts", {})
+    monkeypatch.setattr(LocatorResolver, "stats",
+                        {"lookups": 0, "memo_hits": 0, "relearned": 0, "reprobes": 0, "probes": 0})
+    return LocatorResolver
+
+
+class TestLocatorResolver:
+    """定位器解析測試"""
+
+    @pytest.mark.unit
+    def test_url_pattern_collapses_ids(self):
+        """含數字的路徑片段視為同一類頁面"""
+        assert url_pattern("https://www.dogcatstar.com/product/123-abc/?x=1") == "www.dogcatstar.com/product/*/"
+        assert url_pattern("https://www.dogcatstar.com/cart/") == "www.dogcatstar.com/cart/"
+
+    @pytest.mark.unit
+    def test_winner_is_tried_first_and_persisted(self, resolver, tmp_path):
+        """第二次解析直接嘗試上次成功的策略，並可寫回磁碟"""
+        probes = []
+        strategies = fake_strategies("abc", {"b", "c"}, probes)
+
+        assert resolver.resolve(FakePage(url=URL), "X.button", strategies).selector == "b"
+        assert probes == ["a", "b"]
+
+        probes.clear()
+        assert resolver.resolve(FakePage(url=URL), "X.button", strategies).selector == "b"
+        assert probes == ["b"]
+        assert resolver.stats["memo_hits"] == 1
+
+        resolver.save()
+        assert (tmp_path / "locators.json").exists()
+
+    @pytest.mark.unit
+    def test_relearns_when_winner_misses(self, resolver):
+        """記錄的策略落空時依序嘗試其他策略並更新紀錄"""
+        probes = []
+        matches = {"b"}
+        strategies = fake_strategies("abc", matches, probes)
+        resolver.resolve(FakePage(url=URL), "X.button", strategies)
+
+        matches.clear()
+        matches.add("a")
+        probes.clear()
+        assert resolver.resolve(FakePage(url=URL), "X.button", strategies).selector == "a"
+        assert probes == ["b", "a"]
+        assert resolver.stats["relearned"] == 1
+
+    @pytest.mark.unit
+    def test_last_strategy_is_memoized(self, resolver):
+        """兩個策略時最後一個策略成功也會記錄，下次只需一次探測"""
+        probes = []
+        strategies = fake_strategies("ab", {"b"}, probes)
+        assert resolver.resolve(FakePage(url=URL), "X.field", strategies).selector == "b"
+
+        probes.clear()
+        assert resolver.resolve(FakePage(url=URL), "X.field", strategies).selector == "b"
+        assert probes == ["b"]
+        assert resolver.stats["memo_hits"] == 1
+
+    @pytest.mark.unit
+    def test_fallback_is_never_probed(self, resolver):
+        """兜底定位器不探測也不記錄，只在所有策略都找不到元素時回傳"""
+        probes = []
+        matches = set()
+        strategies = fake_strategies("ab", matches, probes)
+        fallback = lambda: FakeLocator("fallback", probes=probes)
+
+        assert resolver.resolve(FakePage(url=URL), "X.field", strategies, fallback=fallback).selector == "fallback"
+        assert probes == ["a", "b"]
+        assert resolver._winners == {}
+
+        matches.add("b")
+        probes.clear()
+        assert resolver.resolve(FakePage(url=URL), "X.field", strategies, fallback=fallback).selector == "b"
+        assert probes == ["a", "b"]
+
+    @pytest.mark.unit
+    def test_first_lookup_uses_saved_winner(self, resolver, tmp_path):
+        """程序的第一次解析直接使用磁碟上記錄的策略，不重新探測"""
+        (tmp_path / "locators.json").write_text(
+            json.dumps({f"X.button@{url_pattern(URL)}": "b"}), encoding="utf-8")
+        probes = []
+        strategies = fake_strategies("abc", {"a", "b"}, probes)
+
+        assert resolver.resolve(FakePage(url=URL), "X.button", strategies).selector == "b"
+        assert probes == ["b"]
+        assert resolver.stats["reprobes"] == 0
+
+    @pytest.mark.unit
+    def test_reprobes_higher_priority_strategies(self, resolver):
+        """記錄的策略不是第一個時，每隔 REPROBE_EVERY 次依原本順序探測，較具體的策略恢復後重新學習"""
+        probes = []
+        matches = {"b", "c"}
+        strategies = fake_strategies("abc", matches, probes)
+        resolver.resolve(FakePage(url=URL), "X.button", strategies)
+
+        matches.add("a")
+        for _ in range(locator_resolver.REPROBE_EVERY - 2):
+            assert resolver.resolve(FakePage(url=URL), "X.button", strategies).selector == "b"
+        probes.clear()
+        assert resolver.resolve(FakePage(url=URL), "X.button", strategies).selector == "a"
+        assert probes == ["a"]
+        assert resolver.stats["reprobes"] == 1
+
+    @pytest.mark.unit
+    def test_save_merges_under_lock(self, resolver, tmp_path):
+        """寫回時合併其他 worker 的紀錄，並釋放檔案鎖"""
+        (tmp_path / "locators.json").write_text(json.dumps({"Other.field@x/": "a"}), encoding="utf-8")
+        probes = []
+        strategies = fake_strategies("ab", {"b"}, probes)
+        resolver.resolve(FakePage(url=URL), "X.field", strategies)
+        resolver.save()
+
+        saved = json.loads((tmp_path / "locators.json").read_text(encoding="utf-8"))
+        assert saved == {"Other.field@x/": "a", f"X.field@{url_pattern(URL)}": "b"}
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["locators.json"]
@@ -0,0 +1,85 @@
+"""
+步驟日誌單元測試
+
+驗證等級過濾、延遲格式化、每個測試的緩衝區與背景寫檔，不啟動瀏覽器
+"""
+
+import logging
+
+import pytest
+from helpers.base_helpers import LogHelpers
+from helpers.log_sink import LogSink
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    """在測試中重新設定 LogSink，結束後還原 session 的設定"""
+    logger = LogSink.logger
+    saved = (list(logger.handlers), list(logger.filters), logger.level, LogSink._buffer, LogSink._listener)
+    monkeypatch.setattr(LogSink, "_listener", None)
+    monkeypatch.setattr(LogSink, "current_test", None)
+    yield LogSink
+    LogSink.shutdown()
+    handlers, filters, level, buffer, listener = saved
+    logger.handlers[:] = handlers
+    logger.filters[:] = filters
+    logger.setLevel(level)
+    LogSink._buffer = buffer
+    LogSink._listener = listener
+
+
+class CountingArg:
+    """記錄被格式化的次數"""
+
+    formatted = 0
+
+    def __str__(self):
+        CountingArg.formatted += 1
+        return "arg"
+
+
+class TestLogSink:
+    """步驟日誌測試"""
+
+    @pytest.mark.unit
+    def test_disabled_level_skips_formatting(self, sink):
+        """低於設定等級的訊息不格式化、不進入緩衝區"""
+        sink.configure(level=logging.INFO)
+        sink.start_test("tests/test_x.py::test_a")
+        CountingArg.formatted = 0
+
+        LogHelpers.debug("細節 %s", CountingArg())
+        LogHelpers.log_step("加入購物車")
+        LogHelpers.warning("關閉彈出窗口失敗 (%s): %s", "popup", CountingArg())
+
+        text = sink.buffered_text()
+        assert "細節" not in text
+        assert ">> 加入購物車" in text
+        assert "WARNING" in text and "關閉彈出窗口失敗 (popup): arg" in text
+        assert CountingArg.formatted == 1
+
+    @pytest.mark.unit
+    def test_buffer_is_per_test(self, sink):
+        """start_test 清空上一個測試的緩衝區"""
+        sink.configure(level=logging.DEBUG)
+        sink.start_test("tests/test_x.py::test_a")
+        LogHelpers.debug("第一個測試")
+        sink.start_test("tests/test_x.py::test_b")
+        LogHelpers.log_step(1, "第二個測試")
+
+        assert sink.buffered_text().endswith("--- Step 1: 第二個測試 ---")
+        assert "第一個測試" not in sink.buffered_text()
+
+    @pytest.mark.unit
+    def test_file_written_by_background_listener(self, sink, tmp_path):
+        """日誌檔由背景執行緒寫入，包含測試 nodeid；shutdown 後內容完整"""
+        log_file = tmp_path / "steps.log"
+        sink.configure(level=logging.INFO, log_file=log_file)
+        sink.start_test("tests/test_x.py::test_a")
+        for number in range(50):
+            LogHelpers.info("訊息 %d", number)
+        sink.shutdown()
+
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 50
+        assert "[tests/test_x.py::test_a] 訊息 49" in lines[-1]
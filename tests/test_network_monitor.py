@@ -0,0 +1,65 @@
+"""
+網路監控單元測試
+
+以簡單的假頁面 / 回應物件驗證回應分類，不啟動瀏覽器
+"""
+
+import pytest
+from helpers.network_monitor import NetworkMonitor
+from helpers.rate_governor import RateGovernor
+from tests.fakes import FakePage, FakeRequest, FakeResponse
+
+
+@pytest.fixture
+def governor(tmp_path, monkeypatch):
+    governor = RateGovernor(tmp_path)
+    monkeypatch.setattr(RateGovernor, "_shared", governor)
+    return governor
+
+
+class TestNetworkMonitor:
+    """網路監控測試"""
+
+    @pytest.mark.unit
+    def test_rate_limit_notifies_governor(self, governor):
+        """429 回應被分類為速率限制，並以 Retry-After 設定共享退避"""
+        page = FakePage()
+        monitor = NetworkMonitor(page)
+        checkpoint = monitor.checkpoint()
+
+        page.emit("response", FakeResponse("https://www.dogcatstar.com/?wc-ajax=add_to_cart", 429, headers={"retry-after": "40"}))
+
+        health = monitor.page_health(since=checkpoint)
+        assert health["rate_limited"] and not health["ok"]
+        assert governor.backoff_remaining() > 30
+        assert monitor.page_health(since=monitor.checkpoint())["ok"]
+
+    @pytest.mark.unit
+    def test_rate_limit_message_in_ajax_body(self, governor):
+        """購物車 AJAX 回應內容中的 too many requests 也視為速率限制"""
+        page = FakePage()
+        monitor = NetworkMonitor(page)
+
+        page.emit("response", FakeResponse("https://www.dogcatstar.com/?wc-ajax=add_to_cart", 200, body="Too Many Requests"))
+
+        assert monitor.page_health()["rate_limited"]
+
+    @pytest.mark.unit
+    def test_server_errors_login_redirect_and_cart_state(self, governor):
+        """伺服器錯誤、導向登入頁與購物車片段中的空購物車狀態"""
+        page = FakePage()
+        monitor = NetworkMonitor(page)
+
+        page.emit("response", FakeResponse("https://www.dogcatstar.com/api", 502))
+        original = FakeRequest("https://www.dogcatstar.com/cart/", "document", page.main_frame)
+        redirected = FakeRequest("https://www.dogcatstar.com/my-account/", "document", page.main_frame, original)
+        page.emit("response", FakeResponse(redirected.url, 200, request=redirected))
+        page.emit("response", FakeResponse("https://www.dogcatstar.com/?wc-ajax=get_refreshed_fragments", 200,
+                                           body={"fragments": {}, "cart_hash": ""}))
+
+        health = monitor.page_health()
+        assert health["server_errors"] == 1
+        assert health["login_redirect"]
+        assert health["document_status"] == 200
+        assert health["cart_empty"] is True
+        assert governor.backoff_remaining() == 0
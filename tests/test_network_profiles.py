@@ -0,0 +1,69 @@
+"""
+網路路由設定檔單元測試
+
+以假的路由驗證各設定檔的封鎖、替換與放行規則，以及節省量的統計，不啟動瀏覽器
+"""
+
+import pytest
+from helpers.network_profiles import DEFAULT_ESTIMATED_SIZE, ESTIMATED_SIZES, NetworkProfile
+from tests.fakes import FakeContext, FakeRoute
+
+
+def handle(profile, url, resource_type):
+    route = FakeRoute(url, resource_type)
+    profile._handle(route)
+    return route.outcome
+
+
+class TestNetworkProfile:
+    """網路路由設定檔測試"""
+
+    @pytest.mark.unit
+    def test_full_fidelity_registers_no_route(self):
+        """full-fidelity 不註冊路由；其他設定檔攔截所有請求"""
+        context = FakeContext()
+        NetworkProfile("full-fidelity").apply(context)
+        assert context.routes == []
+
+        NetworkProfile("no-media").apply(context)
+        assert [pattern for pattern, _ in context.routes] == ["**/*"]
+
+    @pytest.mark.unit
+    def test_functional_minimal_rules(self):
+        """第三方主機（含子網域）的腳本以空白內容替換、其他資源封鎖；本站的圖片與字型封鎖，其餘放行"""
+        profile = NetworkProfile("functional-minimal")
+
+        assert handle(profile, "https://www.googletagmanager.com/gtm.js", "script") == (
+            "fulfill", 200, "application/javascript", "",
+        )
+        assert handle(profile, "https://connect.facebook.net/tr", "ping") == ("abort", "blockedbyclient")
+        assert handle(profile, "https://www.dogcatstar.com/logo.png", "image") == ("abort", "blockedbyclient")
+        assert handle(profile, "https://www.dogcatstar.com/font.woff2", "font") == ("abort", "blockedbyclient")
+        assert handle(profile, "https://www.dogcatstar.com/app.js", "script") == ("fallback",)
+        # 只比對完整主機名稱或子網域，不比對字串結尾
+        assert handle(profile, "https://notfacebook.com/app.js", "script") == ("fallback",)
+
+        assert profile.stats["requests"] == 6
+        assert (profile.stats["stubbed"], profile.stats["blocked"]) == (1, 3)
+        assert profile.stats["estimated_bytes_saved"] == (
+            ESTIMATED_SIZES["script"] + ESTIMATED_SIZES["ping"] + ESTIMATED_SIZES["image"] + ESTIMATED_SIZES["font"]
+        )
+
+    @pytest.mark.unit
+    def test_no_media_keeps_fonts_and_third_parties(self):
+        """no-media 只封鎖圖片與影音，第三方腳本照常載入；未知類型以預設大小估算"""
+        profile = NetworkProfile("no-media")
+
+        assert handle(profile, "https://www.dogcatstar.com/video.mp4", "media") == ("abort", "blockedbyclient")
+        assert handle(profile, "https://www.dogcatstar.com/font.woff2", "font") == ("fallback",)
+        assert handle(profile, "https://www.google-analytics.com/analytics.js", "script") == ("fallback",)
+        assert profile.stats["estimated_bytes_saved"] == ESTIMATED_SIZES["media"]
+
+        profile._record_saved("blocked", "manifest")
+        assert profile.stats["estimated_bytes_saved"] == ESTIMATED_SIZES["media"] + DEFAULT_ESTIMATED_SIZE
+
+    @pytest.mark.unit
+    def test_unknown_profile_rejected(self):
+        """未知的設定檔名稱在建立時拋出錯誤並列出可用名稱"""
+        with pytest.raises(ValueError, match="functional-minimal"):
+            NetworkProfile("turbo")
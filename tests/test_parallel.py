@@ -0,0 +1,126 @@
+"""
+平行執行單元測試
+
+以假的 pytest config 驗證轉交給 worker 的參數、JUnit 報告的讀取與合併，不啟動 worker 程序
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+import pytest
+from helpers import parallel
+from helpers.parallel import ParallelRunner
+
+
+def _runner(tmp_path, *args):
+    (tmp_path / "tests").mkdir(exist_ok=True)
+    (tmp_path / "tests" / "test_a.py").write_text("")
+    config = SimpleNamespace(invocation_params=SimpleNamespace(args=args, dir=tmp_path), rootpath=tmp_path)
+    return ParallelRunner(config, workers=2)
+
+
+def _write_junit(path, cases):
+    """cases: [(名稱, 結果)]，結果為 "passed"、"failure"、"error" 或 "skipped" """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    suite = ET.Element("testsuite", name="pytest", tests=str(len(cases)),
+                       failures=str(sum(result == "failure" for _, result in cases)),
+                       errors=str(sum(result == "error" for _, result in cases)),
+                       skipped=str(sum(result == "skipped" for _, result in cases)), time="1.5")
+    for name, result in cases:
+        case = ET.SubElement(suite, "testcase", classname="tests.test_a", name=name)
+        if result != "passed":
+            ET.SubElement(case, result)
+    ET.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
+@pytest.fixture
+def results_root(tmp_path, monkeypatch):
+    root = tmp_path / "test-results"
+    monkeypatch.setattr(parallel, "RESULTS_ROOT", root)
+    return root
+
+
+class TestParallelRunner:
+    """平行執行測試"""
+
+    @pytest.mark.unit
+    def test_forwarded_args_strip_main_only_options_with_values(self, tmp_path):
+        """--workers 與 --junitxml 兩種寫法（含空格分隔的值）都不轉交；測試路徑改由 nodeid 取代"""
+        runner = _runner(
+            tmp_path,
+            "tests/test_a.py::test_x", "--workers", "4", "--junitxml", "out.xml", "--junit-xml=other.xml",
+            "-m", "unit", "--workers=2", "-x",
+        )
+
+        assert runner._forwarded_args() == ["-m", "unit", "-x"]
+
+    @pytest.mark.unit
+    def test_worker_command_uses_own_junit(self, tmp_path, results_root):
+        """worker 只有自己的 --junitxml"""
+        command = _runner(tmp_path, "--junitxml", "out.xml")._worker_command("gw1", ["t::a"])
+
+        assert [arg for arg in command if "junit" in arg] == [f"--junitxml={(results_root / 'gw1' / 'junit.xml').resolve()}"]
+        assert command[-1] == "t::a" and "out.xml" not in command
+
+    @pytest.mark.unit
+    def test_merge_reports_combines_worker_junit(self, results_root):
+        """各 worker 的報告合併為一個 junit.xml；異常結束的 worker 另外列出"""
+        _write_junit(results_root / "gw0" / "junit.xml", [("test_ok", "passed"), ("test_bad", "failure")])
+        _write_junit(results_root / "gw1" / "junit.xml", [("test_skip", "skipped"), ("test_err", "error")])
+        workers = []
+        for worker_id, returncode in (("gw0", 1), ("gw1", 2), ("gw2", 3)):
+            result = ParallelRunner._read_junit(results_root / worker_id / "junit.xml")
+            result.update({"worker_id": worker_id, "assigned": 2, "estimated": 0.0, "returncode": returncode})
+            workers.append(result)
+
+        summary = ParallelRunner.merge_reports(workers)
+
+        assert (summary["tests"], summary["failed"], summary["skipped"]) == (4, 2, 1)
+        assert summary["failures"] == ["tests.test_a::test_bad", "tests.test_a::test_err"]
+        assert summary["crashed"] == ["gw1", "gw2"]
+        merged = ET.parse(results_root / "junit.xml").getroot()
+        assert [suite.get("name") for suite in merged] == ["pytest[gw0]", "pytest[gw1]"]
+        assert ParallelRunner.worker_files(summary, "junit.xml") == [
+            results_root / "gw0" / "junit.xml", results_root / "gw1" / "junit.xml",
+        ]
+
+    @pytest.mark.unit
+    def test_run_ignores_files_from_previous_runs(self, tmp_path, results_root, monkeypatch):
+        """worker 目錄在啟動前清空：異常結束的 worker 不會讀到上次的 junit.xml、trace.json 等檔案"""
+        _write_junit(results_root / "gw0" / "junit.xml", [("test_old", "passed")])
+        (results_root / "gw0" / "trace.json").write_text('{"traceEvents": []}')
+
+        class CrashedWorker:
+            def __init__(self, command, **kwargs):
+                pass
+
+            def wait(self):
+                return 3
+
+        monkeypatch.setattr(parallel.subprocess, "Popen", CrashedWorker)
+        monkeypatch.setattr(parallel.DurationStore, "estimates", lambda self, nodeids: {n: 1.0 for n in nodeids})
+
+        summary = _runner(tmp_path).run(["tests/test_a.py::test_x"])
+
+        assert summary["tests"] == 0 and summary["crashed"] == ["gw0"]
+        assert ParallelRunner.worker_files(summary, "trace.json") == []
+
+    @pytest.mark.unit
+    def test_merge_worker_stats(self, results_root):
+        """各 worker 的計數器（含巢狀的分類計數）累加到主程序"""
+        for worker_id, retries in (("gw0", 2), ("gw1", 3)):
+            (results_root / worker_id).mkdir(parents=True)
+            (results_root / worker_id / "stats.json").write_text(json.dumps({
+                "retry": {"retries": retries, "by_kind": {"timeout": retries}},
+                "popups": {"sweetalert": {"fired": 1, "total_ms": 10.0}},
+            }))
+        summary = {"workers": [{"worker_id": "gw0"}, {"worker_id": "gw1"}, {"worker_id": "gw2"}]}
+        retry, popups, cache = {"retries": 1, "by_kind": {}}, {}, {}
+
+        merged = ParallelRunner.merge_worker_stats(summary, {"retry": retry, "popups": popups, "asset_cache": cache})
+
+        assert merged == 2
+        assert retry == {"retries": 6, "by_kind": {"timeout": 5}}
+        assert popups == {"sweetalert": {"fired": 2, "total_ms": 20.0}}
+        assert cache == {}
@@ -0,0 +1,54 @@
+"""
+平行分頁檢查單元測試
+
+以假的上下文與頁面驗證所有分頁先開始導航再等待載入，以及單一檢查失敗不影響其他檢查，不啟動瀏覽器
+"""
+
+import pytest
+from helpers import parallel_tabs
+from helpers.parallel_tabs import ParallelTabs
+from tests.fakes import FakeContext
+
+
+def start_navigation(page, script, url):
+    """_START_NAVIGATION_SCRIPT：開始導航，不等待回應"""
+    page.context.log.append(("start", url))
+    page.pending_url = url
+
+
+@pytest.fixture(autouse=True)
+def no_monitors(monkeypatch):
+    monkeypatch.setattr(parallel_tabs.NetworkMonitor, "install", staticmethod(lambda page: None))
+    monkeypatch.setattr(parallel_tabs.PopupAutoDismisser, "install", classmethod(lambda cls, page: None))
+
+
+class TestParallelTabs:
+    """平行分頁檢查測試"""
+
+    @pytest.mark.unit
+    def test_all_navigations_start_before_any_wait(self):
+        """每個分頁先開始導航（不等待回應），全部開始後才等待載入"""
+        context = FakeContext(evaluate_result=start_navigation)
+        results = ParallelTabs.run(context, [
+            ("home", "https://www.dogcatstar.com/", lambda page: page.url),
+            ("cart", "https://www.dogcatstar.com/cart/", lambda page: page.url),
+        ])
+
+        assert [kind for kind, _ in context.log] == ["start", "start", "wait_for_url", "wait_for_url", "close", "close"]
+        assert results["cart"]["value"] == "https://www.dogcatstar.com/cart/"
+        assert context.pages == []
+
+    @pytest.mark.unit
+    def test_failed_check_is_isolated(self):
+        """單一檢查失敗只記錄在該項目，assert_all_ok 列出所有失敗項目"""
+        def broken(page):
+            raise ValueError("找不到元素")
+
+        results = ParallelTabs.run(FakeContext(evaluate_result=start_navigation), [
+            ("ok", "https://www.dogcatstar.com/", lambda page: True),
+            ("broken", "https://www.dogcatstar.com/cart/", broken),
+        ])
+
+        assert results["ok"]["ok"] and not results["broken"]["ok"]
+        with pytest.raises(AssertionError, match="broken: ValueError: 找不到元素"):
+            ParallelTabs.assert_all_ok(results)
@@ -0,0 +1,69 @@
+"""
+彈出視窗自動關閉單元測試
+
+以假頁面驗證只為特定的行銷彈窗註冊處理器，以及流程處理對話框期間的暫停，不啟動瀏覽器
+"""
+
+import asyncio
+
+import pytest
+from helpers.popup_handler import (
+    AUTO_DISMISS_OVERLAYS,
+    KNOWN_OVERLAYS,
+    AsyncPopupAutoDismisser,
+    PopupAutoDismisser,
+)
+from tests.fakes import FakeAsyncPage, FakePage
+
+
+def hidden_overlays(page, script, selectors):
+    return [False] * len(selectors)
+
+
+def registered_selectors(page):
+    return sorted(selector.split(" >> ")[0] for selector in page.locator_handlers)
+
+
+class TestPopupAutoDismisser:
+    """彈出視窗自動關閉測試"""
+
+    @pytest.mark.unit
+    def test_only_specific_overlays_get_handlers(self):
+        """通用的 dialog/modal/overlay 選擇器不註冊處理器，只在明確檢查時使用"""
+        page = FakePage(evaluate_result=hidden_overlays)
+        PopupAutoDismisser.install(page)
+
+        assert registered_selectors(page) == sorted(selector for _, selector in AUTO_DISMISS_OVERLAYS)
+        assert not any("modal" in selector or "dialog" in selector for selector in page.locator_handlers)
+
+        PopupAutoDismisser.install(page).dismiss_visible()
+        assert page.evaluated == [[selector for _, selector in KNOWN_OVERLAYS]]
+
+    @pytest.mark.unit
+    def test_suspended_removes_and_restores_handlers(self, monkeypatch):
+        """暫停期間沒有處理器，結束後恢復；已停用的類型不恢復"""
+        monkeypatch.setattr(PopupAutoDismisser, "stats", {})
+        page = FakePage()
+        dismisser = PopupAutoDismisser.install(page)
+        # 模擬 sweetalert 關不掉而被停用
+        page.remove_locator_handler(dismisser._locators["sweetalert"])
+        assert dismisser._record("sweetalert", False, 0.0)
+        dismisser._locators.pop("sweetalert")
+
+        with dismisser.suspended():
+            assert page.locator_handlers == {}
+
+        assert registered_selectors(page) == [".pum-overlay.pum-active"]
+
+    @pytest.mark.unit
+    def test_async_suspended(self):
+        """async 版本同樣在暫停期間移除處理器"""
+        page = FakeAsyncPage()
+
+        async def scenario():
+            dismisser = await AsyncPopupAutoDismisser.install(page)
+            async with dismisser.suspended():
+                assert page.locator_handlers == {}
+            return registered_selectors(page)
+
+        assert asyncio.run(scenario()) == sorted(selector for _, selector in AUTO_DISMISS_OVERLAYS)
@@ -0,0 +1,90 @@
+"""
+商品列表擷取單元測試
+
+驗證可加入購物車商品的選擇規則與擷取後的定位器；TestProductExtractorInBrowser 在真實頁面上執行擷取腳本
+"""
+
+import pytest
+from helpers.product_extractor import PRODUCT_INDEX_ATTR, ProductExtractor
+from tests.fakes import FakePage
+
+
+def product(index, can_add_to_cart=True, has_variants=False, in_stock=True):
+    return {
+        "index": index,
+        "product_id": 100 + index,
+        "name": f"商品 {index}",
+        "url": f"https://www.dogcatstar.com/product/{index}/",
+        "price": "NT$100",
+        "can_add_to_cart": can_add_to_cart,
+        "has_variants": has_variants,
+        "in_stock": in_stock,
+    }
+
+
+class TestProductExtractor:
+    """商品列表擷取測試"""
+
+    @pytest.mark.unit
+    def test_first_addable_skips_variants_out_of_stock_and_disabled(self):
+        """有規格、缺貨或按鈕停用的商品都跳過；沒有符合的商品時為 None"""
+        products = [
+            product(0, has_variants=True),
+            product(1, in_stock=False),
+            product(2, can_add_to_cart=False),
+            product(3),
+        ]
+
+        assert ProductExtractor.first_addable(products)["index"] == 3
+        assert ProductExtractor.first_addable(products[:3]) is None
+
+    @pytest.mark.unit
+    def test_locators_target_extracted_container(self):
+        """容器與按鈕定位器以擷取時標記的序號定位"""
+        page = FakePage()
+
+        assert ProductExtractor.container(page, product(2)).selector == f'[{PRODUCT_INDEX_ATTR}="2"]'
+        assert ProductExtractor.add_to_cart_button(page, product(2)).selector.startswith(f'[{PRODUCT_INDEX_ATTR}="2"] >> ')
+
+
+class TestProductExtractorInBrowser:
+    """在真實頁面上執行擷取腳本"""
+
+    @pytest.mark.ui
+    def test_extract_records(self, page):
+        """商品編號、名稱、價格、規格與庫存狀態都從商品容器讀取"""
+        page.set_content("""
+            <ul>
+              <li class="product product-type-simple instock">
+                <a class="woocommerce-loop-product__link" href="/product/a/">
+                  <h2 class="woocommerce-loop-product__title">  單品 A </h2>
+                </a>
+                <span class="price">NT$120</span>
+                <a class="button add_to_cart_button" data-product_id="11">加入購物車</a>
+              </li>
+              <li class="product product-type-variable instock">
+                <a class="woocommerce-loop-product__link" href="/product/b/">
+                  <h2 class="woocommerce-loop-product__title">規格品 B</h2>
+                </a>
+                <a class="button product_type_variable" data-product_id="12">選擇規格</a>
+              </li>
+              <li class="product product-type-simple outofstock">
+                <a class="woocommerce-loop-product__link" href="/product/c/">
+                  <h2 class="woocommerce-loop-product__title">缺貨品 C</h2>
+                </a>
+                <button class="add_to_cart_button" disabled>加入購物車</button>
+              </li>
+            </ul>
+        """)
+
+        records = ProductExtractor.extract(page)
+
+        assert [(r["index"], r["product_id"], r["name"]) for r in records] == [
+            (0, 11, "單品 A"), (1, None, "規格品 B"), (2, None, "缺貨品 C"),
+        ]
+        assert records[0]["price"] == "NT$120" and records[1]["price"] == "N/A"
+        assert records[0]["can_add_to_cart"] and records[0]["in_stock"] and not records[0]["has_variants"]
+        assert records[1]["has_variants"] and not records[1]["can_add_to_cart"]
+        assert not records[2]["in_stock"] and not records[2]["can_add_to_cart"]
+        assert ProductExtractor.first_addable(records)["product_id"] == 11
+        assert ProductExtractor.add_to_cart_button(page, records[0]).get_attribute("data-product_id") == "11"
@@ -0,0 +1,73 @@
+"""
+請求節流器單元測試
+
+以假時鐘驗證權杖桶與共享退避，不啟動瀏覽器
+"""
+
+import pytest
+from helpers.rate_governor import BACKOFF_BASE, STRIKE_EXPIRY, RateGovernor
+from tests.fakes import FakeClock
+
+
+def _governor(tmp_path, clock):
+    return RateGovernor(tmp_path, buckets={"add_to_cart": (2, 0.5)}, clock=clock, sleep=clock.sleep)
+
+
+class TestRateGovernor:
+    """請求節流器測試"""
+
+    @pytest.mark.unit
+    def test_token_bucket_paces_after_burst(self, tmp_path):
+        """桶內權杖用完後依補充速度等待"""
+        clock = FakeClock(1000.0)
+        governor = _governor(tmp_path, clock)
+
+        assert governor.acquire("add_to_cart") == 0
+        assert governor.acquire("add_to_cart") == 0
+        assert governor.acquire("add_to_cart") == pytest.approx(2.0)
+        assert governor.stats["throttled"] == 1
+
+    @pytest.mark.unit
+    def test_backoff_is_shared_between_instances(self, tmp_path):
+        """一個 worker 回報速率限制後，其他 worker 的 acquire 也會等待退避結束"""
+        clock = FakeClock(1000.0)
+        reporter = _governor(tmp_path, clock)
+        other = _governor(tmp_path, clock)
+
+        until = reporter.report_rate_limit()
+        # 退避期間內的重複回報不會延長退避
+        assert other.report_rate_limit() == until
+        assert other.backoff_remaining() == pytest.approx(BACKOFF_BASE)
+
+        waited = other.acquire("add_to_cart")
+        assert waited >= BACKOFF_BASE
+        assert other.backoff_remaining() == 0
+
+    @pytest.mark.unit
+    def test_consecutive_rate_limits_double_backoff(self, tmp_path):
+        """退避結束後再次遇到限制時退避時間加倍，成功後重置"""
+        clock = FakeClock(1000.0)
+        governor = _governor(tmp_path, clock)
+
+        governor.report_rate_limit()
+        clock.sleep(BACKOFF_BASE)
+        governor.report_rate_limit()
+        assert governor.backoff_remaining() == pytest.approx(BACKOFF_BASE * 2)
+
+        clock.sleep(BACKOFF_BASE * 2)
+        governor.report_success()
+        governor.report_rate_limit()
+        assert governor.backoff_remaining() == pytest.approx(BACKOFF_BASE)
+
+    @pytest.mark.unit
+    def test_strikes_expire_after_quiet_period(self, tmp_path):
+        """上次退避結束很久之後（例如下一次執行）才再遇到限制時，不沿用先前加倍的退避"""
+        clock = FakeClock(1000.0)
+        _governor(tmp_path, clock).report_rate_limit()
+        clock.sleep(BACKOFF_BASE)
+        _governor(tmp_path, clock).report_rate_limit()
+
+        clock.sleep(BACKOFF_BASE * 2 + STRIKE_EXPIRY + 1)
+        next_run = _governor(tmp_path, clock)
+        next_run.report_rate_limit()
+        assert next_run.backoff_remaining() == pytest.approx(BACKOFF_BASE)
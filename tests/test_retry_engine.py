@@ -0,0 +1,134 @@
+"""
+重試引擎單元測試
+
+以假的時鐘與 sleep 驗證重試策略、預算、斷路器、速率限制與 retry_action 的相容性，不啟動瀏覽器
+"""
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from helpers import base_helpers
+from helpers.base_helpers import RetryHelpers
+from helpers.rate_governor import BACKOFF_BASE, RateGovernor
+from helpers.retry_engine import CircuitOpenError, RetryEngine, classify
+from tests.fakes import FakeClock
+
+
+def flaky(errors):
+    """依序拋出 errors 中的例外，用完後返回 "ok" """
+    remaining = list(errors)
+
+    def action():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+    return action
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def governor(tmp_path, monkeypatch, clock):
+    """共用的節流器改用獨立的狀態目錄與假時鐘"""
+    governor = RateGovernor(tmp_path / "governor", clock=clock, sleep=clock.sleep)
+    monkeypatch.setattr(RateGovernor, "_shared", governor)
+    return governor
+
+
+class TestRetryEngine:
+    """重試引擎測試"""
+
+    @pytest.mark.unit
+    def test_classify(self):
+        """依例外類型與訊息分類"""
+        assert classify(PlaywrightTimeoutError("Timeout 1000ms exceeded")) == "timeout"
+        assert classify(Exception("Element is not attached to the DOM")) == "detached"
+        assert classify(Exception("net::ERR_CONNECTION_RESET")) == "server_error"
+        assert classify(Exception("429 Too Many Requests")) == "other"
+        assert classify(PlaywrightTimeoutError("Timeout 1000ms exceeded"), rate_limited=True) == "rate_limited"
+        assert classify(AssertionError("timeout")) == "other"
+        assert classify(AssertionError("timeout"), rate_limited=True) == "other"
+        assert classify(RuntimeError("購物車 API add 失敗: HTTP 503 Service Unavailable")) == "server_error"
+
+    @pytest.mark.unit
+    def test_classify_ignores_selectors_and_call_log(self):
+        """選擇器與 call log 中的數字、字詞不影響分類"""
+        assert classify(TimeoutError("Locator.click: Timeout 5020ms exceeded.")) == "timeout"
+        assert classify(PlaywrightTimeoutError(
+            'Locator.click: Timeout 3000ms exceeded.\nCall log:\n'
+            '  - waiting for locator("[data-pw-chain=\\"cart-confirm-429\\"]")\n'
+            '  - element is not attached to the DOM\n  - net::ERR_ABORTED'
+        )) == "timeout"
+        assert classify(Exception('Locator.count: Error: selector "button.rate-limit-502" is invalid')) == "other"
+
+    @pytest.mark.unit
+    def test_backoff_grows_with_jitter_and_recovers(self, clock):
+        """逾時依指數退避重試（延遲介於一半與完整值之間），成功後計為恢復"""
+        engine = RetryEngine(clock=clock, sleep=clock.sleep)
+        error = PlaywrightTimeoutError("Timeout")
+
+        assert engine.run(flaky([error, error]), "click") == "ok"
+        assert 0.25 <= clock.sleeps[0] <= 0.5
+        assert 0.5 <= clock.sleeps[1] <= 1.0
+        assert engine.stats["recovered"] == 1
+
+    @pytest.mark.unit
+    def test_other_errors_and_budget_stop_retrying(self, clock):
+        """斷言錯誤不重試；每個測試的預算用完後不再重試，start_test 重置預算"""
+        engine = RetryEngine(test_budget=1, clock=clock, sleep=clock.sleep)
+        with pytest.raises(AssertionError):
+            engine.run(flaky([AssertionError("x")]), "check")
+        assert clock.sleeps == []
+
+        detached = Exception("element is detached")
+        assert engine.run(flaky([detached]), "click") == "ok"
+        with pytest.raises(Exception, match="detached"):
+            engine.run(flaky([detached]), "click")
+        assert engine.stats["exhausted"] == 1
+
+        engine.start_test()
+        assert engine.run(flaky([detached]), "click") == "ok"
+
+    @pytest.mark.unit
+    def test_circuit_breaker_fails_fast_then_half_opens(self, clock):
+        """連續網站異常達門檻後斷路，冷卻期間直接失敗，冷卻結束後成功即恢復"""
+        engine = RetryEngine(test_budget=100, breaker_threshold=3, breaker_cooldown=60, clock=clock, sleep=clock.sleep)
+        down = Exception("net::ERR_CONNECTION_REFUSED")
+
+        with pytest.raises(Exception, match="ERR_CONNECTION_REFUSED"):
+            engine.run(flaky([down] * 10), "goto")
+        with pytest.raises(CircuitOpenError):
+            engine.run(flaky([]), "goto")
+        assert engine.stats["fail_fast"] == 1
+
+        clock.now += 61
+        assert engine.run(flaky([]), "goto") == "ok"
+        assert engine.consecutive_failures == 0
+
+    @pytest.mark.unit
+    def test_rate_limit_comes_from_governor_backoff(self, clock, governor):
+        """NetworkMonitor 等回報 429 後，失敗的動作等待共享退避結束再重試一次"""
+        engine = RetryEngine(clock=clock, sleep=clock.sleep)
+        governor.report_rate_limit()
+
+        assert engine.run(flaky([PlaywrightTimeoutError("Timeout 5000ms exceeded")]), "add_to_cart") == "ok"
+        assert engine.stats["by_kind"] == {"rate_limited": 1}
+        assert clock.sleeps and clock.sleeps[0] >= BACKOFF_BASE
+        assert governor.stats["backoffs"] == 1
+
+    @pytest.mark.unit
+    def test_retry_action_keeps_fixed_delay(self, monkeypatch, clock):
+        """retry_action 維持原本的本地迴圈：最多執行 retries 次、固定間隔、任何例外都重試，不使用 RetryEngine"""
+        monkeypatch.setattr(base_helpers.time, "sleep", clock.sleep)
+        engine = RetryEngine(test_budget=1, clock=clock, sleep=clock.sleep)
+        monkeypatch.setattr(RetryEngine, "_shared", engine)
+
+        assert RetryHelpers.retry_action(flaky([ValueError("a"), ValueError("b")]), retries=3, delay=0.2) == "ok"
+        assert clock.sleeps == [0.2, 0.2]
+        with pytest.raises(ValueError):
+            RetryHelpers.retry_action(flaky([ValueError("c")] * 3), retries=3, delay=0.2)
+        assert engine.stats["retries"] == 0
+        assert RetryHelpers.retry_action(flaky([]), retries=1) == "ok"
@@ -0,0 +1,159 @@
+"""
+驗證狀態管理器單元測試
+
+不啟動瀏覽器，只驗證 storage state 的有效期限判斷與更新流程
+"""
+
+import json
+import time
+
+import pytest
+from helpers import storage_state
+from helpers.storage_state import StorageStateManager, login, parse_login_nonce
+
+
+def _write_state(path, expires):
+    state = {
+        "cookies": [
+            {"name": "wordpress_sec_abc", "value": "x", "domain": "www.dogcatstar.com", "expires": expires},
+            {"name": "_ga", "value": "y", "domain": ".dogcatstar.com", "expires": 1},
+        ],
+        "origins": [],
+    }
+    path.write_text(json.dumps(state), encoding="utf-8")
+    return state
+
+
+class TestStorageStateManager:
+    """驗證狀態管理器測試"""
+
+    @pytest.mark.unit
+    def test_fresh_state_does_not_refresh(self, tmp_path):
+        """登入 cookie 仍有效時不需要更新，且只看登入 cookie 的期限"""
+        auth_file = tmp_path / "user.json"
+        _write_state(auth_file, time.time() + 3600)
+        manager = StorageStateManager(str(auth_file), refresh_margin=600)
+        manager.load()
+
+        assert not manager.needs_refresh()
+        assert manager.ensure_fresh()
+        assert 3500 < manager.seconds_remaining() <= 3600
+
+    @pytest.mark.unit
+    def test_expiring_state_is_refreshed_and_written(self, tmp_path):
+        """即將過期時以 refresher 更新，寫回檔案並通知監聽者"""
+        auth_file = tmp_path / "user.json"
+        _write_state(auth_file, time.time() + 60)
+        new_state = {
+            "cookies": [{"name": "wordpress_sec_abc", "value": "new", "expires": time.time() + 86400}],
+            "origins": [],
+        }
+        received = []
+        manager = StorageStateManager(str(auth_file), refresher=lambda: new_state, refresh_margin=600)
+        manager.add_listener(received.append)
+        manager.load()
+
+        assert manager.needs_refresh()
+        assert manager.ensure_fresh()
+        assert manager.state["cookies"][0]["value"] == "new"
+        assert json.loads(auth_file.read_text(encoding="utf-8")) == new_state
+        assert received == [new_state]
+
+    @pytest.mark.unit
+    def test_expired_state_without_refresh_is_unusable(self, tmp_path):
+        """已過期且更新失敗時回報不可用，並保留錯誤原因"""
+        auth_file = tmp_path / "user.json"
+        _write_state(auth_file, time.time() - 10)
+
+        def failing_refresher():
+            raise RuntimeError("login failed")
+
+        manager = StorageStateManager(str(auth_file), refresher=failing_refresher)
+        manager.load()
+
+        assert not manager.ensure_fresh()
+        assert "login failed" in manager.last_error
+
+    @pytest.mark.unit
+    def test_refresh_adopts_state_written_by_other_worker(self, tmp_path):
+        """取得鎖後檔案已被其他 worker 更新為有效狀態時直接採用，不再登入"""
+        auth_file = tmp_path / "user.json"
+        _write_state(auth_file, time.time() + 60)
+        calls, received = [], []
+        manager = StorageStateManager(str(auth_file), refresher=lambda: calls.append(1), refresh_margin=600)
+        manager.add_listener(received.append)
+        manager.load()
+
+        fresh = _write_state(auth_file, time.time() + 86400)
+
+        assert manager.ensure_fresh()
+        assert calls == []
+        assert manager.state == fresh and received == [fresh]
+        assert not (tmp_path / "user.json.lock").exists()
+
+    @pytest.mark.unit
+    def test_refresh_waits_for_worker_holding_lock(self, tmp_path):
+        """其他 worker 持有鎖直到逾時：檔案仍需更新時回報失敗，不自行登入"""
+        auth_file = tmp_path / "user.json"
+        _write_state(auth_file, time.time() + 60)
+        calls = []
+        manager = StorageStateManager(str(auth_file), refresher=lambda: calls.append(1), refresh_margin=600)
+        manager.file_lock.timeout = 0.05
+        manager.load()
+        (tmp_path / "user.json.lock").write_text("12345")
+
+        assert not manager.refresh()
+        assert calls == [] and "user.json.lock" in manager.last_error
+
+        _write_state(auth_file, time.time() + 86400)
+        assert manager.refresh()
+        assert not manager.needs_refresh()
+
+    @pytest.mark.unit
+    def test_stale_file_never_replaces_current_state(self, tmp_path):
+        """檔案上的狀態需要更新時直接以解析結果判斷，目前的狀態不會被暫時替換"""
+        auth_file = tmp_path / "user.json"
+        current = _write_state(auth_file, time.time() + 3600)
+        manager = StorageStateManager(str(auth_file), refresh_margin=600)
+        manager.load()
+        stale = _write_state(auth_file, time.time() + 60)
+
+        assert manager.needs_refresh(stale) and not manager.needs_refresh()
+        assert manager.seconds_remaining(stale) <= 60
+        assert not manager._reload_if_fresh()
+        assert manager.state == current
+
+
+class TestHttpLogin:
+    """HTTP 登入輔助函數測試"""
+
+    @pytest.mark.unit
+    def test_parse_login_nonce(self):
+        """不論屬性順序都能取出登入表單 nonce，沒有表單時回傳 None"""
+        html = (
+            '<form class="woocommerce-form-login">'
+            '<input type="hidden" id="woocommerce-login-nonce" name="woocommerce-login-nonce" value="a1b2c3" />'
+            '</form>'
+        )
+        reordered = '<input value="d4e5f6" type="hidden" name="woocommerce-login-nonce">'
+
+        assert parse_login_nonce(html) == "a1b2c3"
+        assert parse_login_nonce(reordered) == "d4e5f6"
+        assert parse_login_nonce("<html><body>no form</body></html>") is None
+
+    @pytest.mark.unit
+    def test_login_propagates_http_error_unless_ui_fallback(self, monkeypatch):
+        """HTTP 登入失敗時預設拋出原本的錯誤；明確啟用 ui_fallback 時才改用 UI 流程"""
+        def failing_http(email, password):
+            raise RuntimeError("HTTP 登入失敗：回應中沒有登入 cookie")
+
+        ui_calls = []
+        monkeypatch.setattr(storage_state, "login_via_http", failing_http)
+        monkeypatch.setattr(storage_state, "login_via_ui", lambda email, password: ui_calls.append(email) or {"cookies": []})
+
+        with pytest.raises(RuntimeError, match="沒有登入 cookie"):
+            login("user@example.com", "secret")
+        assert ui_calls == []
+
+        assert login("user@example.com", "secret", ui_fallback=True) == {"cookies": []}
+        assert ui_calls == ["user@example.com"]
@@ -0,0 +1,88 @@
+"""
+步驟追蹤單元測試
+
+驗證區段巢狀關係與 Chrome trace / CSV 匯出，不啟動瀏覽器
+"""
+
+import csv
+import json
+
+import pytest
+from helpers.base_helpers import LogHelpers
+from helpers.tracing import StepTracer
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    monkeypatch.setattr(StepTracer, "enabled", True)
+    monkeypatch.setattr(StepTracer, "spans", [])
+    monkeypatch.setattr(StepTracer._local, "stack", [], raising=False)
+    return StepTracer
+
+
+class CartPageStub:
+    """測試用的頁面物件"""
+
+    def open_cart(self):
+        LogHelpers.log_step("在頁面物件內的步驟")
+
+
+class TestStepTracer:
+    """步驟追蹤測試"""
+
+    @pytest.mark.unit
+    def test_steps_nest_under_test_and_page_object(self, tracer):
+        """log_step 結束上一個同層步驟；頁面物件方法內的步驟巢狀在方法之下"""
+        tracer.instrument_page_objects([CartPageStub])
+
+        with tracer.span("tests/test_x.py::test_a", "test"):
+            LogHelpers.log_step("步驟一")
+            LogHelpers.log_step("步驟二")
+            CartPageStub().open_cart()
+
+        by_name = {span["name"]: span for span in tracer.spans}
+        assert by_name["步驟一"]["depth"] == 1
+        assert by_name["步驟二"]["depth"] == 1
+        assert by_name["CartPageStub.open_cart"]["depth"] == 2
+        assert by_name["在頁面物件內的步驟"]["depth"] == 3
+        assert by_name["步驟一"]["ts"] + by_name["步驟一"]["dur"] <= by_name["步驟二"]["ts"]
+        assert all(span["test"] == "tests/test_x.py::test_a" for span in tracer.spans)
+        assert tracer._stack() == []
+
+    @pytest.mark.unit
+    def test_export_chrome_trace_and_csv(self, tracer, tmp_path):
+        """匯出 Chrome trace event JSON 與扁平 CSV"""
+        with tracer.span("tests/test_x.py::test_a", "test"):
+            LogHelpers.log_step(1, "開始")
+
+        trace_path = tracer.export(tmp_path, process_name="gw0")
+
+        events = json.loads(trace_path.read_text(encoding="utf-8"))["traceEvents"]
+        complete = [event for event in events if event["ph"] == "X"]
+        assert {event["name"] for event in complete} == {"tests/test_x.py::test_a", "Step 1: 開始"}
+        assert all(event["dur"] >= 0 for event in complete)
+
+        with open(tmp_path / "trace.csv", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["category"] for row in rows] == ["test", "step"]
+
+    @pytest.mark.unit
+    def test_disabled_tracer_records_nothing(self, monkeypatch):
+        """未啟用時 log_step 不記錄任何區段"""
+        monkeypatch.setattr(StepTracer, "spans", [])
+        LogHelpers.log_step("未啟用")
+        assert StepTracer.spans == []
+
+    @pytest.mark.unit
+    def test_merge_worker_exports(self, tracer, tmp_path):
+        """各 worker 的 trace.json 合併為一個檔案，保留各自的程序名稱"""
+        with tracer.span("tests/test_x.py::test_a", "test"):
+            pass
+        paths = [tracer.export(tmp_path / worker_id, process_name=worker_id) for worker_id in ("gw0", "gw1")]
+
+        merged = StepTracer.merge_exports(paths, tmp_path)
+
+        events = json.loads(merged.read_text(encoding="utf-8"))["traceEvents"]
+        assert [event["args"]["name"] for event in events if event["ph"] == "M"] == ["gw0", "gw1"]
+        assert len([event for event in events if event["ph"] == "X"]) == 2
+        assert StepTracer.merge_exports([], tmp_path / "empty") is None
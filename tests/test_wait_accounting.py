@@ -0,0 +1,113 @@
+"""
+等待統計單元測試
+
+以假的頁面與定位器驗證呼叫位置、巢狀等待與「條件早已滿足」的判斷，不啟動瀏覽器
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from helpers.async_helpers import AsyncWaitHelpers
+from helpers.base_helpers import WaitHelpers
+from helpers.wait_accounting import WaitAccounting
+from tests.fakes import FakeAsyncLocator, FakeLocator, FakePage
+
+
+@pytest.fixture
+def accounting(monkeypatch):
+    monkeypatch.setattr(WaitAccounting, "sites", {})
+    monkeypatch.setattr(WaitAccounting, "active_seconds", 0.0)
+    # install() 會啟用統計，測試結束後恢復原本的設定（--no-wait-report 時為停用）
+    monkeypatch.setattr(WaitAccounting, "enabled", WaitAccounting.enabled)
+    WaitAccounting.install()
+    return WaitAccounting
+
+
+def add_first_product_to_cart(page):
+    WaitHelpers.pause(page, 30, "測試用固定等待")
+
+
+class TestWaitAccounting:
+    """等待統計測試"""
+
+    @pytest.mark.unit
+    def test_fixed_wait_attributed_to_caller(self, accounting):
+        """固定等待記錄在呼叫它的函數上，而不是 WaitHelpers"""
+        add_first_product_to_cart(FakePage(sleep=time.sleep))
+
+        (row,) = accounting.ranked()
+        assert row["site"] == "test_wait_accounting.py:add_first_product_to_cart"
+        assert row["kind"] == "fixed"
+        assert row["total_ms"] >= 30
+
+    @pytest.mark.unit
+    def test_condition_waits_flag_already_met(self, accounting):
+        """條件等待在 50ms 內返回時計為早已滿足"""
+        WaitHelpers.wait_for_visible(FakeLocator())
+        WaitHelpers.wait_for_visible(FakeLocator(delay=0.08))
+
+        (row,) = accounting.ranked()
+        assert row["kind"] == "condition"
+        assert row["count"] == 2
+        assert row["already_met"] == 1
+
+    @pytest.mark.unit
+    def test_export_idle_fraction(self, accounting, tmp_path, monkeypatch):
+        """waits.json 包含等待佔測試時間的比例"""
+        monkeypatch.setattr(WaitAccounting, "active_seconds", 2.0)
+        accounting.record("cart_page.py:clear_cart", "fixed", 500.0)
+
+        data = json.loads(accounting.export(tmp_path).read_text(encoding="utf-8"))
+        assert data["totals"]["idle_fraction"] == 0.25
+        assert data["sites"][0]["site"] == "cart_page.py:clear_cart"
+        assert "cart_page.py:clear_cart" in accounting.report()[1]
+
+    @pytest.mark.unit
+    def test_load_merges_worker_exports(self, accounting, tmp_path):
+        """主程序載入各 worker 的 waits.json 後，同一呼叫位置的次數與耗時相加"""
+        accounting.record("cart_page.py:clear_cart", "fixed", 500.0)
+        accounting.add_active_time(2.0)
+        worker_path = accounting.export(tmp_path / "gw0")
+
+        accounting.load(worker_path)
+
+        (row,) = accounting.ranked()
+        assert (row["count"], row["total_ms"], row["max_ms"]) == (2, 1000.0, 500.0)
+        # 測試本身的執行時間也會由 pytest_runtest_logreport 累加
+        assert accounting.totals()["test_seconds"] == pytest.approx(4.0, abs=0.5)
+
+    @pytest.mark.unit
+    def test_async_helpers_counted_once_per_task(self, accounting):
+        """AsyncWaitHelpers 的等待也被統計；同時進行的兩個等待各自記錄，內部的巢狀等待不重複計算"""
+        inner = accounting.wrap_async(FakeAsyncLocator(delay=0.06).wait_for, "condition")
+        outer = accounting.wrap_async(inner, "condition")
+
+        async def open_cart():
+            await AsyncWaitHelpers.wait_for_visible(FakeAsyncLocator(delay=0.06))
+
+        async def open_account():
+            await outer()
+
+        async def scenario():
+            await asyncio.gather(open_cart(), open_account())
+
+        asyncio.run(scenario())
+
+        rows = {row["site"]: row for row in accounting.ranked()}
+        assert set(rows) == {"test_wait_accounting.py:open_cart", "test_wait_accounting.py:open_account"}
+        assert all(row["count"] == 1 and row["already_met"] == 0 for row in rows.values())
+
+    @pytest.mark.unit
+    def test_gathered_waits_report_calling_function(self, accounting):
+        """直接交給 asyncio.gather 的等待記錄到呼叫 gather 的函數，而不是 asyncio 內部"""
+        fast = accounting.wrap_async(FakeAsyncLocator(delay=0.06).wait_for, "condition")
+
+        async def open_both():
+            await asyncio.gather(fast(), AsyncWaitHelpers.wait_for_visible(FakeAsyncLocator(delay=0.06)))
+
+        asyncio.run(open_both())
+
+        (row,) = accounting.ranked()
+        assert (row["site"], row["count"]) == ("test_wait_accounting.py:open_both", 2)
@@ -0,0 +1,99 @@
+"""
+條件式等待單元測試
+
+以假頁面與定位器驗證各條件等待的返回值與逾時處理，以及固定等待記錄原因；
+TestWaitHelpersInBrowser 在真實頁面上驗證依賴 expect 的等待
+"""
+
+import asyncio
+
+import pytest
+from helpers.async_helpers import AsyncWaitHelpers
+from helpers.base_helpers import LogHelpers, WaitHelpers
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from tests.fakes import FakeAsyncPage, FakeLocator, FakePage
+
+
+class TestWaitHelpers:
+    """條件式等待測試"""
+
+    @pytest.mark.unit
+    def test_dom_stable_single_evaluate(self):
+        """一次 evaluate 等待 DOM 穩定；逾時或執行環境被銷毀時返回 False"""
+        page = FakePage(evaluate_result=True)
+        assert WaitHelpers.wait_for_dom_stable(page, quiet_ms=200, timeout=1000) is True
+        assert page.evaluated == [[200, 1000]]
+
+        assert WaitHelpers.wait_for_dom_stable(FakePage(evaluate_result=False)) is False
+        destroyed = RuntimeError("Execution context was destroyed")
+        assert WaitHelpers.wait_for_dom_stable(FakePage(evaluate_result=destroyed)) is False
+        assert asyncio.run(AsyncWaitHelpers.wait_for_dom_stable(FakeAsyncPage(evaluate_result=True))) is True
+
+    @pytest.mark.unit
+    def test_visibility_waits_return_bool(self):
+        """可見 / 隱藏等待以對應的狀態呼叫 wait_for，逾時返回 False 而不拋出"""
+        locator = FakeLocator()
+        assert WaitHelpers.wait_for_visible(locator) is True
+        assert WaitHelpers.wait_for_hidden(locator) is True
+        assert locator.states == ["visible", "hidden"]
+        assert WaitHelpers.wait_for_visible(FakeLocator(fail=True)) is False
+        assert WaitHelpers.wait_for_hidden(FakeLocator(fail=True)) is False
+
+    @pytest.mark.unit
+    def test_any_visible_waits_on_first_of_union(self):
+        """組合選擇器等待第一個符合的元素可見"""
+        page = FakePage()
+        assert WaitHelpers.wait_for_any_visible(page, ".a, .b") is True
+        (locator,) = page.locators
+        assert locator.selector == ".a, .b" and locator.states == ["visible"]
+
+    @pytest.mark.unit
+    def test_wait_for_response(self):
+        """返回符合的回應；只有回應逾時時返回 None，action 本身逾時照常拋出"""
+        actions = []
+        assert WaitHelpers.wait_for_response(FakePage(), "**/cart", lambda: actions.append(1)) == "response:**/cart"
+        assert WaitHelpers.wait_for_response(FakePage(response_arrives=False), "**/cart",
+                                             lambda: actions.append(2)) is None
+        assert actions == [1, 2]
+
+        def slow_action():
+            raise PlaywrightTimeoutError("click timeout")
+
+        with pytest.raises(PlaywrightTimeoutError, match="click timeout"):
+            WaitHelpers.wait_for_response(FakePage(), "**/cart", slow_action)
+
+    @pytest.mark.unit
+    def test_pause_logs_reason(self, monkeypatch):
+        """固定等待把原因寫入 DEBUG 日誌"""
+        logged = []
+        monkeypatch.setattr(LogHelpers, "debug", staticmethod(lambda message, *args: logged.append(message % args)))
+        page, async_page = FakePage(), FakeAsyncPage()
+
+        WaitHelpers.pause(page, 300, "等待動畫")
+        asyncio.run(AsyncWaitHelpers.pause(async_page, 500, "速率限制冷卻"))
+
+        assert page.waited == [300] and async_page.waited == [500]
+        assert logged == ["固定等待 300ms：等待動畫", "固定等待 500ms：速率限制冷卻"]
+
+
+class TestWaitHelpersInBrowser:
+    """在真實頁面上驗證依賴 expect 的等待"""
+
+    @pytest.mark.ui
+    def test_enabled_and_count_change(self, page):
+        """按鈕延遲啟用、列表延遲刪除一項時，等待在條件滿足後返回 True"""
+        page.set_content("""
+            <button id="submit" disabled>送出</button>
+            <ul><li>A</li><li>B</li></ul>
+            <script>
+              setTimeout(() => {
+                document.getElementById('submit').disabled = false;
+                document.querySelector('li').remove();
+              }, 200);
+            </script>
+        """)
+
+        assert WaitHelpers.wait_for_enabled(page.locator("#submit"), timeout=2000) is True
+        assert WaitHelpers.wait_for_count_change(page.locator("li"), 2, timeout=2000) is True
+        assert WaitHelpers.wait_for_count_change(page.locator("li"), 1, timeout=300) is False
+        assert WaitHelpers.wait_for_dom_stable(page, quiet_ms=100, timeout=2000) is True